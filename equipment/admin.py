@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ICTEquipment, DeviceAssignment, Directorate, DeviceHistory, DeviceIssue
+from .models import ICTEquipment, DeviceAssignment, Directorate, DeviceHistory, ArchivedDeviceHistory, DeviceIssue
 
 
 @admin.register(Directorate)
@@ -33,6 +33,20 @@ class DeviceHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['timestamp']
 
 
+@admin.register(ArchivedDeviceHistory)
+class ArchivedDeviceHistoryAdmin(admin.ModelAdmin):
+    """Read-only; rows are moved here by ``archive_device_history``."""
+    list_display = ['equipment', 'action', 'from_directorate', 'to_directorate', 'performed_by', 'timestamp', 'archived_at']
+    search_fields = ['equipment__brand', 'equipment__model', 'notes']
+    list_filter = ['action']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(DeviceIssue)
 class DeviceIssueAdmin(admin.ModelAdmin):
     list_display = ['equipment', 'title', 'severity', 'status', 'reported_by', 'reported_at']
@@ -0,0 +1,78 @@
+"""
+Recurring-failure analytics over time windows.
+
+Issues reported in the last N days are grouped in SQL by the directorate
+of the assignment they were reported under, by equipment type and by
+brand/model. Each window's result is cached; issue saves and deletes
+drop the cached windows (see equipment.signals).
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import DeviceIssue, ICTEquipment
+
+WINDOWS = (30, 90, 365)
+DEFAULT_WINDOW = 90
+CACHE_TIMEOUT = 60 * 15
+HOTSPOTS_SHOWN = 15
+
+GROUPINGS = {
+    'by_directorate': ['assignment__directorate_id', 'assignment__directorate__name', 'assignment__directorate__code'],
+    'by_type': ['equipment__equipment_type'],
+    'by_model': ['equipment__brand', 'equipment__model'],
+}
+
+
+def cache_key(days):
+    return f'equipment:failure-hotspots:{days}'
+
+
+def invalidate_failure_hotspots():
+    cache.delete_many([cache_key(days) for days in WINDOWS])
+
+
+def issue_metrics():
+    return {
+        'issue_count': Count('id'),
+        'device_count': Count('equipment', distinct=True),
+        'severe_count': Count('id', filter=Q(severity__in=['high', 'critical'])),
+        'open_count': Count('id', filter=Q(status__in=['reported', 'in_progress'])),
+    }
+
+
+def compute_failure_hotspots(days, limit=HOTSPOTS_SHOWN):
+    """One grouped query per grouping over the issues reported in the last ``days`` days."""
+    since = timezone.now() - timedelta(days=days)
+    issues = DeviceIssue.objects.filter(reported_at__gte=since).order_by()
+    type_labels = dict(ICTEquipment.EQUIPMENT_TYPE_CHOICES)
+
+    hotspots = {'days': days, 'since': since, 'total_issues': issues.count()}
+    for name, fields in GROUPINGS.items():
+        rows = list(
+            issues.values(*fields).annotate(**issue_metrics()).order_by('-issue_count', '-severe_count', *fields)[:limit]
+        )
+        for row in rows:
+            row['issues_per_device'] = round(row['issue_count'] / row['device_count'], 1)
+            if name == 'by_type':
+                row['label'] = type_labels.get(row['equipment__equipment_type'], row['equipment__equipment_type'])
+            elif name == 'by_model':
+                row['label'] = f"{row['equipment__brand']} {row['equipment__model']}"
+            else:
+                row['label'] = row['assignment__directorate__name'] or 'Unassigned'
+        hotspots[name] = rows
+    return hotspots
+
+
+def failure_hotspots(days):
+    """Cached ``compute_failure_hotspots`` for one of ``WINDOWS``."""
+    if days not in WINDOWS:
+        raise ValueError(f'Unsupported window: {days} days')
+    key = cache_key(days)
+    hotspots = cache.get(key)
+    if hotspots is None:
+        hotspots = compute_failure_hotspots(days)
+        cache.set(key, hotspots, CACHE_TIMEOUT)
+    return hotspots
@@ -6,3 +6,5 @@ class EquipmentConfig(AppConfig):
     name = 'equipment'
     verbose_name = 'ICT Equipment Management'
 
+    def ready(self):
+        from . import checks, signals  # noqa: F401
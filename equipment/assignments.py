@@ -0,0 +1,216 @@
+"""
+Assigning and returning equipment.
+
+``ICTEquipment.current_assignment`` points at the equipment's active
+assignment, so list and detail pages join to it instead of
+querying assignments for every row. The functions here change the
+assignment, its history entry and the equipment row (status and
+pointer) in one transaction; ``backfill_current_assignments`` repairs
+the pointer for rows written some other way (admin, shell, fixtures).
+
+The batch versions write every assignment and history row with
+``bulk_create`` and update the equipment rows with a single UPDATE,
+so their query count does not grow with the number of devices.
+
+Every write locks the equipment rows first (``select_for_update``,
+in primary key order) and re-checks their state under the lock, and
+the ``assign_one_active_per_equipment`` constraint backs that up. Two
+officers assigning the same device at once therefore get one success
+and one ``AssignmentConflict`` rather than two active assignments.
+"""
+from contextlib import contextmanager
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .inventory import invalidate_inventory_summary
+from .scans import invalidate_scan_cache
+from .models import DeviceAssignment, DeviceHistory, ICTEquipment
+
+
+# PostgreSQL deadlock_detected and lock_not_available.
+LOCK_CONTENTION_PGCODES = {'40P01', '55P03'}
+SQLITE_LOCKED_MESSAGES = {'database is locked', 'database table is locked'}
+
+
+class AssignmentConflict(Exception):
+    """
+    The devices changed since the form was shown (another officer
+    assigned or returned them first). Nothing was written; reload and
+    try again.
+    """
+
+
+def lock_equipment(pks):
+    """Lock the equipment rows with primary keys ``pks`` in a fixed order and return them."""
+    equipment = list(ICTEquipment.objects.select_for_update().filter(pk__in=pks).order_by('pk'))
+    if len(equipment) != len(set(pks)):
+        raise AssignmentConflict('A device was deleted by another officer; reload and try again.')
+    return equipment
+
+
+def check_available(equipment):
+    taken = [device.serial_number for device in equipment if device.status != 'available' or device.current_assignment_id]
+    if taken:
+        raise AssignmentConflict(
+            f"No longer available: {', '.join(taken)}. Another officer may have just assigned "
+            f"{'it' if len(taken) == 1 else 'them'}; reload and try again."
+        )
+
+
+def check_active(assignments):
+    if DeviceAssignment.objects.filter(pk__in=[assignment.pk for assignment in assignments], is_active=True).count() != len(assignments):
+        raise AssignmentConflict('Already returned by another officer; reload and try again.')
+
+
+def latest_active_assignment():
+    """Subquery for the latest active assignment of the outer equipment row."""
+    return Subquery(
+        DeviceAssignment.objects.filter(equipment=OuterRef('pk'), is_active=True)
+        .order_by('-assigned_date', '-pk').values('pk')[:1]
+    )
+
+
+def is_lock_contention(exc):
+    """
+    True if the ``OperationalError`` ``exc`` means another transaction held
+    the rows: a deadlock or lock timeout on PostgreSQL, a locked database
+    on SQLite. Anything else (lost connection, missing table, full disk)
+    is a real failure.
+    """
+    cause = exc.__cause__
+    code = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlstate', None)
+    if code is not None:
+        return code in LOCK_CONTENTION_PGCODES
+    return str(exc) in SQLITE_LOCKED_MESSAGES
+
+
+@contextmanager
+def assignment_transaction():
+    """
+    Run an assign or return in a transaction, reporting a race lost on
+    the one-active-assignment constraint, or lock contention (see
+    ``is_lock_contention``), as ``AssignmentConflict``. Other database
+    errors propagate.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        raise AssignmentConflict(
+            'Another officer assigned one of these devices at the same time; reload and try again.'
+        ) from exc
+    except OperationalError as exc:
+        if not is_lock_contention(exc):
+            raise
+        raise AssignmentConflict('The equipment records are busy; try again in a moment.') from exc
+
+
+def assign_equipment(assignment, performed_by):
+    """Save a new ``assignment`` and make it its equipment's current one."""
+    with assignment_transaction():
+        [equipment] = lock_equipment([assignment.equipment_id])
+        check_available([equipment])
+        assignment.equipment = equipment
+        assignment.save()
+        DeviceHistory.objects.create(
+            equipment=equipment,
+            assignment=assignment,
+            action='assigned',
+            to_directorate=assignment.directorate,
+            to_room=assignment.room_number or '',
+            performed_by=performed_by,
+            notes=assignment.assignment_notes or ''
+        )
+        equipment.status = 'assigned'
+        equipment.current_assignment = assignment
+        equipment.save(update_fields=['status', 'current_assignment', 'updated_at'])
+    return assignment
+
+
+def return_assignment(assignment, performed_by):
+    """Deactivate ``assignment`` and mark its equipment available again."""
+    with assignment_transaction():
+        [equipment] = lock_equipment([assignment.equipment_id])
+        check_active([assignment])
+        assignment.equipment = equipment
+        assignment.deactivate()
+        DeviceHistory.objects.create(
+            equipment=equipment,
+            assignment=assignment,
+            action='returned',
+            from_directorate=assignment.directorate,
+            from_room=assignment.room_number,
+            performed_by=performed_by,
+            notes=f"Device returned from {assignment.directorate}"
+        )
+        equipment.status = 'available'
+        equipment.current_assignment = None
+        equipment.save(update_fields=['status', 'current_assignment', 'updated_at'])
+    return assignment
+
+
+def assign_batch(equipment, directorate, performed_by, room_number='', office_location='', assigned_to=None):
+    """
+    Assign every device in ``equipment`` (all currently available) to
+    ``directorate``; returns the new assignments.
+    """
+    now = timezone.now()
+    with assignment_transaction():
+        equipment = lock_equipment([device.pk for device in equipment])
+        check_available(equipment)
+        assignments = DeviceAssignment.objects.bulk_create([
+            DeviceAssignment(
+                equipment=device, directorate=directorate, assigned_to=assigned_to,
+                room_number=room_number, office_location=office_location,
+                issued_by=performed_by, assigned_date=now,
+            )
+            for device in equipment
+        ])
+        DeviceHistory.objects.bulk_create([
+            DeviceHistory(
+                equipment=assignment.equipment, assignment=assignment, action='assigned',
+                to_directorate=directorate, to_room=room_number, performed_by=performed_by, timestamp=now,
+            )
+            for assignment in assignments
+        ])
+        ICTEquipment.objects.filter(pk__in=[device.pk for device in equipment]).update(
+            status='assigned', current_assignment=latest_active_assignment(), updated_at=now
+        )
+    invalidate_inventory_summary()
+    invalidate_scan_cache()
+    return assignments
+
+
+def return_batch(assignments, performed_by):
+    """Deactivate every (active) assignment in ``assignments`` and mark the devices available."""
+    assignments = list(assignments)
+    now = timezone.now()
+    with assignment_transaction():
+        lock_equipment([assignment.equipment_id for assignment in assignments])
+        check_active(assignments)
+        DeviceAssignment.objects.filter(pk__in=[assignment.pk for assignment in assignments]).update(
+            is_active=False, return_date=now, updated_at=now
+        )
+        DeviceHistory.objects.bulk_create([
+            DeviceHistory(
+                equipment_id=assignment.equipment_id, assignment=assignment, action='returned',
+                from_directorate=assignment.directorate, from_room=assignment.room_number,
+                performed_by=performed_by, timestamp=now,
+                notes=f"Device returned from {assignment.directorate}",
+            )
+            for assignment in assignments
+        ])
+        ICTEquipment.objects.filter(pk__in=[assignment.equipment_id for assignment in assignments]).update(
+            status='available', current_assignment=None, updated_at=now
+        )
+    invalidate_inventory_summary()
+    invalidate_scan_cache()
+    return assignments
+
+
+def backfill_current_assignments():
+    """Point every equipment row at its latest active assignment in one UPDATE."""
+    ICTEquipment.objects.update(current_assignment=latest_active_assignment())
+    return ICTEquipment.objects.filter(current_assignment__isnull=False).count()
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Scan answers, cached reports and the home page counters are
+    invalidated through the default cache, so production needs one that
+    every worker process shares.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'The default cache is local to each process.',
+        hint=('With more than one worker process, scans and cached reports go stale after '
+              'writes handled by another worker. Set REDIS_URL to a shared Redis instance.'),
+        obj='CACHES',
+        id='equipment.W001',
+    )]
@@ -66,6 +66,54 @@ class ICTEquipmentForm(forms.ModelForm):
         return asset_tag
 
 
+class EquipmentImportRowForm(forms.ModelForm):
+    """Validates one row of a bulk equipment import."""
+    
+    class Meta:
+        model = ICTEquipment
+        fields = ICTEquipmentForm.Meta.fields
+    
+    def clean_asset_tag(self):
+        return self.cleaned_data.get('asset_tag') or None
+    
+    def clean_status(self):
+        status = self.cleaned_data.get('status')
+        if status == 'assigned':
+            raise forms.ValidationError('Import devices as available and assign them from the assignment pages.')
+        return status
+    
+    def validate_unique(self):
+        # Checked for the whole file at once by equipment.imports.
+        pass
+
+
+class EquipmentImportForm(forms.Form):
+    """Upload form for bulk equipment imports."""
+    
+    file = forms.FileField(help_text="CSV or Excel (.xlsx) file with a header row")
+    skip_invalid = forms.BooleanField(
+        required=False, label="Import the valid rows even if some rows have errors"
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            'file',
+            'skip_invalid',
+            FormActions(
+                Submit('submit', 'Import Equipment', css_class='btn btn-primary'),
+                HTML('<a href="{% url "equipment:equipment_list" %}" class="btn btn-secondary">Cancel</a>'),
+            )
+        )
+    
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Upload a .csv or .xlsx file.')
+        return upload
+
+
 class DeviceAssignmentForm(forms.ModelForm):
     """Form for assigning devices to directorates. Fields: Equipment, Directorate, Room number, Assigned to, Office location."""
     
@@ -105,6 +153,48 @@ class DeviceAssignmentForm(forms.ModelForm):
         return inst
 
 
+class BatchAssignmentForm(forms.ModelForm):
+    """Assign several available devices to one directorate at once."""
+    
+    equipment = forms.ModelMultipleChoiceField(
+        queryset=ICTEquipment.objects.none(),
+        help_text="Hold Ctrl (Cmd on a Mac) to select several devices"
+    )
+    
+    class Meta:
+        model = DeviceAssignment
+        fields = ['directorate', 'room_number', 'assigned_to', 'office_location']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['equipment'].queryset = ICTEquipment.objects.filter(status='available').order_by('equipment_type', 'brand', 'serial_number')
+        self.fields['equipment'].widget.attrs['size'] = 15
+        self.fields['assigned_to'].queryset = User.objects.filter(is_active=True).order_by('last_name', 'first_name')
+        self.fields['directorate'].queryset = Directorate.objects.all().order_by('name')
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            Field('equipment', css_class='form-select mb-3'),
+            Field('directorate', css_class='form-select mb-3'),
+            Row(
+                Column('room_number', css_class='col-md-6 mb-3'),
+                Column('office_location', css_class='col-md-6 mb-3'),
+            ),
+            Field('assigned_to', css_class='form-select mb-3'),
+            FormActions(
+                Submit('submit', 'Assign Devices', css_class='btn btn-primary'),
+                HTML('<a href="{% url "equipment:assignment_list" %}" class="btn btn-secondary">Cancel</a>'),
+            )
+        )
+
+
+class BatchReturnForm(forms.Form):
+    """Return several devices at once."""
+    
+    assignments = forms.ModelMultipleChoiceField(
+        queryset=DeviceAssignment.objects.filter(is_active=True).select_related('directorate')
+    )
+
+
 class DirectorateForm(forms.ModelForm):
     """Form for creating and editing directorates."""
     
@@ -183,3 +273,26 @@ class DeviceIssueResolutionForm(forms.ModelForm):
             )
         )
 
+
+
+class InventoryAsOfForm(forms.Form):
+    """Point-in-time inventory filter: a day and, optionally, a directorate or device."""
+    
+    date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}), help_text="Holdings at the end of this day")
+    directorate = forms.ModelChoiceField(
+        queryset=Directorate.objects.all(), required=False, empty_label="All Directorates"
+    )
+    equipment = forms.ModelChoiceField(queryset=ICTEquipment.objects.all(), required=False, widget=forms.HiddenInput)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.form_method = 'get'
+        self.helper.layout = Layout(
+            Row(
+                Column('date', css_class='col-md-5'),
+                Column('directorate', css_class='col-md-5'),
+                Column(HTML('<button type="submit" class="btn btn-primary w-100 mt-md-4">Show</button>'), css_class='col-md-2'),
+            ),
+            'equipment',
+        )
@@ -0,0 +1,56 @@
+"""
+Hot and archived device history.
+
+``DeviceHistory`` keeps the recent movements of every device. Rows older
+than ``settings.DEVICE_HISTORY_HOT_DAYS`` are moved in batches to
+``ArchivedDeviceHistory`` (same columns and IDs) by
+``archive_device_history``, so the table the detail pages, dashboards
+and admin read stays small. ``equipment_history`` reads one device's
+entries from both tables, newest first.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedDeviceHistory, DeviceHistory
+
+ARCHIVE_BATCH_SIZE = 1000
+HISTORY_FIELDS = [field.attname for field in DeviceHistory._meta.concrete_fields]
+RELATED_FIELDS = ('from_directorate', 'to_directorate', 'performed_by')
+
+
+def equipment_history(equipment, limit=None):
+    """``equipment``'s hot and archived history entries merged, newest first."""
+    sources = []
+    for queryset in (equipment.history.all(), equipment.archived_history.all()):
+        queryset = queryset.select_related(*RELATED_FIELDS).order_by('-timestamp', '-pk')
+        sources.append(queryset[:limit] if limit else queryset)
+    merged = heapq.merge(*sources, key=lambda entry: (entry.timestamp, entry.pk), reverse=True)
+    return list(islice(merged, limit))
+
+
+def archive_device_history(older_than_days=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move history entries older than ``older_than_days`` (default
+    ``settings.DEVICE_HISTORY_HOT_DAYS``) to the archive, oldest first,
+    one transaction per batch. Returns the number of entries moved.
+    """
+    if older_than_days is None:
+        older_than_days = settings.DEVICE_HISTORY_HOT_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                DeviceHistory.objects.filter(timestamp__lt=cutoff).order_by('timestamp', 'pk')
+                .values(*HISTORY_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return moved
+            ArchivedDeviceHistory.objects.bulk_create([ArchivedDeviceHistory(**row) for row in rows])
+            DeviceHistory.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
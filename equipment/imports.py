@@ -0,0 +1,183 @@
+"""
+Bulk equipment import from CSV or XLSX files.
+
+The first row holds column names matching ``ICTEquipmentForm`` fields
+(``serial_number``, ``asset_tag``, ...; case and spaces are ignored).
+Rows are validated with ``EquipmentImportRowForm``. Serial numbers and
+asset tags are then checked against the file and the database with one
+query, and valid rows are inserted with chunked ``bulk_create`` inside a
+transaction. Unless ``skip_invalid`` is set, a file with any bad row
+inserts nothing, so a corrected file can simply be imported again.
+"""
+import csv
+import io
+import os
+import zipfile
+from collections import Counter, namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .forms import EquipmentImportRowForm
+from .inventory import invalidate_inventory_summary
+from .scans import invalidate_scan_cache
+from .models import ICTEquipment
+from .search import index_equipment
+
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ROWS = 10000
+REQUIRED_COLUMNS = ('equipment_type', 'brand', 'model', 'serial_number')
+IMPORT_COLUMNS = EquipmentImportRowForm.Meta.fields
+# Columns a file may leave out or blank, filled from the model defaults.
+DEFAULTS = {name: ICTEquipment._meta.get_field(name).default for name in ('condition', 'status')}
+
+RowError = namedtuple('RowError', ['row_number', 'messages'])
+ImportResult = namedtuple('ImportResult', ['total_rows', 'created', 'errors'])
+
+
+def column_key(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def cell_value(value):
+    # Spreadsheet numbers come back as floats: 12345 -> 12345.0.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return '' if value is None else value
+
+
+def read_csv(upload):
+    text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    try:
+        for row in csv.reader(text):
+            # Python's csv module passes NUL bytes through, but PostgreSQL
+            # text columns cannot store them.
+            if any('\x00' in value for value in row):
+                raise csv.Error('line contains NUL')
+            yield row
+    except (csv.Error, UnicodeDecodeError) as exc:
+        # Binary data, another encoding or a malformed line.
+        raise ValueError('The file is not a valid .csv file.') from exc
+    finally:
+        text.detach()
+
+
+def read_xlsx(upload):
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        # A corrupt or renamed file is not a zip archive, or lacks the parts
+        # of a workbook.
+        raise ValueError('The file is not a valid .xlsx file.') from exc
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [cell_value(value) for value in row]
+    finally:
+        workbook.close()
+
+
+READERS = {
+    '.csv': read_csv,
+    '.xlsx': read_xlsx,
+}
+
+
+def read_rows(upload, filename):
+    """
+    ``(row_number, {column: value})`` for each non-blank data row, where
+    ``row_number`` is the row's line in the file (the header is row 1).
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in READERS:
+        raise ValueError('Upload a .csv or .xlsx file.')
+    rows = READERS[extension](upload)
+    header = [column_key(name) for name in next(rows, [])]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}.")
+    for row_number, row in enumerate(rows, start=2):
+        if row_number - 1 > MAX_IMPORT_ROWS:
+            raise ValueError(f'Files are limited to {MAX_IMPORT_ROWS} rows.')
+        values = {name: value for name, value in zip(header, row) if name in IMPORT_COLUMNS}
+        if any(str(value).strip() for value in values.values()):
+            yield row_number, values
+
+
+def validate_rows(rows):
+    """Validate each row on its own; returns ``(valid [(row_number, data)], errors)``."""
+    valid, errors = [], []
+    for row_number, values in rows:
+        form = EquipmentImportRowForm(data={
+            **DEFAULTS, **{name: value for name, value in values.items() if str(value).strip()}
+        })
+        if form.is_valid():
+            valid.append((row_number, form.cleaned_data))
+        else:
+            errors.append(RowError(row_number, [
+                f'{field}: {message}' if field != '__all__' else message
+                for field, messages in form.errors.items() for message in messages
+            ]))
+    return valid, errors
+
+
+def check_uniqueness(valid):
+    """
+    Split ``valid`` rows into unique ones and errors for serial numbers or
+    asset tags repeated in the file or already recorded.
+    """
+    serials = Counter(data['serial_number'] for _row, data in valid)
+    tags = Counter(data['asset_tag'] for _row, data in valid if data['asset_tag'])
+    existing_serials, existing_tags = set(), set()
+    if valid:
+        for serial, tag in ICTEquipment.objects.filter(
+            Q(serial_number__in=list(serials)) | Q(asset_tag__in=list(tags))
+        ).order_by().values_list('serial_number', 'asset_tag'):
+            existing_serials.add(serial)
+            existing_tags.add(tag)
+
+    unique, errors = [], []
+    for row_number, data in valid:
+        messages = []
+        serial, tag = data['serial_number'], data['asset_tag']
+        if serial in existing_serials:
+            messages.append(f'serial_number: {serial} is already recorded.')
+        elif serials[serial] > 1:
+            messages.append(f'serial_number: {serial} appears more than once in the file.')
+        if tag and tag in existing_tags:
+            messages.append(f'asset_tag: {tag} is already recorded.')
+        elif tag and tags[tag] > 1:
+            messages.append(f'asset_tag: {tag} appears more than once in the file.')
+        if messages:
+            errors.append(RowError(row_number, messages))
+        else:
+            unique.append((row_number, data))
+    return unique, errors
+
+
+def import_equipment(upload, filename, created_by=None, skip_invalid=False, batch_size=IMPORT_BATCH_SIZE):
+    """Import equipment from an open binary file; returns an ``ImportResult``."""
+    rows = list(read_rows(upload, filename))
+    valid, errors = validate_rows(rows)
+    valid, duplicate_errors = check_uniqueness(valid)
+    errors = sorted(errors + duplicate_errors)
+    if errors and not skip_invalid:
+        return ImportResult(len(rows), 0, errors)
+
+    equipment = [ICTEquipment(created_by=created_by, **data) for _row, data in valid]
+    for device in equipment:
+        device.set_search_keys()
+    try:
+        with transaction.atomic():
+            ICTEquipment.objects.bulk_create(equipment, batch_size=batch_size)
+            index_equipment(equipment, created=True)
+    except IntegrityError:
+        # Another import or form post recorded one of the same devices
+        # after the uniqueness check.
+        raise ValueError('Some of these devices were recorded while the file was being imported; '
+                         'nothing was imported, please try again.')
+    if equipment:
+        invalidate_inventory_summary()
+        invalidate_scan_cache()
+    return ImportResult(len(rows), len(equipment), errors)
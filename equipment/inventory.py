@@ -0,0 +1,53 @@
+"""
+Inventory summary: equipment counts by status and by condition.
+
+All counts come from one conditional aggregate over ICTEquipment. The
+result is cached until equipment is saved or deleted (see
+equipment.signals). Code that writes equipment with ``update()`` or
+``bulk_create()`` must call ``invalidate_inventory_summary`` itself.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import ICTEquipment
+
+CACHE_KEY = 'equipment:inventory-summary'
+CACHE_TIMEOUT = 60 * 60
+
+STATUS_CHOICES = ICTEquipment._meta.get_field('status').choices
+CONDITION_CHOICES = ICTEquipment.CONDITION_CHOICES
+
+
+def compute_inventory_summary():
+    """
+    ``{'total': n, 'status': {value: n}, 'condition': {value: n}}`` with
+    every choice present, from a single query.
+    """
+    aggregates = {'total': Count('id')}
+    for value, _label in STATUS_CHOICES:
+        aggregates[f'status_{value}'] = Count('id', filter=Q(status=value))
+    for value, _label in CONDITION_CHOICES:
+        aggregates[f'condition_{value}'] = Count('id', filter=Q(condition=value))
+    counts = ICTEquipment.objects.order_by().aggregate(**aggregates)
+    return {
+        'total': counts['total'],
+        'status': {value: counts[f'status_{value}'] for value, _label in STATUS_CHOICES},
+        'condition': {value: counts[f'condition_{value}'] for value, _label in CONDITION_CHOICES},
+    }
+
+
+def inventory_summary():
+    """Cached ``compute_inventory_summary``."""
+    summary = cache.get(CACHE_KEY)
+    if summary is None:
+        summary = compute_inventory_summary()
+        cache.set(CACHE_KEY, summary, CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_inventory_summary():
+    # Dropping the entry again on commit stops a request that read the
+    # old rows mid-transaction from leaving a stale summary behind.
+    cache.delete(CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from equipment.history import ARCHIVE_BATCH_SIZE, archive_device_history
+
+
+class Command(BaseCommand):
+    help = 'Move device history entries older than DEVICE_HISTORY_HOT_DAYS to the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=None,
+            help=f'Archive entries older than this many days (default {settings.DEVICE_HISTORY_HOT_DAYS}).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+            help='Entries moved per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        moved = archive_device_history(options['older_than_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} device history entries.'))
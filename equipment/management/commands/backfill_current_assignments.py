@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from equipment.assignments import backfill_current_assignments
+
+
+class Command(BaseCommand):
+    help = "Point every equipment record at its latest active assignment."
+
+    def handle(self, *args, **options):
+        count = backfill_current_assignments()
+        self.stdout.write(self.style.SUCCESS(f'{count} equipment currently assigned.'))
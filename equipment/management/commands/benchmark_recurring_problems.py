@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from equipment.models import ICTEquipment, DeviceIssue
+from equipment.recurring import rebuild_issue_index
+from equipment.views import IssueListView
+from users.models import CustomUser
+
+TITLES = [
+    'Network connectivity failure in office',
+    'Printer paper jammed during printing',
+    'Screen flickering after software update',
+    'Battery not charging properly',
+    'Power supply fault after outage',
+    'Keyboard keys unresponsive',
+    'Slow performance when opening files',
+    'Hardware fault reported by officer',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the issue list page (including recurring-problem detection) over '
+        'growing issue histories. All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--issues', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Issue history sizes to benchmark at.',
+        )
+        parser.add_argument('--equipment', type=int, default=500, help='Equipment the issues are spread over.')
+        parser.add_argument('--repeat', type=int, default=5, help='Page loads timed per size (median reported).')
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['issues'])
+        self.stdout.write(f"{'issues':>10}{'queries':>10}{'page ms':>10}{'index rebuild s':>18}")
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(username='issue-benchmark', email='issue-benchmark@example.com')
+            equipment = ICTEquipment.objects.bulk_create([
+                ICTEquipment(equipment_type='laptop', brand='Bench', model=f'M{i}', serial_number=f'BENCH-{i}')
+                for i in range(options['equipment'])
+            ])
+            request = RequestFactory().get('/equipment/issues/')
+            request.user = user
+
+            created = 0
+            for size in sizes:
+                # bulk_create skips the index signals; the rebuild below
+                # brings the index up to date, as the command would.
+                DeviceIssue.objects.bulk_create(
+                    [
+                        DeviceIssue(
+                            equipment=equipment[i % len(equipment)], title=TITLES[i % len(TITLES)],
+                            description='Synthetic benchmark issue', reported_by=user,
+                        )
+                        for i in range(created, size)
+                    ],
+                    batch_size=1000,
+                )
+                created = size
+                started = time.perf_counter()
+                rebuild_issue_index()
+                rebuild_seconds = time.perf_counter() - started
+
+                timings = []
+                for _ in range(options['repeat']):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        IssueListView.as_view()(request).render()
+                        timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f'{size:>10}{len(queries):>10}{statistics.median(timings):>10.1f}{rebuild_seconds:>18.2f}'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment.imports import IMPORT_BATCH_SIZE, import_equipment
+
+
+class Command(BaseCommand):
+    help = 'Import equipment from a CSV or XLSX file with a header row of equipment field names.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The .csv or .xlsx file to import.')
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Import the valid rows even if some rows have errors.',
+        )
+        parser.add_argument('--user', help='Username recorded as the creator of the equipment.')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Rows inserted per query.',
+        )
+
+    def handle(self, *args, **options):
+        created_by = None
+        if options['user']:
+            try:
+                created_by = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {options['user']}.")
+
+        try:
+            with open(options['path'], 'rb') as upload:
+                result = import_equipment(
+                    upload, options['path'], created_by=created_by,
+                    skip_invalid=options['skip_invalid'], batch_size=options['batch_size'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"Row {error.row_number}: {' '.join(error.messages)}")
+        if result.errors and not result.created:
+            raise CommandError(
+                f'{len(result.errors)} of {result.total_rows} rows have errors; nothing was imported.'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Imported {result.created} of {result.total_rows} rows.'))
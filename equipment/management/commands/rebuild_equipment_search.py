@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from equipment.search import INDEX_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the equipment search keys (normalized serial numbers and asset tags) and trigrams.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=INDEX_BATCH_SIZE,
+            help='Equipment records updated per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} equipment records for search.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from equipment.recurring import rebuild_issue_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the recurring-problem index (issue title word counts per equipment).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows read and inserted per query.',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_issue_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed issues for {count} equipment.'))
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.models import Count
+
+from equipment.assignments import AssignmentConflict, assign_equipment, return_assignment
+from equipment.models import DeviceAssignment, Directorate, ICTEquipment
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Concurrent load test for assigning and returning devices: several threads, each '
+        'with its own database connection, race to assign and return the same few devices. '
+        'Fails if any device ends up with more than one active assignment. The synthetic '
+        'devices, directorate and user are deleted afterwards. Run it against PostgreSQL; '
+        'SQLite serialises writers, so it only exercises the constraint there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent threads.')
+        parser.add_argument('--devices', type=int, default=3, help='Devices the threads compete for.')
+        parser.add_argument('--rounds', type=int, default=50, help='Assign/return attempts per thread.')
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.create_user(username='assignment-stress', email='assignment-stress@example.com')
+        directorate = Directorate.objects.create(name='Assignment stress test', code='STRESS')
+        devices = ICTEquipment.objects.bulk_create([
+            ICTEquipment(equipment_type='laptop', brand='Stress', model='Test', serial_number=f'STRESS-{i}')
+            for i in range(options['devices'])
+        ])
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(index):
+            try:
+                for round_number in range(options['rounds']):
+                    device = devices[(index + round_number) % len(devices)]
+                    outcome = self.attempt(device, directorate, user)
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                list(pool.map(worker, range(options['workers'])))
+            elapsed = time.perf_counter() - started
+            duplicated = DeviceAssignment.objects.filter(equipment__in=devices, is_active=True).values(
+                'equipment'
+            ).annotate(count=Count('pk')).filter(count__gt=1).count()
+            mismatched = sum(
+                1 for device in ICTEquipment.objects.filter(pk__in=[device.pk for device in devices])
+                if device.current_assignment_id != DeviceAssignment.objects.filter(
+                    equipment=device, is_active=True
+                ).values_list('pk', flat=True).first()
+            )
+        finally:
+            ICTEquipment.objects.filter(pk__in=[device.pk for device in devices]).delete()
+            directorate.delete()
+            user.delete()
+
+        for outcome in ('assigned', 'returned', 'conflict', 'database error'):
+            self.stdout.write(f'{outcome:<16}{outcomes[outcome]:>8}')
+        self.stdout.write(f"{'seconds':<16}{elapsed:>8.2f}")
+        if duplicated or mismatched:
+            raise CommandError(
+                f'{duplicated} devices with several active assignments, '
+                f'{mismatched} with a wrong current_assignment.'
+            )
+        self.stdout.write(self.style.SUCCESS('No device ended up with more than one active assignment.'))
+
+    def attempt(self, device, directorate, user):
+        """Assign ``device`` if it looks free, otherwise return its active assignment."""
+        try:
+            active = DeviceAssignment.objects.filter(equipment=device, is_active=True).first()
+            if active is None:
+                assign_equipment(DeviceAssignment(equipment_id=device.pk, directorate=directorate, issued_by=user), user)
+                return 'assigned'
+            return_assignment(active, user)
+            return 'returned'
+        except AssignmentConflict:
+            return 'conflict'
+        except DatabaseError:
+            # Raised outside the locked section, e.g. by the lookup above.
+            return 'database error'
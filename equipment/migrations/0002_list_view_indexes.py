@@ -0,0 +1,61 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deviceassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-assigned_date'], name='assign_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['directorate', '-assigned_date'], name='assign_active_dir_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['equipment'], name='assign_active_equipment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicehistory',
+            index=models.Index(fields=['equipment', '-timestamp'], name='history_equipment_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicehistory',
+            index=models.Index(fields=['-timestamp'], name='history_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceissue',
+            index=models.Index(fields=['-reported_at'], name='issue_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceissue',
+            index=models.Index(fields=['status', '-reported_at'], name='issue_status_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceissue',
+            index=models.Index(fields=['severity', '-reported_at'], name='issue_severity_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deviceissue',
+            index=models.Index(fields=['equipment', 'status'], name='issue_equipment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ictequipment',
+            index=models.Index(fields=['-created_at'], name='equipment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ictequipment',
+            index=models.Index(fields=['status', '-created_at'], name='equipment_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ictequipment',
+            index=models.Index(fields=['condition', '-created_at'], name='equipment_cond_created_idx'),
+        ),
+    ]
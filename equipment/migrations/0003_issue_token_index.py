@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_list_view_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_tokens', to='equipment.ictequipment')),
+            ],
+            options={
+                'verbose_name': 'Issue Token',
+                'verbose_name_plural': 'Issue Tokens',
+            },
+        ),
+        migrations.CreateModel(
+            name='EquipmentIssueSummary',
+            fields=[
+                ('equipment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='issue_summary', serialize=False, to='equipment.ictequipment')),
+                ('issue_count', models.IntegerField(default=0)),
+                ('top_token', models.CharField(blank=True, max_length=200)),
+                ('top_token_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Equipment Issue Summary',
+                'verbose_name_plural': 'Equipment Issue Summaries',
+                'indexes': [models.Index(condition=models.Q(('issue_count__gte', 2), ('top_token_count__gte', 2)), fields=['-issue_count', 'equipment'], name='issuesummary_recurring_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='issuetoken',
+            constraint=models.UniqueConstraint(fields=('equipment', 'token'), name='issuetoken_equipment_token_key'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_current_assignments(apps, schema_editor):
+    ICTEquipment = apps.get_model('equipment', 'ICTEquipment')
+    DeviceAssignment = apps.get_model('equipment', 'DeviceAssignment')
+    latest_active = DeviceAssignment.objects.filter(
+        equipment=models.OuterRef('pk'), is_active=True
+    ).order_by('-assigned_date', '-pk').values('pk')[:1]
+    ICTEquipment.objects.update(current_assignment=models.Subquery(latest_active))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_issue_token_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ictequipment',
+            name='current_assignment',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment.deviceassignment'),
+        ),
+        migrations.RunPython(backfill_current_assignments, migrations.RunPython.noop),
+    ]
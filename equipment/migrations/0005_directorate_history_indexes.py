@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_current_assignment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='devicehistory',
+            index=models.Index(fields=['from_directorate', '-timestamp'], name='history_from_dir_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devicehistory',
+            index=models.Index(fields=['to_directorate', '-timestamp'], name='history_to_dir_time_idx'),
+        ),
+    ]
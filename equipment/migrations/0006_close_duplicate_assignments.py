@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:23
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def close_duplicate_assignments(apps, schema_editor):
+    """
+    Keep only the latest active assignment of each device (the one
+    current_assignment points at) so the constraint can be added.
+    """
+    DeviceAssignment = apps.get_model('equipment', 'DeviceAssignment')
+    latest_active = DeviceAssignment.objects.filter(
+        equipment=models.OuterRef('equipment'), is_active=True
+    ).order_by('-assigned_date', '-pk').values('pk')[:1]
+    duplicated = DeviceAssignment.objects.filter(is_active=True).values('equipment').annotate(
+        count=models.Count('pk')
+    ).filter(count__gt=1).values('equipment')
+    now = timezone.now()
+    DeviceAssignment.objects.filter(is_active=True, equipment__in=duplicated).exclude(
+        pk=models.Subquery(latest_active)
+    ).update(is_active=False, return_date=now, updated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_directorate_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_assignments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0006_close_duplicate_assignments'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='deviceassignment',
+            name='assign_active_equipment_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='deviceassignment',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('equipment',), name='assign_one_active_per_equipment'),
+        ),
+    ]
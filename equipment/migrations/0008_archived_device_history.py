@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipment', '0007_one_active_assignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDeviceHistory',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('assigned', 'Assigned'), ('relocated', 'Relocated'), ('returned', 'Returned'), ('repaired', 'Repaired'), ('replaced', 'Replaced'), ('condition_changed', 'Condition Changed'), ('status_changed', 'Status Changed')], max_length=30)),
+                ('from_room', models.CharField(blank=True, max_length=50)),
+                ('to_room', models.CharField(blank=True, max_length=50)),
+                ('notes', models.TextField(blank=True)),
+                ('timestamp', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment.deviceassignment')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_history', to='equipment.ictequipment')),
+                ('from_directorate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment.directorate')),
+                ('performed_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('to_directorate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipment.directorate')),
+            ],
+            options={
+                'verbose_name': 'Archived Device History',
+                'verbose_name_plural': 'Archived Device History',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['equipment', '-timestamp'], name='archived_history_equip_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX assign_period_gist_idx ON equipment_deviceassignment
+    USING gist (tstzrange(assigned_date, return_date, '[)'))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS assign_period_gist_idx",
+]
+
+# Periods are stored in Julian days; an open period ends on 9999-12-31.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE equipment_assignment_period USING rtree(id, starts, ends)",
+    """
+    CREATE TRIGGER equipment_assignment_period_insert AFTER INSERT ON equipment_deviceassignment BEGIN
+        INSERT INTO equipment_assignment_period(id, starts, ends)
+        VALUES (new.id, julianday(new.assigned_date), COALESCE(julianday(new.return_date), 5373484.5));
+    END
+    """,
+    """
+    CREATE TRIGGER equipment_assignment_period_delete AFTER DELETE ON equipment_deviceassignment BEGIN
+        DELETE FROM equipment_assignment_period WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER equipment_assignment_period_update
+    AFTER UPDATE OF assigned_date, return_date ON equipment_deviceassignment BEGIN
+        UPDATE equipment_assignment_period
+        SET starts = julianday(new.assigned_date), ends = COALESCE(julianday(new.return_date), 5373484.5)
+        WHERE id = new.id;
+    END
+    """,
+    """
+    INSERT INTO equipment_assignment_period(id, starts, ends)
+    SELECT id, julianday(assigned_date), COALESCE(julianday(return_date), 5373484.5)
+    FROM equipment_deviceassignment
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS equipment_assignment_period_insert",
+    "DROP TRIGGER IF EXISTS equipment_assignment_period_delete",
+    "DROP TRIGGER IF EXISTS equipment_assignment_period_update",
+    "DROP TABLE IF EXISTS equipment_assignment_period",
+]
+
+
+def sqlite_has_rtree(cursor):
+    cursor.execute("PRAGMA compile_options")
+    return any(row[0] == 'ENABLE_RTREE' for row in cursor.fetchall())
+
+
+def run_statements(schema_editor, postgres, sqlite):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            statements = postgres
+        elif connection.vendor == 'sqlite' and sqlite_has_rtree(cursor):
+            statements = sqlite
+        else:
+            # No interval index; equipment.snapshots filters the assignment table.
+            return
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_period_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_period_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_REVERSE, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0008_archived_device_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
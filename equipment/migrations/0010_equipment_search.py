@@ -0,0 +1,91 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX equipment_serial_key_trgm_idx ON equipment_ictequipment USING gin (serial_key gin_trgm_ops)",
+    "CREATE INDEX equipment_asset_tag_key_trgm_idx ON equipment_ictequipment USING gin (asset_tag_key gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS equipment_serial_key_trgm_idx",
+    "DROP INDEX IF EXISTS equipment_asset_tag_key_trgm_idx",
+]
+
+
+def search_key(value):
+    return ''.join(char for char in (value or '').upper() if char.isascii() and char.isalnum())
+
+
+def trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if key else set()
+
+
+def backfill_search_index(apps, schema_editor):
+    ICTEquipment = apps.get_model('equipment', 'ICTEquipment')
+    EquipmentTrigram = apps.get_model('equipment', 'EquipmentTrigram')
+    postgres = schema_editor.connection.vendor == 'postgresql'
+    equipment = list(ICTEquipment.objects.only('serial_number', 'asset_tag'))
+    for device in equipment:
+        device.serial_key = search_key(device.serial_number)
+        device.asset_tag_key = search_key(device.asset_tag)
+    ICTEquipment.objects.bulk_update(equipment, ['serial_key', 'asset_tag_key'], batch_size=1000)
+    if postgres:
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+    else:
+        # pg_trgm replaces the side table on PostgreSQL.
+        EquipmentTrigram.objects.bulk_create(
+            [
+                EquipmentTrigram(equipment_id=device.pk, trigram=trigram)
+                for device in equipment
+                for trigram in sorted(trigrams(device.serial_key) | trigrams(device.asset_tag_key))
+            ],
+            batch_size=1000,
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_REVERSE:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0009_assignment_periods'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ictequipment',
+            name='asset_tag_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='ictequipment',
+            name='serial_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='EquipmentTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to='equipment.ictequipment')),
+            ],
+            options={
+                'verbose_name': 'Equipment Trigram',
+                'verbose_name_plural': 'Equipment Trigrams',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='equipmenttrigram',
+            constraint=models.UniqueConstraint(fields=('trigram', 'equipment'), name='equipment_trigram_key'),
+        ),
+        migrations.RunPython(backfill_search_index, drop_trigram_indexes),
+    ]
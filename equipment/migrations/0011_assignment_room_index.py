@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0010_equipment_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deviceassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['room_number'], name='assign_active_room_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0011_assignment_room_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deviceissue',
+            index=models.Index(fields=['resolved_at'], name='issue_resolved_idx'),
+        ),
+    ]
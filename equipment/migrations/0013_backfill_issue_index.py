@@ -0,0 +1,56 @@
+from collections import Counter
+
+from django.db import migrations
+
+# Words of this length or shorter are not indexed.
+MAX_IGNORED_LENGTH = 4
+
+
+def issue_tokens(title):
+    return Counter(word for word in title.lower().split() if len(word) > MAX_IGNORED_LENGTH)
+
+
+def backfill_issue_index(apps, schema_editor):
+    """
+    0003_issue_token_index added the token and summary tables without
+    indexing the issues already reported, which the recurring-problem
+    panels then never showed. Count their title words per equipment here.
+    """
+    DeviceIssue = apps.get_model('equipment', 'DeviceIssue')
+    IssueToken = apps.get_model('equipment', 'IssueToken')
+    EquipmentIssueSummary = apps.get_model('equipment', 'EquipmentIssueSummary')
+
+    tokens = {}
+    issue_counts = Counter()
+    for equipment_id, title in DeviceIssue.objects.order_by().values_list('equipment_id', 'title').iterator(chunk_size=1000):
+        issue_counts[equipment_id] += 1
+        tokens.setdefault(equipment_id, Counter()).update(issue_tokens(title))
+
+    summaries = []
+    token_rows = []
+    for equipment_id, count in issue_counts.items():
+        counts = tokens[equipment_id]
+        top, top_count = min(counts.items(), key=lambda item: (-item[1], item[0]), default=('', 0))
+        summaries.append(EquipmentIssueSummary(
+            equipment_id=equipment_id, issue_count=count, top_token=top, top_token_count=top_count,
+        ))
+        token_rows.extend(
+            IssueToken(equipment_id=equipment_id, token=token, count=token_count)
+            for token, token_count in counts.items()
+        )
+
+    IssueToken.objects.all().delete()
+    EquipmentIssueSummary.objects.all().delete()
+    EquipmentIssueSummary.objects.bulk_create(summaries, batch_size=1000)
+    IssueToken.objects.bulk_create(token_rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0012_issue_resolved_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_issue_index, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,11 @@ from django.core.validators import MinValueValidator
 User = get_user_model()
 
 
+def search_key(value):
+    """``value`` upper-cased with everything but ASCII letters and digits removed (``sn-0042 a`` -> ``SN0042A``)."""
+    return ''.join(char for char in (value or '').upper() if char.isascii() and char.isalnum())
+
+
 class Directorate(models.Model):
     """Directorate model for organizing equipment assignments."""
     
@@ -57,6 +62,9 @@ class ICTEquipment(models.Model):
     model = models.CharField(max_length=100)
     serial_number = models.CharField(max_length=100, unique=True, help_text="Unique serial number")
     asset_tag = models.CharField(max_length=50, unique=True, blank=True, null=True, help_text="Ministry asset tag")
+    # Normalized serial number and asset tag for search (see equipment.search).
+    serial_key = models.CharField(max_length=100, blank=True, db_index=True, editable=False)
+    asset_tag_key = models.CharField(max_length=50, blank=True, db_index=True, editable=False)
     
     # Purchase Information
     purchase_date = models.DateField(null=True, blank=True)
@@ -77,6 +85,12 @@ class ICTEquipment(models.Model):
     specifications = models.TextField(blank=True, help_text="Technical specifications")
     notes = models.TextField(blank=True, help_text="Additional notes")
     
+    # The active assignment, maintained by equipment.assignments.
+    current_assignment = models.ForeignKey(
+        'DeviceAssignment', on_delete=models.SET_NULL, null=True, blank=True,
+        editable=False, related_name='+'
+    )
+    
     # Tracking
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_equipment')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -86,13 +100,30 @@ class ICTEquipment(models.Model):
         ordering = ['-created_at']
         verbose_name = 'ICT Equipment'
         verbose_name_plural = 'ICT Equipment'
+        indexes = [
+            models.Index(fields=['-created_at'], name='equipment_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='equipment_status_created_idx'),
+            models.Index(fields=['condition', '-created_at'], name='equipment_cond_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_equipment_type_display()} - {self.brand} {self.model} ({self.serial_number})"
     
+    def save(self, *args, **kwargs):
+        self.set_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'serial_number', 'asset_tag'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'serial_key', 'asset_tag_key'}
+        super().save(*args, **kwargs)
+    
+    def set_search_keys(self):
+        """Refresh the normalized keys; ``save`` does this, ``bulk_create`` callers must."""
+        self.serial_key = search_key(self.serial_number)
+        self.asset_tag_key = search_key(self.asset_tag)
+    
     def get_current_assignment(self):
         """Get the current active assignment."""
-        return self.assignments.filter(is_active=True).first()
+        return self.current_assignment
     
     def get_condition_class(self):
         """Return CSS class for condition."""
@@ -133,6 +164,30 @@ class DeviceAssignment(models.Model):
         ordering = ['-assigned_date']
         verbose_name = 'Device Assignment'
         verbose_name_plural = 'Device Assignments'
+        indexes = [
+            # The assignment list and dashboards only ever show active rows.
+            models.Index(
+                fields=['-assigned_date'], name='assign_active_date_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['directorate', '-assigned_date'], name='assign_active_dir_date_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Room reconciliation during stock-takes.
+            models.Index(
+                fields=['room_number'], name='assign_active_room_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+        constraints = [
+            # A device can only be out on one assignment at a time. This
+            # also serves the index the active-assignment lookups need.
+            models.UniqueConstraint(
+                fields=['equipment'], name='assign_one_active_per_equipment',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.equipment} → {self.directorate} ({self.assigned_date.strftime('%Y-%m-%d')})"
@@ -176,6 +231,45 @@ class DeviceHistory(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Device History'
         verbose_name_plural = 'Device History'
+        indexes = [
+            models.Index(fields=['equipment', '-timestamp'], name='history_equipment_time_idx'),
+            models.Index(fields=['-timestamp'], name='history_time_idx'),
+            # Last movement per directorate on the directorate list.
+            models.Index(fields=['from_directorate', '-timestamp'], name='history_from_dir_time_idx'),
+            models.Index(fields=['to_directorate', '-timestamp'], name='history_to_dir_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment} - {self.get_action_display()} ({self.timestamp.strftime('%Y-%m-%d %H:%M')})"
+
+
+class ArchivedDeviceHistory(models.Model):
+    """
+    ``DeviceHistory`` rows older than ``settings.DEVICE_HISTORY_HOT_DAYS``,
+    moved here by ``archive_device_history`` with their original IDs so the
+    hot table stays small. Read both through ``equipment.history``.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    equipment = models.ForeignKey(ICTEquipment, on_delete=models.CASCADE, related_name='archived_history')
+    assignment = models.ForeignKey(DeviceAssignment, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    action = models.CharField(max_length=30, choices=DeviceHistory.ACTION_CHOICES)
+    from_directorate = models.ForeignKey(Directorate, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    to_directorate = models.ForeignKey(Directorate, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    from_room = models.CharField(max_length=50, blank=True)
+    to_room = models.CharField(max_length=50, blank=True)
+    performed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    notes = models.TextField(blank=True)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = 'Archived Device History'
+        verbose_name_plural = 'Archived Device History'
+        indexes = [
+            models.Index(fields=['equipment', '-timestamp'], name='archived_history_equip_idx'),
+        ]
     
     def __str__(self):
         return f"{self.equipment} - {self.get_action_display()} ({self.timestamp.strftime('%Y-%m-%d %H:%M')})"
@@ -224,6 +318,14 @@ class DeviceIssue(models.Model):
         ordering = ['-reported_at']
         verbose_name = 'Device Issue'
         verbose_name_plural = 'Device Issues'
+        indexes = [
+            models.Index(fields=['-reported_at'], name='issue_reported_idx'),
+            models.Index(fields=['status', '-reported_at'], name='issue_status_reported_idx'),
+            models.Index(fields=['severity', '-reported_at'], name='issue_severity_reported_idx'),
+            models.Index(fields=['equipment', 'status'], name='issue_equipment_status_idx'),
+            # Resolution-time (SLA) reports read the issues resolved in a window.
+            models.Index(fields=['resolved_at'], name='issue_resolved_idx'),
+        ]
     
     def __str__(self):
         return f"{self.equipment} - {self.title} ({self.get_severity_display()})"
@@ -246,3 +348,70 @@ class DeviceIssue(models.Model):
         }
         return severity_classes.get(self.severity, 'text-secondary')
 
+
+
+class EquipmentTrigram(models.Model):
+    """
+    One three-character slice of an equipment's normalized serial number
+    or asset tag. Used for fuzzy search where pg_trgm is not available;
+    kept current by equipment.signals.
+    """
+    
+    equipment = models.ForeignKey(ICTEquipment, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+    
+    class Meta:
+        verbose_name = 'Equipment Trigram'
+        verbose_name_plural = 'Equipment Trigrams'
+        constraints = [
+            models.UniqueConstraint(fields=['trigram', 'equipment'], name='equipment_trigram_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_id}: {self.trigram}"
+
+
+class IssueToken(models.Model):
+    """
+    How often a word appears across one equipment's issue titles. Kept
+    current by equipment.signals so recurring problems can be read
+    without re-tokenizing the issue history.
+    """
+    
+    equipment = models.ForeignKey(ICTEquipment, on_delete=models.CASCADE, related_name='issue_tokens')
+    token = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Issue Token'
+        verbose_name_plural = 'Issue Tokens'
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'token'], name='issuetoken_equipment_token_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_id}: {self.token} ×{self.count}"
+
+
+class EquipmentIssueSummary(models.Model):
+    """Issue count and most frequent title word for one equipment."""
+    
+    equipment = models.OneToOneField(ICTEquipment, on_delete=models.CASCADE, primary_key=True, related_name='issue_summary')
+    issue_count = models.IntegerField(default=0)
+    top_token = models.CharField(max_length=200, blank=True)
+    top_token_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Equipment Issue Summary'
+        verbose_name_plural = 'Equipment Issue Summaries'
+        indexes = [
+            # Only equipment with a recurring problem is ever listed.
+            models.Index(
+                fields=['-issue_count', 'equipment'], name='issuesummary_recurring_idx',
+                condition=models.Q(issue_count__gte=2, top_token_count__gte=2),
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_id}: {self.issue_count} issues"
@@ -0,0 +1,136 @@
+"""
+Incremental index of recurring device problems.
+
+``IssueToken`` counts the words (longer than four characters) in each
+equipment's issue titles and ``EquipmentIssueSummary`` keeps its issue
+count and most frequent word. Issue saves and deletes apply the
+difference (see equipment.signals), so listing recurring problems is one
+indexed query instead of re-reading every issue; ``rebuild_issue_index``
+recomputes everything and is what the ``rebuild_issue_index`` command runs.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DeviceIssue, IssueToken, EquipmentIssueSummary
+
+# Words of this length or shorter are ignored.
+MAX_IGNORED_LENGTH = 4
+RECURRING_THRESHOLD = 2
+TRACKED_FIELDS = ['equipment_id', 'title']
+
+
+def issue_tokens(title):
+    """Counter of the significant words in an issue title."""
+    return Counter(word for word in title.lower().split() if len(word) > MAX_IGNORED_LENGTH)
+
+
+def issue_state(issue):
+    """The fields the index depends on, or None if any were deferred."""
+    values = issue.__dict__
+    if any(field not in values for field in TRACKED_FIELDS):
+        return None
+    return {field: values[field] for field in TRACKED_FIELDS}
+
+
+def apply_issue_change(old_state, new_state):
+    """Move one issue's words from ``old_state`` to ``new_state`` (either may be None)."""
+    token_deltas = Counter()
+    issue_deltas = Counter()
+    for sign, state in ((-1, old_state), (1, new_state)):
+        if state is None:
+            continue
+        issue_deltas[state['equipment_id']] += sign
+        for token, count in issue_tokens(state['title']).items():
+            token_deltas[(state['equipment_id'], token)] += sign * count
+
+    changed = {equipment_id for equipment_id, delta in issue_deltas.items() if delta}
+    for (equipment_id, token), amount in token_deltas.items():
+        if amount:
+            _apply_token_delta(equipment_id, token, amount)
+            changed.add(equipment_id)
+
+    for equipment_id in changed:
+        IssueToken.objects.filter(equipment_id=equipment_id, count__lte=0).delete()
+        refresh_summary(equipment_id, issue_deltas[equipment_id])
+
+
+def _apply_token_delta(equipment_id, token, amount):
+    updated = IssueToken.objects.filter(equipment_id=equipment_id, token=token).update(count=F('count') + amount)
+    if updated or amount < 0:
+        return
+    try:
+        with transaction.atomic():
+            IssueToken.objects.create(equipment_id=equipment_id, token=token, count=amount)
+    except IntegrityError:
+        # Created concurrently by another save.
+        IssueToken.objects.filter(equipment_id=equipment_id, token=token).update(count=F('count') + amount)
+
+
+def top_token(equipment_id):
+    """(token, count) of the most frequent word for one equipment, or ('', 0)."""
+    return IssueToken.objects.filter(equipment_id=equipment_id).order_by('-count', 'token').values_list(
+        'token', 'count'
+    ).first() or ('', 0)
+
+
+def refresh_summary(equipment_id, issue_delta=0):
+    token, count = top_token(equipment_id)
+    updated = EquipmentIssueSummary.objects.filter(equipment_id=equipment_id).update(
+        issue_count=F('issue_count') + issue_delta, top_token=token, top_token_count=count,
+        updated_at=timezone.now(),
+    )
+    if not updated and issue_delta > 0:
+        # First issue for this equipment (or the index predates it).
+        rebuild_issue_index([equipment_id])
+    elif issue_delta < 0:
+        EquipmentIssueSummary.objects.filter(equipment_id=equipment_id, issue_count__lte=0).delete()
+
+
+def rebuild_issue_index(equipment_ids=None, batch_size=1000):
+    """Recompute token counts and summaries for ``equipment_ids`` (all equipment if None)."""
+    issues = DeviceIssue.objects.order_by()
+    if equipment_ids is not None:
+        issues = issues.filter(equipment_id__in=equipment_ids)
+
+    tokens = {}
+    issue_counts = Counter()
+    for equipment_id, title in issues.values_list('equipment_id', 'title').iterator(chunk_size=batch_size):
+        issue_counts[equipment_id] += 1
+        tokens.setdefault(equipment_id, Counter()).update(issue_tokens(title))
+
+    summaries = []
+    token_rows = []
+    for equipment_id, count in issue_counts.items():
+        counts = tokens[equipment_id]
+        top, top_count = min(counts.items(), key=lambda item: (-item[1], item[0]), default=('', 0))
+        summaries.append(EquipmentIssueSummary(
+            equipment_id=equipment_id, issue_count=count, top_token=top, top_token_count=top_count,
+        ))
+        token_rows.extend(
+            IssueToken(equipment_id=equipment_id, token=token, count=token_count)
+            for token, token_count in counts.items()
+        )
+
+    with transaction.atomic():
+        for model in (IssueToken, EquipmentIssueSummary):
+            stale = model.objects.all()
+            if equipment_ids is not None:
+                stale = stale.filter(equipment_id__in=equipment_ids)
+            stale.delete()
+        EquipmentIssueSummary.objects.bulk_create(summaries, batch_size=batch_size)
+        IssueToken.objects.bulk_create(token_rows, batch_size=batch_size)
+    return len(summaries)
+
+
+def recurring_problems(limit=None):
+    """
+    Summaries of equipment with at least two issues whose most frequent
+    title word occurs at least twice, most issues first.
+    """
+    summaries = EquipmentIssueSummary.objects.filter(
+        issue_count__gte=RECURRING_THRESHOLD, top_token_count__gte=RECURRING_THRESHOLD,
+    ).select_related('equipment').order_by('-issue_count', 'equipment')
+    return summaries[:limit] if limit else summaries
@@ -0,0 +1,144 @@
+"""
+Asset-tag scans for stock-takes.
+
+``scan_device`` answers one scanned asset tag or serial number with the
+device, its current assignment, directorate and room from one
+``select_related`` query. Answers are kept in a per-process LRU cache
+keyed on the code and the scan generation: a counter in the default
+cache that equipment, assignment and directorate saves and deletes bump
+(see equipment.signals). A repeat scan costs one read of that counter
+and no queries. With several worker processes the default cache must be
+Redis (REDIS_URL, see ``CACHES`` in settings) so every worker reads the
+new generation on its next scan; with the local-memory fallback the
+other workers would keep answering from stale rows. Code that writes
+those rows with ``update()`` or ``bulk_create()`` must call
+``invalidate_scan_cache`` itself.
+
+``reconcile_room`` checks a whole scanned room against the active
+assignments recorded for it in two queries.
+"""
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import DeviceAssignment, ICTEquipment, search_key
+
+SCAN_CACHE_SIZE = 4096
+GENERATION_KEY = 'equipment:scan-generation'
+MAX_ROOM_SCAN = 1000
+SCAN_RELATED = ('current_assignment__directorate', 'current_assignment__assigned_to')
+
+
+def scan_generation():
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def _bump_generation():
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def invalidate_scan_cache():
+    # Bumped again on commit so a scan that read the old rows
+    # mid-transaction cannot leave a stale answer behind.
+    _bump_generation()
+    transaction.on_commit(_bump_generation)
+
+
+def device_payload(equipment):
+    """JSON-ready description of ``equipment`` and where it is assigned."""
+    assignment = equipment.current_assignment
+    payload = {
+        'id': equipment.pk,
+        'serial_number': equipment.serial_number,
+        'asset_tag': equipment.asset_tag,
+        'equipment_type': equipment.equipment_type,
+        'brand': equipment.brand,
+        'model': equipment.model,
+        'status': equipment.status,
+        'condition': equipment.condition,
+        'assignment': None,
+    }
+    if assignment is not None:
+        directorate = assignment.directorate
+        officer = assignment.assigned_to
+        payload['assignment'] = {
+            'id': assignment.pk,
+            'directorate': directorate and {'id': directorate.pk, 'code': directorate.code, 'name': directorate.name},
+            'room_number': assignment.room_number,
+            'office_location': assignment.office_location,
+            'assigned_to': officer and (officer.get_full_name() or officer.username),
+            'assigned_date': assignment.assigned_date.isoformat(),
+        }
+    return payload
+
+
+def code_filter(codes):
+    """Q for devices whose asset tag or serial number is one of ``codes``, ignoring case and punctuation."""
+    keys = {search_key(code) for code in codes} - {''}
+    return (Q(asset_tag__in=codes) | Q(serial_number__in=codes) |
+            Q(asset_tag_key__in=keys) | Q(serial_key__in=keys))
+
+
+def match_codes(codes, devices):
+    """Map each of ``codes`` to the device it names (exact values first, then normalized keys)."""
+    by_value = {}
+    by_key = {}
+    for device in devices:
+        for value, key in ((device.asset_tag, device.asset_tag_key), (device.serial_number, device.serial_key)):
+            if value:
+                by_value.setdefault(value, device)
+                by_key.setdefault(key, device)
+    return {code: by_value.get(code) or by_key.get(search_key(code)) for code in codes}
+
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def _scan(code, generation):
+    devices = ICTEquipment.objects.filter(code_filter([code])).select_related(*SCAN_RELATED)
+    device = match_codes([code], devices)[code]
+    return device_payload(device) if device else None
+
+
+def scan_device(code):
+    """``device_payload`` for the device with asset tag or serial number ``code``, or None."""
+    code = code.strip()
+    if not search_key(code):
+        return None
+    return _scan(code, scan_generation())
+
+
+def reconcile_room(codes, room_number, directorate_id=None):
+    """
+    Compare the devices scanned in a room with its active assignments.
+
+    Returns ``{'present', 'missing', 'unexpected', 'unknown'}``: scanned
+    devices recorded in the room, recorded devices that were not scanned,
+    scanned devices recorded elsewhere (or nowhere), and codes that match
+    no device. Raises ValueError for more than ``MAX_ROOM_SCAN`` codes.
+    """
+    codes = list(dict.fromkeys(code.strip() for code in codes if search_key(code)))
+    if len(codes) > MAX_ROOM_SCAN:
+        raise ValueError(f'Scan at most {MAX_ROOM_SCAN} devices per room.')
+
+    expected = DeviceAssignment.objects.filter(is_active=True, room_number=room_number.strip())
+    if directorate_id is not None:
+        expected = expected.filter(directorate_id=directorate_id)
+    expected_ids = set(expected.values_list('equipment_id', flat=True))
+
+    devices = ICTEquipment.objects.filter(code_filter(codes) | Q(pk__in=expected_ids)).select_related(*SCAN_RELATED)
+    devices = list(devices)
+    matched = match_codes(codes, devices)
+    scanned_ids = {device.pk for device in matched.values() if device}
+
+    result = {'present': [], 'missing': [], 'unexpected': [], 'unknown': []}
+    for code, device in matched.items():
+        if device is None:
+            result['unknown'].append(code)
+    for device in sorted(devices, key=lambda device: device.serial_number):
+        if device.pk in scanned_ids:
+            result['present' if device.pk in expected_ids else 'unexpected'].append(device_payload(device))
+        elif device.pk in expected_ids:
+            result['missing'].append(device_payload(device))
+    return result
@@ -0,0 +1,230 @@
+"""
+Equipment lookup by serial number or asset tag.
+
+Officers usually type a serial off a sticker: partly, with different
+punctuation, or with a character wrong. ``search_equipment`` tries in turn
+
+1. an exact match on ``serial_number``/``asset_tag`` or on their
+   normalized keys (``serial_key``/``asset_tag_key``, see
+   ``models.search_key``), all unique or indexed columns;
+2. a prefix match on the normalized keys, read in index order;
+3. trigram word similarity on the normalized keys: ``pg_trgm`` with GIN
+   indexes on PostgreSQL (created by migration ``0010_equipment_search``),
+   elsewhere the ``EquipmentTrigram`` side table kept current by
+   equipment.signals.
+
+An exact match ends the search; the other steps run while fewer than
+``limit`` devices have been found.
+"""
+from collections import namedtuple
+from math import ceil
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import EquipmentTrigram, ICTEquipment, search_key
+from .scans import invalidate_scan_cache
+
+SEARCH_LIMIT = 20
+# pg_trgm's default word_similarity_threshold.
+SIMILARITY_THRESHOLD = 0.6
+# Shorter queries only use the exact and prefix steps; longer ones
+# cannot be a serial number.
+MIN_FUZZY_LENGTH = 3
+MAX_FUZZY_LENGTH = 100
+# Side-table limits: devices considered per query, devices scored per
+# wanted result, and the point past which a trigram counts as common.
+MAX_CANDIDATES = 2000
+CANDIDATE_FACTOR = 4
+FREQUENCY_CAP = 1000
+INDEX_BATCH_SIZE = 1000
+
+SearchMatch = namedtuple('SearchMatch', ['equipment', 'match', 'score'])
+
+
+def get_trigram_backend():
+    """Return 'postgresql' (pg_trgm) or 'table' (the ``EquipmentTrigram`` side table)."""
+    return 'postgresql' if connection.vendor == 'postgresql' else 'table'
+
+
+def trigrams(key):
+    """The trigrams pg_trgm extracts from ``key``: padded with two spaces before and one after."""
+    if not key:
+        return set()
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def word_similarity(query_trigrams, key):
+    """Share of the query's trigrams found in ``key``, close to pg_trgm's ``word_similarity``."""
+    if not query_trigrams:
+        return 0.0
+    return len(query_trigrams & trigrams(key)) / len(query_trigrams)
+
+
+def index_equipment(equipment_list, created=False):
+    """Replace the side-table trigrams of every device in ``equipment_list`` (just add them if ``created``)."""
+    if get_trigram_backend() != 'table' or not equipment_list:
+        return
+    rows = [
+        EquipmentTrigram(equipment_id=equipment.pk, trigram=trigram)
+        for equipment in equipment_list
+        for trigram in sorted(trigrams(equipment.serial_key) | trigrams(equipment.asset_tag_key))
+    ]
+    if created:
+        EquipmentTrigram.objects.bulk_create(rows, batch_size=INDEX_BATCH_SIZE)
+        return
+    with transaction.atomic():
+        EquipmentTrigram.objects.filter(equipment__in=[equipment.pk for equipment in equipment_list]).delete()
+        EquipmentTrigram.objects.bulk_create(rows, batch_size=INDEX_BATCH_SIZE)
+
+
+def rebuild_search_index(batch_size=INDEX_BATCH_SIZE):
+    """Recompute every device's normalized keys and side-table trigrams; returns the device count."""
+    count = 0
+    pks = list(ICTEquipment.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), batch_size):
+        batch = list(ICTEquipment.objects.filter(pk__in=pks[start:start + batch_size]).only(
+            'serial_number', 'asset_tag', 'serial_key', 'asset_tag_key'
+        ))
+        for equipment in batch:
+            equipment.set_search_keys()
+        with transaction.atomic():
+            ICTEquipment.objects.bulk_update(batch, ['serial_key', 'asset_tag_key'])
+            index_equipment(batch)
+        count += len(batch)
+    invalidate_scan_cache()
+    return count
+
+
+def prefix_match(field, key):
+    """Q for ``field`` starting with ``key`` that an ordinary index can serve."""
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE ignores case, so it cannot use the index. Keys only
+        # hold 0-9 and A-Z, all of which sort before '['.
+        return Q(**{f'{field}__gte': key, f'{field}__lt': f'{key}['})
+    return Q(**{f'{field}__startswith': key})
+
+
+def search_equipment(query, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Devices in ``queryset`` (all equipment by default) matching ``query``,
+    best first, as ``SearchMatch(equipment, match, score)`` where
+    ``match`` is 'exact', 'prefix' or 'similar'.
+    """
+    if queryset is None:
+        queryset = ICTEquipment.objects.all()
+    text = query.strip()
+    key = search_key(text)
+    if not key:
+        return []
+
+    matches = []
+    found = set()
+
+    def add(equipment_list, match, score):
+        for equipment in equipment_list:
+            if equipment.pk not in found and len(matches) < limit:
+                found.add(equipment.pk)
+                matches.append(SearchMatch(equipment, match, score(equipment)))
+
+    add(
+        queryset.filter(Q(serial_number=text) | Q(asset_tag=text) | Q(serial_key=key) | Q(asset_tag_key=key))[:limit],
+        'exact', lambda equipment: 1.0,
+    )
+    if matches:
+        return matches
+    for field in ('serial_key', 'asset_tag_key'):
+        if len(matches) < limit:
+            add(
+                queryset.filter(prefix_match(field, key)).exclude(pk__in=found).order_by(field)[:limit - len(matches)],
+                'prefix', lambda equipment, field=field: len(key) / len(getattr(equipment, field)),
+            )
+    if len(matches) < limit and MIN_FUZZY_LENGTH <= len(key) <= MAX_FUZZY_LENGTH:
+        for equipment, score in similar_equipment(queryset.exclude(pk__in=found), key, limit - len(matches)):
+            add([equipment], 'similar', lambda equipment, score=score: score)
+    return matches
+
+
+def similar_equipment(queryset, key, limit):
+    """(equipment, score) pairs for the devices whose keys are most like ``key``."""
+    if get_trigram_backend() == 'postgresql':
+        return _similar_postgresql(queryset, key, limit)
+    return _similar_table(queryset, key, limit)
+
+
+def _similar_postgresql(queryset, key, limit):
+    # ``<%`` is the GIN-indexable form of word_similarity >= threshold.
+    matches = queryset.filter(
+        RawSQL(
+            "(%s <%% equipment_ictequipment.serial_key OR %s <%% equipment_ictequipment.asset_tag_key)",
+            [key, key],
+            output_field=BooleanField(),
+        )
+    ).annotate(
+        search_score=RawSQL(
+            "GREATEST(word_similarity(%s, equipment_ictequipment.serial_key), "
+            "word_similarity(%s, equipment_ictequipment.asset_tag_key))",
+            [key, key],
+            output_field=FloatField(),
+        )
+    ).order_by('-search_score', 'serial_key')[:limit]
+    return [(equipment, equipment.search_score) for equipment in matches]
+
+
+def trigram_frequencies(query_trigrams):
+    """How many devices have each of ``query_trigrams``, counted up to ``FREQUENCY_CAP``."""
+    table = EquipmentTrigram._meta.db_table
+    sql = ' UNION ALL '.join(
+        f'SELECT %s, (SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE trigram = %s LIMIT {FREQUENCY_CAP}))'
+        for _trigram in query_trigrams
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for trigram in query_trigrams for value in (trigram, trigram)])
+        return dict(cursor.fetchall())
+
+
+def _similar_table(queryset, key, limit):
+    # A device sharing ``needed`` of the query's trigrams has at least one
+    # of any ``len - needed + 1`` of them, so only devices holding one of
+    # the rarest are counted. Serials often share a few trigrams with every
+    # other device (a common prefix); those never pick the candidates.
+    query_trigrams = sorted(trigrams(key))
+    needed = ceil(SIMILARITY_THRESHOLD * len(query_trigrams))
+    frequencies = trigram_frequencies(query_trigrams)
+    rarest = sorted(query_trigrams, key=frequencies.get)[:len(query_trigrams) - needed + 1]
+    holders = EquipmentTrigram.objects.filter(trigram__in=rarest).values('equipment_id')[:MAX_CANDIDATES]
+    candidates = list(
+        EquipmentTrigram.objects.filter(trigram__in=query_trigrams, equipment_id__in=holders).values(
+            'equipment_id'
+        ).annotate(shared=Count('id')).filter(shared__gte=needed).order_by(
+            '-shared', 'equipment_id'
+        ).values_list('equipment_id', flat=True)[:limit * CANDIDATE_FACTOR]
+    )
+
+    query_trigrams = set(query_trigrams)
+    scored = []
+    for equipment in queryset.filter(pk__in=candidates):
+        score = max(word_similarity(query_trigrams, equipment.serial_key),
+                    word_similarity(query_trigrams, equipment.asset_tag_key))
+        if score >= SIMILARITY_THRESHOLD:
+            scored.append((equipment, score))
+    scored.sort(key=lambda pair: (-pair[1], pair[0].serial_key))
+    return scored[:limit]
+
+
+def search_filter(query):
+    """
+    Q for the equipment list: brand or model containing ``query``, or a
+    serial number or asset tag that starts with it or is similar to it.
+    """
+    text = query.strip()
+    key = search_key(text)
+    condition = Q(brand__icontains=text) | Q(model__icontains=text)
+    if key:
+        condition |= prefix_match('serial_key', key) | prefix_match('asset_tag_key', key)
+    if MIN_FUZZY_LENGTH <= len(key) <= MAX_FUZZY_LENGTH:
+        similar = similar_equipment(ICTEquipment.objects.only('serial_key', 'asset_tag_key'), key, SEARCH_LIMIT)
+        condition |= Q(pk__in=[equipment.pk for equipment, _score in similar])
+    return condition
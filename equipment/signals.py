@@ -0,0 +1,92 @@
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import DeviceAssignment, DeviceIssue, Directorate, ICTEquipment
+from .analytics import invalidate_failure_hotspots
+from .sla import invalidate_sla_report
+from .inventory import invalidate_inventory_summary
+from .recurring import issue_state, apply_issue_change
+from .scans import invalidate_scan_cache
+from .search import index_equipment
+
+
+@receiver(post_init, sender=DeviceIssue)
+def remember_issue_state(sender, instance, **kwargs):
+    """Keep the loaded values so a later save knows what changed."""
+    instance._index_state = issue_state(instance) if instance.pk else None
+
+
+def stored_issue_state(pk):
+    stored = DeviceIssue.objects.filter(pk=pk).only('equipment_id', 'title').first()
+    return issue_state(stored) if stored else None
+
+
+@receiver(pre_save, sender=DeviceIssue)
+def load_missing_issue_state(sender, instance, raw=False, **kwargs):
+    """Fetch the stored row when the instance was loaded with deferred fields."""
+    if raw or instance._state.adding or instance._index_state is not None:
+        return
+    instance._index_state = stored_issue_state(instance.pk)
+
+
+@receiver(post_save, sender=DeviceIssue)
+def update_index_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else instance._index_state
+    new_state = issue_state(instance) or stored_issue_state(instance.pk)
+    if old_state != new_state:
+        apply_issue_change(old_state, new_state)
+    instance._index_state = new_state
+    invalidate_failure_hotspots()
+    invalidate_sla_report()
+
+
+@receiver(pre_delete, sender=DeviceIssue)
+def load_issue_state_before_delete(sender, instance, **kwargs):
+    if instance._index_state is None:
+        instance._index_state = stored_issue_state(instance.pk)
+
+
+@receiver(post_delete, sender=DeviceIssue)
+def update_index_on_delete(sender, instance, **kwargs):
+    apply_issue_change(instance._index_state, None)
+    invalidate_failure_hotspots()
+    invalidate_sla_report()
+
+
+@receiver(post_save, sender=ICTEquipment)
+@receiver(post_delete, sender=ICTEquipment)
+def drop_inventory_summary(sender, **kwargs):
+    invalidate_inventory_summary()
+
+
+def search_keys(equipment):
+    values = equipment.__dict__
+    return values.get('serial_key'), values.get('asset_tag_key')
+
+
+@receiver(post_init, sender=ICTEquipment)
+def remember_search_keys(sender, instance, **kwargs):
+    instance._search_keys = search_keys(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=ICTEquipment)
+def update_search_index(sender, instance, created, raw=False, **kwargs):
+    """Re-slice the serial number and asset tag when either changed."""
+    if raw:
+        return
+    keys = search_keys(instance)
+    if created or keys != instance._search_keys:
+        index_equipment([instance], created=created)
+    instance._search_keys = keys
+
+
+@receiver(post_save, sender=ICTEquipment)
+@receiver(post_delete, sender=ICTEquipment)
+@receiver(post_save, sender=DeviceAssignment)
+@receiver(post_delete, sender=DeviceAssignment)
+@receiver(post_save, sender=Directorate)
+@receiver(post_delete, sender=Directorate)
+def drop_scan_answers(sender, **kwargs):
+    invalidate_scan_cache()
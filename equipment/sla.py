@@ -0,0 +1,215 @@
+"""
+Issue resolution SLA metrics.
+
+Each severity has a resolution target (``SLA_TARGETS``). For the issues
+resolved in the last N days, ``compute_sla_report`` returns the count,
+mean, median and 90th percentile time to resolve and the share resolved
+within target, grouped by severity, by the directorate of the assignment
+the issue was reported under and by equipment type. Everything is
+computed by the database: PostgreSQL with ``percentile_cont``, other
+backends by ranking each group's resolution times with window functions
+and reading the rows either side of each percentile. Each window's
+report is cached; issue saves and deletes drop it (see equipment.signals).
+
+``sla_breached`` is the per-issue condition behind the breaching list
+and the SLA badges, so list views can annotate it onto their query.
+"""
+from datetime import timedelta
+from math import ceil, floor
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import (
+    Aggregate, Avg, BooleanField, Case, Count, ExpressionWrapper, F, FloatField, Func, Q, Value, When, Window,
+)
+from django.db.models.functions import Ceil, Floor, RowNumber
+from django.db.models.lookups import GreaterThan, LessThanOrEqual
+from django.utils import timezone
+
+from .models import DeviceIssue, ICTEquipment
+
+SLA_TARGETS = {
+    'critical': timedelta(hours=8),
+    'high': timedelta(hours=24),
+    'medium': timedelta(days=3),
+    'low': timedelta(days=7),
+}
+OPEN_STATUSES = ['reported', 'in_progress']
+# Look-back windows, in days, that the report is offered (and cached) for.
+SLA_WINDOWS = (30, 90, 365)
+DEFAULT_SLA_WINDOW = 90
+PERCENTILES = {'median': 0.5, 'p90': 0.9}
+CACHE_TIMEOUT = 60 * 15
+BREACHING_SHOWN = 50
+
+GROUPINGS = {
+    'by_severity': ['severity'],
+    'by_directorate': ['assignment__directorate_id', 'assignment__directorate__name'],
+    'by_type': ['equipment__equipment_type'],
+}
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL's interpolated ``percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)``."""
+    function = 'PERCENTILE_CONT'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=fraction, **extra)
+
+
+class ResolutionSeconds(Func):
+    """
+    Seconds from ``reported_at`` to ``resolved_at``. Written out per backend
+    because Django's own datetime subtraction runs a Python function per
+    row on SQLite.
+    """
+    template = 'EXTRACT(EPOCH FROM (%(expressions)s))'
+    arg_joiner = ' - '
+    output_field = FloatField()
+
+    def __init__(self):
+        super().__init__(F('resolved_at'), F('reported_at'))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='((julianday(%(expressions)s)) * 86400.0)',
+            arg_joiner=') - julianday(', **extra_context
+        )
+
+
+def cache_key(days):
+    return f'equipment:issue-sla:{days}'
+
+
+def invalidate_sla_report():
+    cache.delete_many([cache_key(days) for days in SLA_WINDOWS])
+
+
+def within_target():
+    """Q for resolved issues that met their severity's target."""
+    condition = Q()
+    for severity, target in SLA_TARGETS.items():
+        condition |= Q(LessThanOrEqual(ResolutionSeconds(), target.total_seconds()), severity=severity)
+    return condition
+
+
+def sla_breached(now=None):
+    """Q for issues past their severity's target: still open, or resolved late."""
+    now = now or timezone.now()
+    condition = Q()
+    for severity, target in SLA_TARGETS.items():
+        condition |= Q(severity=severity) & (
+            Q(status__in=OPEN_STATUSES, reported_at__lt=now - target) |
+            Q(GreaterThan(ResolutionSeconds(), target.total_seconds()))
+        )
+    return condition
+
+
+def annotate_sla_breached(queryset, now=None):
+    """Add a boolean ``sla_breached`` to every issue in ``queryset`` (no extra queries)."""
+    return queryset.annotate(sla_breached=Case(
+        When(sla_breached(now), then=Value(True)), default=Value(False), output_field=BooleanField(),
+    ))
+
+
+def breaching_issues(now=None, limit=BREACHING_SHOWN):
+    """Open issues already past their target, longest overdue first."""
+    now = now or timezone.now()
+    return DeviceIssue.objects.filter(
+        sla_breached(now), status__in=OPEN_STATUSES
+    ).select_related('equipment', 'assignment__directorate').order_by('reported_at')[:limit]
+
+
+def hours(seconds):
+    return None if seconds is None else round(seconds / 3600, 1)
+
+
+def window_percentiles(resolved, fields):
+    """
+    ``{group: {name: seconds}}`` for ``PERCENTILES``, interpolated like
+    ``percentile_cont``: each group's resolution times are ranked with
+    ``ROW_NUMBER()`` and only the rows either side of each percentile's
+    position are read back.
+    """
+    partition = [F(field) for field in fields]
+    ranked = resolved.annotate(
+        resolution=ResolutionSeconds(),
+        position=Window(RowNumber(), partition_by=partition, order_by=[ResolutionSeconds().asc(), F('pk').asc()]),
+        group_size=Window(Count('id'), partition_by=partition),
+    )
+    wanted = Q()
+    for fraction in PERCENTILES.values():
+        rank = ExpressionWrapper(1 + (F('group_size') - 1) * Value(fraction), output_field=FloatField())
+        wanted |= Q(position=Floor(rank)) | Q(position=Ceil(rank))
+
+    values = {}
+    sizes = {}
+    for row in ranked.filter(wanted).values_list(*fields, 'position', 'group_size', 'resolution'):
+        *group, position, size, resolution = row
+        values.setdefault(tuple(group), {})[position] = resolution
+        sizes[tuple(group)] = size
+
+    percentiles = {}
+    for group, by_position in values.items():
+        percentiles[group] = {}
+        for name, fraction in PERCENTILES.items():
+            rank = 1 + (sizes[group] - 1) * fraction
+            lower, upper = by_position[floor(rank)], by_position[ceil(rank)]
+            percentiles[group][name] = lower + (upper - lower) * (rank - floor(rank))
+    return percentiles
+
+
+def compute_sla_report(days):
+    """Grouped resolution-time metrics over the issues resolved in the last ``days`` days."""
+    now = timezone.now()
+    since = now - timedelta(days=days)
+    resolved = DeviceIssue.objects.filter(resolved_at__gte=since).order_by()
+    postgres = connection.vendor == 'postgresql'
+    type_labels = dict(ICTEquipment.EQUIPMENT_TYPE_CHOICES)
+    severity_labels = dict(DeviceIssue.SEVERITY_CHOICES)
+    severity_order = list(SLA_TARGETS)
+
+    report = {'days': days, 'since': since, 'targets': {
+        severity: hours(target.total_seconds()) for severity, target in SLA_TARGETS.items()
+    }}
+    for name, fields in GROUPINGS.items():
+        metrics = {
+            'resolved_count': Count('id'),
+            'mean': Avg(ResolutionSeconds()),
+            'met_count': Count('id', filter=within_target()),
+        }
+        if postgres:
+            for percentile, fraction in PERCENTILES.items():
+                metrics[percentile] = PercentileCont(ResolutionSeconds(), fraction, output_field=FloatField())
+        rows = list(resolved.values(*fields).annotate(**metrics).order_by(*fields))
+        percentiles = {} if postgres else window_percentiles(resolved, fields)
+
+        for row in rows:
+            row.update(percentiles.get(tuple(row[field] for field in fields), {}))
+            for metric in ('mean', *PERCENTILES):
+                row[f'{metric}_hours'] = hours(row[metric])
+            row['within_target'] = round(100 * row['met_count'] / row['resolved_count'])
+            if name == 'by_severity':
+                row['label'] = severity_labels.get(row['severity'], row['severity'])
+                row['target_hours'] = report['targets'].get(row['severity'])
+            elif name == 'by_type':
+                row['label'] = type_labels.get(row['equipment__equipment_type'], row['equipment__equipment_type'])
+            else:
+                row['label'] = row['assignment__directorate__name'] or 'Unassigned'
+        if name == 'by_severity':
+            rows.sort(key=lambda row: severity_order.index(row['severity']) if row['severity'] in severity_order else -1)
+        report[name] = rows
+    return report
+
+
+def sla_report(days):
+    """Cached ``compute_sla_report`` for one of ``SLA_WINDOWS``."""
+    if days not in SLA_WINDOWS:
+        raise ValueError(f'Unsupported window: {days} days')
+    key = cache_key(days)
+    report = cache.get(key)
+    if report is None:
+        report = compute_sla_report(days)
+        cache.set(key, report, CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,95 @@
+"""
+Point-in-time inventory: which assignment held each device at a moment.
+
+An assignment covers ``[assigned_date, return_date)``; an active one has
+no end yet. Migration ``0009_assignment_periods`` indexes those periods:
+a GiST index on ``tstzrange(assigned_date, return_date)`` on PostgreSQL,
+and on SQLite an R*Tree of the periods in Julian days
+(``equipment_assignment_period``) kept in step by triggers. The index
+finds the assignments covering a moment and the exact bounds are then
+checked on the assignment row. Other backends filter the assignment
+table directly.
+"""
+from datetime import datetime, time
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import DeviceAssignment
+
+PERIOD_TABLE = 'equipment_assignment_period'
+
+
+@lru_cache(maxsize=None)
+def rtree_available():
+    """
+    Return True if SQLite was built with R*Tree support, in which case
+    migration 0009_assignment_periods created ``PERIOD_TABLE`` (it makes
+    the same check). Looked up once per process.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_RTREE' for row in cursor.fetchall())
+
+
+def get_period_index_backend():
+    """Return 'postgresql', 'sqlite' or None when there is no interval index."""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and rtree_available():
+        return 'sqlite'
+    return None
+
+
+def julian_day(when):
+    return when.timestamp() / 86400 + 2440587.5
+
+
+def end_of_day(day):
+    """The last moment of ``day`` in the site time zone."""
+    return timezone.make_aware(datetime.combine(day, time.max))
+
+
+def assignments_as_of(when, directorate=None, equipment=None):
+    """
+    Assignments that held their device at ``when``, optionally only those
+    of one ``directorate`` or ``equipment``, in one query.
+    """
+    queryset = DeviceAssignment.objects.filter(
+        Q(return_date__gt=when) | Q(return_date__isnull=True, is_active=True),
+        assigned_date__lte=when,
+    )
+    backend = get_period_index_backend()
+    if backend == 'postgresql':
+        queryset = queryset.filter(
+            RawSQL(
+                "tstzrange(equipment_deviceassignment.assigned_date, "
+                "equipment_deviceassignment.return_date, '[)') @> %s::timestamptz",
+                [when],
+                output_field=BooleanField(),
+            )
+        )
+    elif backend == 'sqlite':
+        # The R*Tree stores 32-bit floats rounded outwards, so it can return
+        # a few neighbouring periods; the filter above drops them.
+        day = julian_day(when)
+        queryset = queryset.extra(
+            tables=[PERIOD_TABLE],
+            where=[
+                f'{PERIOD_TABLE}.id = equipment_deviceassignment.id',
+                f'{PERIOD_TABLE}.starts <= %s',
+                f'{PERIOD_TABLE}.ends >= %s',
+            ],
+            params=[day, day],
+        )
+
+    if directorate is not None:
+        queryset = queryset.filter(directorate=directorate)
+    if equipment is not None:
+        queryset = queryset.filter(equipment=equipment)
+    return queryset.select_related('equipment', 'directorate', 'assigned_to').order_by(
+        'directorate__name', 'equipment__equipment_type', 'equipment__serial_number'
+    )
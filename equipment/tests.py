@@ -0,0 +1,902 @@
+import os
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
+
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from home.stats import CACHE_KEY as INDEX_STATS_KEY, index_stats
+from users.models import CustomUser
+from .analytics import cache_key as hotspots_cache_key, failure_hotspots
+from .history import archive_device_history, equipment_history
+from .assignments import (
+    AssignmentConflict, assign_batch, assign_equipment, assignment_transaction, backfill_current_assignments,
+    return_assignment,
+)
+from .checks import check_shared_cache
+from .imports import import_equipment
+from .inventory import CACHE_KEY as inventory_cache_key, inventory_summary
+from .models import ICTEquipment, DeviceAssignment, DeviceHistory, ArchivedDeviceHistory, DeviceIssue, Directorate, IssueToken, EquipmentIssueSummary, EquipmentTrigram
+from .recurring import rebuild_issue_index
+from .scans import reconcile_room, scan_device
+from .sla import SLA_WINDOWS, annotate_sla_breached, cache_key as sla_cache_key, sla_report
+from .search import rebuild_search_index, search_equipment, trigrams
+from .snapshots import assignments_as_of, end_of_day, get_period_index_backend
+from .views import RECURRING_PROBLEMS_SHOWN
+
+
+class CurrentAssignmentTests(TestCase):
+    """The assign and return flows keep ``current_assignment`` in step with the active assignment."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.directorate = Directorate.objects.create(name='Africa', code='AU')
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def create_equipment(self, count, start=0):
+        return [
+            ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number=f'SN-{i}')
+            for i in range(start, start + count)
+        ]
+
+    def assign(self, equipment):
+        self.client.post(reverse('equipment:assignment_create'), {
+            'equipment': equipment.pk, 'directorate': self.directorate.pk,
+            'room_number': '101', 'assigned_to': self.user.pk,
+        })
+        equipment.refresh_from_db()
+        return equipment.current_assignment
+
+    def test_assign_and_return_maintain_pointer(self):
+        laptop, = self.create_equipment(1)
+        assignment = self.assign(laptop)
+        self.assertEqual((laptop.status, assignment.is_active, assignment.directorate), ('assigned', True, self.directorate))
+
+        self.client.post(reverse('equipment:issue_create'), {
+            'equipment': laptop.pk, 'title': 'Screen flicker', 'description': 'x', 'severity': 'low',
+        })
+        self.assertEqual(DeviceIssue.objects.get().assignment, assignment)
+
+        self.client.post(reverse('equipment:assignment_return', args=[assignment.pk]))
+        laptop.refresh_from_db()
+        self.assertEqual((laptop.status, laptop.current_assignment), ('available', None))
+
+    def test_backfill_matches_flows(self):
+        laptops = self.create_equipment(3)
+        self.assign(laptops[0])
+        self.client.post(reverse('equipment:assignment_return', args=[self.assign(laptops[1]).pk]))
+        expected = dict(ICTEquipment.objects.values_list('pk', 'current_assignment'))
+
+        ICTEquipment.objects.update(current_assignment=None)
+        self.assertEqual(backfill_current_assignments(), 1)
+        self.assertEqual(dict(ICTEquipment.objects.values_list('pk', 'current_assignment')), expected)
+
+    def test_list_and_detail_join_current_assignment(self):
+        for equipment in self.create_equipment(5):
+            self.assign(equipment)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('equipment:equipment_list'))
+        self.assertContains(response, 'Africa (AU)', count=5)
+
+        for equipment in self.create_equipment(10, start=5):
+            self.assign(equipment)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('equipment:equipment_list'))
+
+        laptop = ICTEquipment.objects.get(serial_number='SN-0')
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('equipment:equipment_detail', args=[laptop.pk]))
+        self.assertEqual(response.context['current_assignment'], laptop.current_assignment)
+
+
+class BatchAssignmentTests(TestCase):
+    """Batch assign and return write a fixed number of queries however many devices are involved."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.directorate = Directorate.objects.create(name='Africa', code='AU')
+        self.client.force_login(self.user)
+        self.devices = [
+            ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number=f'SN-{i}')
+            for i in range(12)
+        ]
+
+    def post_json(self, data):
+        return self.client.post(reverse('equipment:assignment_batch_api'), data, content_type='application/json')
+
+    def assign(self, devices):
+        return self.post_json({
+            'action': 'assign', 'equipment': [device.pk for device in devices],
+            'directorate': self.directorate.pk, 'room_number': '12B',
+        })
+
+    def test_assign_and_return_in_fixed_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assign(self.devices[:2])
+        with CaptureQueriesContext(connection) as large:
+            response = self.assign(self.devices[2:])
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.json()['assignments']), 10)
+
+        for device in ICTEquipment.objects.select_related('current_assignment'):
+            self.assertEqual((device.status, device.current_assignment.directorate, device.current_assignment.room_number),
+                             ('assigned', self.directorate, '12B'))
+        self.assertEqual(DeviceHistory.objects.filter(action='assigned').count(), 12)
+
+        returned = list(DeviceAssignment.objects.filter(equipment__in=self.devices[:5]).values_list('pk', flat=True))
+        response = self.post_json({'action': 'return', 'assignments': returned})
+        self.assertEqual(sorted(response.json()['returned']), sorted(returned))
+        self.assertEqual(ICTEquipment.objects.filter(status='available', current_assignment=None).count(), 5)
+        self.assertEqual(DeviceAssignment.objects.filter(is_active=False, return_date__isnull=False).count(), 5)
+        self.assertEqual(DeviceHistory.objects.filter(action='returned').count(), 5)
+
+    def test_invalid_requests_write_nothing(self):
+        self.assign(self.devices[:1])
+        response = self.assign(self.devices[:3])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('equipment', response.json()['errors'])
+        self.assertEqual(DeviceAssignment.objects.count(), 1)
+
+        self.assertEqual(self.post_json({'action': 'move'}).status_code, 400)
+        self.assertEqual(self.client.post(reverse('equipment:assignment_batch_api'), 'nope',
+                                          content_type='application/json').status_code, 400)
+
+    def test_batch_pages(self):
+        self.assertContains(self.client.get(reverse('equipment:assignment_batch')), 'SN-11')
+        self.client.post(reverse('equipment:assignment_batch'), {
+            'equipment': [device.pk for device in self.devices[:3]], 'directorate': self.directorate.pk,
+        })
+        self.assertContains(self.client.get(reverse('equipment:assignment_list')), 'name="assignments"', count=3)
+        response = self.client.post(reverse('equipment:assignment_batch_return'),
+                                    {'assignments': list(DeviceAssignment.objects.values_list('pk', flat=True))})
+        self.assertRedirects(response, reverse('equipment:assignment_list'))
+        self.assertFalse(DeviceAssignment.objects.filter(is_active=True).exists())
+
+
+class AssignmentConflictTests(TestCase):
+    """Concurrent assigns of one device leave one active assignment and a retryable error."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.directorate = Directorate.objects.create(name='Africa', code='AU')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+
+    def new_assignment(self):
+        return DeviceAssignment(equipment=self.laptop, directorate=self.directorate, issued_by=self.user)
+
+    def test_second_assign_of_a_stale_form_conflicts(self):
+        # Both officers loaded the form while the laptop was available.
+        first, second = self.new_assignment(), self.new_assignment()
+        assign_equipment(first, self.user)
+        with self.assertRaises(AssignmentConflict):
+            assign_equipment(second, self.user)
+        self.assertEqual(DeviceAssignment.objects.filter(is_active=True).count(), 1)
+        self.assertEqual(DeviceHistory.objects.count(), 1)
+
+        return_assignment(first, self.user)
+        with self.assertRaises(AssignmentConflict):
+            return_assignment(DeviceAssignment.objects.get(pk=first.pk), self.user)
+        self.assertEqual(DeviceHistory.objects.filter(action='returned').count(), 1)
+
+    def test_constraint_backs_up_the_lock(self):
+        DeviceAssignment.objects.create(equipment=self.laptop, directorate=self.directorate)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DeviceAssignment.objects.create(equipment=self.laptop, directorate=self.directorate)
+
+        # A race the status check cannot see still ends in a clean conflict.
+        with self.assertRaises(AssignmentConflict):
+            assign_equipment(self.new_assignment(), self.user)
+        self.assertEqual(DeviceAssignment.objects.count(), 1)
+        self.assertFalse(DeviceHistory.objects.exists())
+
+    def test_only_lock_contention_is_retryable(self):
+        class DriverError(Exception):
+            def __init__(self, pgcode):
+                self.pgcode = pgcode
+
+        def raise_in_transaction(exc):
+            with assignment_transaction():
+                raise exc
+
+        with self.assertRaises(AssignmentConflict):
+            raise_in_transaction(OperationalError('database is locked'))
+        for pgcode in ('40P01', '55P03'):
+            error = OperationalError('lock')
+            error.__cause__ = DriverError(pgcode)
+            with self.assertRaises(AssignmentConflict):
+                raise_in_transaction(error)
+
+        error = OperationalError('server closed the connection unexpectedly')
+        error.__cause__ = DriverError('08006')
+        with self.assertRaises(OperationalError):
+            raise_in_transaction(error)
+        with self.assertRaises(OperationalError), assignment_transaction():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT * FROM equipment_no_such_table')
+
+    def test_views_report_conflicts(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('equipment:assignment_create'), {
+            'equipment': self.laptop.pk, 'directorate': self.directorate.pk,
+        })
+        self.assertRedirects(response, reverse('equipment:assignment_list'))
+
+        # Simulate the other worker's assignment landing after this
+        # request's form validation: the constraint turns it into a 409.
+        ICTEquipment.objects.filter(pk=self.laptop.pk).update(status='available', current_assignment=None)
+        response = self.client.post(reverse('equipment:assignment_batch_api'), {
+            'action': 'assign', 'equipment': [self.laptop.pk], 'directorate': self.directorate.pk,
+        }, content_type='application/json')
+        self.assertEqual((response.status_code, response.json()['retryable']), (409, True))
+
+
+class DeviceHistoryArchiveTests(TestCase):
+    """Old history moves to the archive table and the full history reads both."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        now = timezone.now()
+        self.entries = [
+            DeviceHistory.objects.create(
+                equipment=self.laptop, action='maintenance', performed_by=self.user,
+                notes=f'Service {days}', timestamp=now - timedelta(days=days),
+            )
+            for days in (800, 500, 400, 100, 1)
+        ]
+
+    def test_archive_moves_old_entries_and_keeps_ids(self):
+        self.assertEqual(archive_device_history(older_than_days=365, batch_size=2), 3)
+        self.assertEqual(archive_device_history(older_than_days=365), 0)
+
+        self.assertEqual(
+            sorted(ArchivedDeviceHistory.objects.values_list('pk', 'notes')),
+            sorted((entry.pk, entry.notes) for entry in self.entries[:3]),
+        )
+        self.assertEqual(list(self.laptop.history.values_list('notes', flat=True)), ['Service 1', 'Service 100'])
+
+        history = equipment_history(self.laptop)
+        self.assertEqual([entry.pk for entry in history], [entry.pk for entry in reversed(self.entries)])
+        self.assertEqual([entry.pk for entry in equipment_history(self.laptop, limit=3)], [entry.pk for entry in self.entries[:1:-1]])
+
+    def test_history_page_includes_archived_entries(self):
+        archive_device_history(older_than_days=365)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('equipment:equipment_history', args=[self.laptop.pk]))
+        self.assertContains(response, 'Service 800')
+        self.assertContains(response, 'Service 1<')
+
+        response = self.client.get(reverse('equipment:equipment_detail', args=[self.laptop.pk]))
+        self.assertEqual(len(response.context['history']), 2)
+
+
+class InventoryAsOfTests(TestCase):
+    """Point-in-time queries find the assignment that held each device at a moment."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.africa = Directorate.objects.create(name='Africa', code='AU')
+        self.asia = Directorate.objects.create(name='Asia', code='AS')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        self.printer = ICTEquipment.objects.create(equipment_type='printer', brand='HP', model='M404', serial_number='SN-2')
+        self.now = timezone.now()
+
+        # The laptop went to Africa for January-March, then to Asia; the
+        # printer has been in Asia since February.
+        self.january = self.assignment(self.laptop, self.africa, days_ago=300, returned_days_ago=220)
+        self.april = self.assignment(self.laptop, self.asia, days_ago=200)
+        self.february = self.assignment(self.printer, self.asia, days_ago=270)
+
+    def assignment(self, equipment, directorate, days_ago, returned_days_ago=None):
+        assignment = assign_equipment(DeviceAssignment(equipment=equipment, directorate=directorate), self.user)
+        if returned_days_ago is not None:
+            return_assignment(assignment, self.user)
+        # Dated after the fact so the period index triggers see an update.
+        DeviceAssignment.objects.filter(pk=assignment.pk).update(
+            assigned_date=self.now - timedelta(days=days_ago),
+            return_date=None if returned_days_ago is None else self.now - timedelta(days=returned_days_ago),
+        )
+        return assignment
+
+    def held(self, days_ago, **filters):
+        return set(assignments_as_of(self.now - timedelta(days=days_ago), **filters))
+
+    def test_snapshots(self):
+        self.assertEqual(get_period_index_backend(), 'sqlite')
+        self.assertEqual(self.held(350), set())
+        self.assertEqual(self.held(250), {self.january, self.february})
+        self.assertEqual(self.held(210), {self.february})
+        self.assertEqual(self.held(1), {self.april, self.february})
+        self.assertEqual(self.held(250, directorate=self.asia), {self.february})
+        self.assertEqual(self.held(1, equipment=self.laptop), {self.april})
+
+        # Bounds are [assigned, returned).
+        self.assertEqual(set(assignments_as_of(self.now - timedelta(days=220), equipment=self.laptop)), set())
+        self.assertEqual(set(assignments_as_of(self.now - timedelta(days=200), equipment=self.laptop)), {self.april})
+
+        self.april.delete()
+        self.assertEqual(self.held(1), {self.february})
+        with self.assertNumQueries(1):
+            # The index backend was settled above; the snapshot is one query.
+            list(assignments_as_of(self.now))
+
+    def test_view_and_api(self):
+        self.client.force_login(self.user)
+        day = (self.now - timedelta(days=250)).date()
+        response = self.client.get(reverse('equipment:inventory_as_of'), {'date': day.isoformat()})
+        self.assertEqual(response.context['as_of'], end_of_day(day))
+        self.assertEqual(set(response.context['assignments']), {self.january, self.february})
+
+        response = self.client.get(reverse('equipment:inventory_as_of_api'), {
+            'date': day.isoformat(), 'directorate': self.africa.pk,
+        })
+        [row] = response.json()['assignments']
+        self.assertEqual((row['id'], row['equipment']['serial_number'], row['directorate']['code']), (self.january.pk, 'SN-1', 'AU'))
+
+        response = self.client.get(reverse('equipment:inventory_as_of_api'), {'date': 'last week'})
+        self.assertEqual(response.status_code, 400)
+
+
+class EquipmentSearchTests(TestCase):
+    """Serial and asset tag lookup: exact, prefix and trigram matches from the indexes."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.laptop = ICTEquipment.objects.create(
+            equipment_type='laptop', brand='Dell', model='5420', serial_number='CND-4521-XQ', asset_tag='MOFA-00042',
+        )
+        self.printer = ICTEquipment.objects.create(
+            equipment_type='printer', brand='HP', model='M404', serial_number='PHBQK77310', asset_tag='MOFA-00043',
+        )
+
+    def found(self, query):
+        return [(equipment, match) for equipment, match, _score in search_equipment(query)]
+
+    def test_exact_prefix_and_similar(self):
+        self.assertEqual((self.laptop.serial_key, self.laptop.asset_tag_key), ('CND4521XQ', 'MOFA00042'))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.found('cnd 4521 xq'), [(self.laptop, 'exact')])
+        self.assertEqual(self.found('mofa00043'), [(self.printer, 'exact')])
+        self.assertEqual(self.found('MOFA-0004'), [(self.laptop, 'prefix'), (self.printer, 'prefix')])
+        # One character misread off the sticker.
+        self.assertEqual(self.found('PHBQK7731O'), [(self.printer, 'similar')])
+        self.assertEqual(self.found('4521XQ'), [(self.laptop, 'similar')])
+        self.assertEqual(self.found('ZZZZZZ'), [])
+        self.assertEqual(self.found(' - '), [])
+
+    def test_trigrams_follow_saves_and_imports(self):
+        self.printer.serial_number = 'VNB3K19284'
+        self.printer.save(update_fields=['serial_number'])
+        self.printer.refresh_from_db()
+        self.assertEqual(self.printer.serial_key, 'VNB3K19284')
+        self.assertEqual(
+            set(self.printer.search_trigrams.values_list('trigram', flat=True)),
+            trigrams('VNB3K19284') | trigrams('MOFA00043'),
+        )
+        self.assertEqual(self.found('VNB3K1928A'), [(self.printer, 'similar')])
+
+        body = 'equipment_type,brand,model,serial_number\nmonitor,Dell,P2422H,CN-0K7P-2201\n'
+        import_equipment(BytesIO(body.encode()), 'delivery.csv')
+        monitor = ICTEquipment.objects.get(serial_number='CN-0K7P-2201')
+        self.assertEqual(self.found('CN0K7P2291'), [(monitor, 'similar')])
+
+        EquipmentTrigram.objects.all().delete()
+        ICTEquipment.objects.update(serial_key='')
+        self.assertEqual(rebuild_search_index(), 3)
+        self.assertEqual(self.found('CN0K7P2201'), [(monitor, 'exact')])
+        self.assertEqual(self.found('VNB3K1928A'), [(self.printer, 'similar')])
+
+    def test_views(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('equipment:equipment_search_api'), {'q': 'phbqk7731o'})
+        [result] = response.json()['results']
+        self.assertEqual((result['id'], result['match']), (self.printer.pk, 'similar'))
+
+        response = self.client.get(reverse('equipment:equipment_search'), {'q': 'mofa-00042'})
+        self.assertEqual([match.equipment for match in response.context['matches']], [self.laptop])
+
+        response = self.client.get(reverse('equipment:equipment_list'), {'search': 'cnd4521'})
+        self.assertEqual(list(response.context['equipment_list']), [self.laptop])
+        response = self.client.get(reverse('equipment:equipment_list'), {'search': 'HP'})
+        self.assertEqual(list(response.context['equipment_list']), [self.printer])
+
+
+class ScanTests(TestCase):
+    """Scanned codes are answered from one query, then from the cache until a write."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.africa = Directorate.objects.create(name='Africa', code='AU')
+        self.laptop, self.printer, self.phone = [
+            ICTEquipment.objects.create(
+                equipment_type=kind, brand='Dell', model='X', serial_number=f'SN-{i}', asset_tag=f'MOFA-{i:05d}',
+            )
+            for i, kind in enumerate(['laptop', 'printer', 'phone'])
+        ]
+        assign_batch([self.laptop, self.printer], self.africa, self.user, room_number='101')
+
+    def test_lookup_is_cached_until_a_write(self):
+        with self.assertNumQueries(1):
+            device = scan_device('mofa 00000')
+        self.assertEqual((device['id'], device['assignment']['room_number']), (self.laptop.pk, '101'))
+        self.assertEqual(device['assignment']['directorate']['code'], 'AU')
+        with self.assertNumQueries(0):
+            self.assertEqual(scan_device('mofa 00000'), device)
+
+        self.assertIsNone(scan_device('MOFA-99999'))
+        assignment = DeviceAssignment.objects.get(equipment=self.laptop)
+        return_assignment(assignment, self.user)
+        self.assertIsNone(scan_device('mofa 00000')['assignment'])
+
+        self.phone.asset_tag = 'MOFA-99999'
+        self.phone.save()
+        self.assertEqual(scan_device('MOFA-99999')['id'], self.phone.pk)
+
+    def test_reconcile_room(self):
+        stray = ICTEquipment.objects.create(equipment_type='tablet', brand='Apple', model='iPad', serial_number='SN-9')
+        with self.assertNumQueries(2):
+            result = reconcile_room(['MOFA-00000', 'sn 9', 'MOFA-00000', 'NOPE-1'], '101 ')
+        self.assertEqual([device['id'] for device in result['present']], [self.laptop.pk])
+        self.assertEqual([device['id'] for device in result['missing']], [self.printer.pk])
+        self.assertEqual([device['id'] for device in result['unexpected']], [stray.pk])
+        self.assertEqual(result['unknown'], ['NOPE-1'])
+        self.assertEqual(reconcile_room([], '101', directorate_id=self.africa.pk + 1)['missing'], [])
+
+    def test_views(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('equipment:scan_lookup_api'), {'code': 'SN-2'})
+        self.assertEqual(response.json()['device']['id'], self.phone.pk)
+        response = self.client.get(reverse('equipment:scan_lookup_api'), {'code': 'SN-404'})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(reverse('equipment:scan_room_api'), {
+            'room_number': '101', 'directorate': self.africa.pk, 'codes': ['SN-0', 'SN-1'],
+        }, content_type='application/json')
+        self.assertEqual((len(response.json()['present']), response.json()['missing']), (2, []))
+        response = self.client.post(reverse('equipment:scan_room_api'), {'room_number': '101', 'codes': 'SN-0'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        for directorate in (True, False, '1'):
+            response = self.client.post(reverse('equipment:scan_room_api'), {
+                'room_number': '101', 'directorate': directorate, 'codes': ['SN-0'],
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+
+class InventorySummaryTests(TestCase):
+    """The summary is one aggregate, cached until equipment changes."""
+
+    def setUp(self):
+        cache.clear()
+        for i, (status, condition) in enumerate([
+            ('available', 'good'), ('assigned', 'good'), ('assigned', 'fair'), ('in_repair', 'needs_repair'),
+        ]):
+            ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420',
+                                        serial_number=f'SN-{i}', status=status, condition=condition)
+
+    def assertMatchesCounts(self):
+        summary = inventory_summary()
+        self.assertEqual(summary['total'], ICTEquipment.objects.count())
+        for status, count in summary['status'].items():
+            self.assertEqual(count, ICTEquipment.objects.filter(status=status).count())
+        for condition, count in summary['condition'].items():
+            self.assertEqual(count, ICTEquipment.objects.filter(condition=condition).count())
+
+    def test_summary_is_cached_until_equipment_changes(self):
+        with self.assertNumQueries(1):
+            summary = inventory_summary()
+        self.assertEqual((summary['total'], summary['status']['assigned'], summary['condition']['needs_repair']), (4, 2, 1))
+        with self.assertNumQueries(0):
+            inventory_summary()
+
+        laptop = ICTEquipment.objects.get(serial_number='SN-0')
+        laptop.status = 'retired'
+        laptop.save()
+        self.assertMatchesCounts()
+        laptop.delete()
+        self.assertMatchesCounts()
+
+    def test_dashboard_reads_summary(self):
+        user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.client.force_login(user)
+        response = self.client.get(reverse('equipment:dashboard'))
+        self.assertEqual((response.context['assigned_count'], response.context['needs_repair_count']), (2, 1))
+
+
+# A cache shared between connections, standing in for Redis; a second
+# connection to it plays another gunicorn worker.
+SHARED_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_shared_cache',
+}}
+
+
+class SharedCacheTests(TestCase):
+    """Cached reports are dropped for every worker process, not just the one that wrote."""
+
+    def test_process_local_cache_fails_the_deploy_check(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['equipment.W001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/0'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=SHARED_CACHE)
+    def test_invalidation_reaches_another_worker(self):
+        call_command('createcachetable', stdout=StringIO())
+        other_worker = caches.create_connection('default')
+        user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        inventory_summary()
+        failure_hotspots(30)
+        sla_report(30)
+        index_stats()
+        keys = [inventory_cache_key, hotspots_cache_key(30), sla_cache_key(30), INDEX_STATS_KEY]
+        self.assertEqual([other_worker.get(key) is not None for key in keys], [True] * 4)
+
+        laptop.status = 'in_repair'
+        laptop.save()
+        DeviceIssue.objects.create(equipment=laptop, title='Fan', description='x', reported_by=user)
+        CustomUser.objects.create_user(username='second', email='second@example.com', password='x')
+        self.assertEqual([other_worker.get(key) for key in keys], [None] * 4)
+
+
+class DirectorateListTests(TestCase):
+    """The directorate list is one annotated query, sortable by any figure."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.client.force_login(self.user)
+        self.africa = Directorate.objects.create(name='Africa', code='AU')
+        self.asia = Directorate.objects.create(name='Asia', code='ASIA')
+        self.europe = Directorate.objects.create(name='Europe', code='EU')
+        for i, (directorate, equipment_type) in enumerate([
+            (self.africa, 'laptop'), (self.africa, 'laptop'), (self.africa, 'printer'), (self.asia, 'desktop'),
+        ]):
+            equipment = ICTEquipment.objects.create(equipment_type=equipment_type, brand='Dell', model='X', serial_number=f'SN-{i}')
+            self.client.post(reverse('equipment:assignment_create'), {
+                'equipment': equipment.pk, 'directorate': directorate.pk, 'room_number': '1',
+            })
+        self.asia_assignment = DeviceAssignment.objects.get(directorate=self.asia)
+        DeviceIssue.objects.create(equipment=self.asia_assignment.equipment, assignment=self.asia_assignment,
+                                   title='Boot loop', description='x', reported_by=self.user)
+
+    def get(self, sort=''):
+        return self.client.get(reverse('equipment:directorate_list'), {'sort': sort} if sort else {})
+
+    def test_figures_and_sorting(self):
+        directorates = {d.code: d for d in self.get().context['directorates']}
+        self.assertEqual([(d.device_count, d.laptop_count, d.open_issue_count) for d in directorates.values()],
+                         [(3, 2, 0), (1, 0, 1), (0, 0, 0)])
+        self.assertEqual(directorates['AU'].type_counts, [('Laptop', 2), ('Printer', 1)])
+        self.assertEqual(directorates['ASIA'].last_movement, self.asia_assignment.history_entries.get().timestamp)
+        self.assertIsNone(directorates['EU'].last_movement)
+
+        def codes(sort):
+            return [d.code for d in self.get(sort).context['directorates']]
+        self.assertEqual(codes('-devices'), ['AU', 'ASIA', 'EU'])
+        self.assertEqual(codes('-issues'), ['ASIA', 'AU', 'EU'])
+        self.assertEqual(codes('-last_movement'), ['ASIA', 'AU', 'EU'])
+        self.assertEqual(codes('desktop'), ['AU', 'EU', 'ASIA'])
+        self.assertEqual(codes('bogus'), ['AU', 'ASIA', 'EU'])
+
+    def test_query_count_is_fixed(self):
+        with self.assertNumQueries(3):
+            self.get('-devices')
+        for i in range(20):
+            Directorate.objects.create(name=f'Mission {i}', code=f'M{i}')
+        with self.assertNumQueries(3):
+            self.get('-devices')
+
+
+class EquipmentImportTests(TestCase):
+    """Bulk imports validate every row and insert all valid rows or none."""
+
+    HEADER = 'Equipment Type,Brand,Model,Serial Number,Asset Tag,Purchase Date,Condition\n'
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-OLD', asset_tag='MOFA-1')
+
+    def upload(self, body, **data):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('delivery.csv', (self.HEADER + body).encode(), content_type='text/csv')
+        return self.client.post(reverse('equipment:equipment_import'), {'file': upload, **data})
+
+    def test_errors_are_reported_per_row_and_block_the_import(self):
+        body = (
+            'laptop,Dell,5430,SN-1,MOFA-2,2026-01-15,\n'
+            'laptop,Dell,5430,SN-OLD,,,good\n'
+            'tablet,,Tab,SN-2,MOFA-1,,\n'
+            'toaster,HP,X,SN-3,,not a date,\n'
+            ',,,,,,\n'
+            'printer,HP,M404,SN-9,,,\n'
+            'printer,HP,M404,SN-9,,,\n'
+        )
+        response = self.upload(body)
+        errors = {error.row_number: ' '.join(error.messages) for error in response.context['result'].errors}
+        self.assertEqual(sorted(errors), [3, 4, 5, 7, 8])
+        self.assertIn('SN-OLD is already recorded', errors[3])
+        self.assertIn('brand', errors[4])
+        self.assertIn('equipment_type', errors[5])
+        self.assertIn('purchase_date', errors[5])
+        self.assertIn('more than once', errors[7])
+        self.assertEqual(ICTEquipment.objects.count(), 1)
+
+        response = self.upload(body, skip_invalid='on')
+        self.assertEqual(response.context['result'].created, 1)
+        laptop = ICTEquipment.objects.get(serial_number='SN-1')
+        self.assertEqual((laptop.asset_tag, laptop.condition, laptop.status, laptop.created_by),
+                         ('MOFA-2', 'good', 'available', self.user))
+
+    def test_large_file_uses_fixed_queries(self):
+        body = ''.join(f'laptop,Lenovo,T14,BULK-{i},TAG-{i},,\n' for i in range(1200))
+        with CaptureQueriesContext(connection) as queries:
+            result = import_equipment(BytesIO((self.HEADER + body).encode()), 'delivery.csv', batch_size=500)
+        # One uniqueness check, then inserts of up to 500 rows (fewer on
+        # SQLite, which caps the parameters per statement) and of the
+        # search trigrams, 1000 at a time.
+        fields = [field for field in ICTEquipment._meta.concrete_fields if not field.primary_key]
+        batch_size = min(500, connection.ops.bulk_batch_size(fields, []))
+        trigram_fields = [field for field in EquipmentTrigram._meta.concrete_fields if not field.primary_key]
+        trigram_batch_size = min(1000, connection.ops.bulk_batch_size(trigram_fields, []))
+        trigram_inserts = -(-EquipmentTrigram.objects.filter(equipment__serial_number__startswith='BULK-').count() // trigram_batch_size)
+        self.assertEqual(len(queries), 1 + -(-1200 // batch_size) + trigram_inserts + 2)
+        self.assertEqual((result.created, result.errors), (1200, []))
+        self.assertEqual(inventory_summary()['total'], 1201)
+
+    def test_command_reads_xlsx(self):
+        import xlsxwriter
+        path = os.path.join(tempfile.mkdtemp(), 'delivery.xlsx')
+        workbook = xlsxwriter.Workbook(path)
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, ['equipment_type', 'brand', 'model', 'serial_number', 'purchase_price'])
+        sheet.write_row(1, 0, ['monitor', 'Dell', 'P2422H', 40012345, 289.5])
+        workbook.close()
+
+        stdout = StringIO()
+        call_command('import_equipment', path, '--user', 'ict', stdout=stdout)
+        self.assertIn('Imported 1 of 1 rows', stdout.getvalue())
+        monitor = ICTEquipment.objects.get(serial_number='40012345')
+        self.assertEqual((str(monitor.purchase_price), monitor.created_by), ('289.50', self.user))
+
+    def test_corrupt_xlsx_is_rejected_cleanly(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('delivery.xlsx', b'equipment_type,brand\nlaptop,Dell\n')
+        response = self.client.post(reverse('equipment:equipment_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'file', 'The file is not a valid .xlsx file.')
+
+        path = os.path.join(tempfile.mkdtemp(), 'delivery.xlsx')
+        with open(path, 'wb') as output:
+            output.write(b'PK\x03\x04 truncated')
+        with self.assertRaisesMessage(CommandError, 'not a valid .xlsx file'):
+            call_command('import_equipment', path, '--user', 'ict', stdout=StringIO())
+        self.assertFalse(ICTEquipment.objects.filter(brand='Dell', model='').exists())
+
+
+    def test_corrupt_csv_is_rejected_cleanly(self):
+        self.client.force_login(self.user)
+        for content in (
+            self.HEADER.encode() + b'laptop,Dell,Corrupt,SN\x00-1,,,\n',
+            b'\xff\xfe\x00\x00 not text',
+        ):
+            upload = SimpleUploadedFile('delivery.csv', content)
+            response = self.client.post(reverse('equipment:equipment_import'), {'file': upload})
+            self.assertEqual(response.status_code, 200)
+            self.assertFormError(response.context['form'], 'file', 'The file is not a valid .csv file.')
+        self.assertFalse(ICTEquipment.objects.filter(model='Corrupt').exists())
+
+class RecurringProblemIndexTests(TestCase):
+    """Incremental index maintenance must agree with a full rebuild."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        self.printer = ICTEquipment.objects.create(equipment_type='printer', brand='HP', model='M404', serial_number='SN-2')
+
+    def snapshot(self):
+        return (
+            set(IssueToken.objects.values_list('equipment_id', 'token', 'count')),
+            set(EquipmentIssueSummary.objects.values_list('equipment_id', 'issue_count', 'top_token', 'top_token_count')),
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_issue_index()
+        self.assertEqual(incremental, self.snapshot())
+
+    def report(self, equipment, title):
+        return DeviceIssue.objects.create(equipment=equipment, title=title, description='x', reported_by=self.user)
+
+    def test_signals_keep_index_current(self):
+        first = self.report(self.laptop, 'Network adapter failure')
+        self.report(self.laptop, 'Network cable unplugged')
+        self.assertMatchesRebuild()
+        self.assertEqual(EquipmentIssueSummary.objects.get(equipment=self.laptop).top_token, 'network')
+
+        first.title = 'Battery swelling'
+        first.equipment = self.printer
+        first.save()
+        self.assertMatchesRebuild()
+
+        issue = DeviceIssue.objects.only('id', 'status').get(pk=first.pk)
+        issue.status = 'resolved'
+        issue.save()
+        self.assertMatchesRebuild()
+
+        issue.delete()
+        self.assertMatchesRebuild()
+        self.laptop.delete()
+        self.assertMatchesRebuild()
+
+    def test_migration_backfills_existing_issues(self):
+        self.report(self.laptop, 'Network drops')
+        self.report(self.laptop, 'Network drops')
+        expected = self.snapshot()
+        IssueToken.objects.all().delete()
+        EquipmentIssueSummary.objects.all().delete()
+        # Run against the models as they were at that migration.
+        state_apps = MigrationLoader(connection).project_state(('equipment', '0013_backfill_issue_index')).apps
+        import_module('equipment.migrations.0013_backfill_issue_index').backfill_issue_index(state_apps, None)
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_issue_list_reads_index_in_fixed_queries(self):
+        self.report(self.laptop, 'Network drops')
+        self.report(self.laptop, 'Network drops')
+        self.report(self.laptop, 'Network outage')
+        self.report(self.printer, 'Paper jammed')
+        self.report(self.printer, 'Toner empty')
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('equipment:issue_list'))
+        recurring = response.context['recurring_issues']
+        self.assertEqual([(item['equipment'], item['issue_count'], item['pattern']) for item in recurring],
+                         [(self.laptop, 3, 'network')])
+        self.assertIn('network', recurring[0]['suggestion'])
+
+        for _ in range(20):
+            self.report(self.printer, 'Printer network unreachable')
+        with self.assertNumQueries(4):
+            self.client.get(reverse('equipment:issue_list'))
+
+
+    def test_issue_list_links_to_every_recurring_problem(self):
+        printers = [
+            ICTEquipment.objects.create(equipment_type='printer', brand='HP', model='M404', serial_number=f'PR-{i}')
+            for i in range(RECURRING_PROBLEMS_SHOWN + 2)
+        ]
+        for printer in printers:
+            self.report(printer, 'Paper jammed')
+            self.report(printer, 'Paper jammed again')
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('equipment:issue_list'))
+        self.assertEqual(len(response.context['recurring_issues']), RECURRING_PROBLEMS_SHOWN)
+        self.assertContains(response, reverse('equipment:recurring_problems'))
+
+        response = self.client.get(reverse('equipment:recurring_problems'))
+        self.assertCountEqual([item['equipment'] for item in response.context['recurring_issues']], printers)
+
+class FailureAnalyticsTests(TestCase):
+    """Windowed hot spots are grouped through the issue's assignment and cached."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.peace = Directorate.objects.create(name='Peace & Security', code='PS')
+        self.asia = Directorate.objects.create(name='Asia', code='ASIA')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        self.printer = ICTEquipment.objects.create(equipment_type='printer', brand='HP', model='M404', serial_number='SN-2')
+        laptop_assignment = DeviceAssignment.objects.create(equipment=self.laptop, directorate=self.peace)
+        printer_assignment = DeviceAssignment.objects.create(equipment=self.printer, directorate=self.asia)
+        now = timezone.now()
+        for days_ago in (1, 5, 40):
+            DeviceIssue.objects.create(equipment=self.laptop, assignment=laptop_assignment, title='Overheating',
+                                       description='x', severity='high', reported_at=now - timedelta(days=days_ago))
+        DeviceIssue.objects.create(equipment=self.printer, assignment=printer_assignment, title='Jam',
+                                   description='x', reported_at=now - timedelta(days=200))
+        DeviceIssue.objects.create(equipment=self.printer, title='Toner', description='x', reported_at=now)
+
+    def test_windows_group_by_directorate_type_and_model(self):
+        hotspots = failure_hotspots(30)
+        self.assertEqual(hotspots['total_issues'], 3)
+        self.assertEqual([(row['label'], row['issue_count'], row['severe_count']) for row in hotspots['by_directorate']],
+                         [('Peace & Security', 2, 2), ('Unassigned', 1, 0)])
+        self.assertEqual([(row['label'], row['issue_count']) for row in failure_hotspots(365)['by_type']],
+                         [('Laptop', 3), ('Printer', 2)])
+        self.assertEqual([row['label'] for row in failure_hotspots(90)['by_model']], ['Dell 5420', 'HP M404'])
+
+    def test_results_are_cached_until_an_issue_changes(self):
+        failure_hotspots(30)
+        with self.assertNumQueries(0):
+            failure_hotspots(30)
+        DeviceIssue.objects.filter(title='Toner').get().delete()
+        self.assertEqual(failure_hotspots(30)['total_issues'], 2)
+
+    def test_view_falls_back_to_default_window(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('equipment:failure_analytics'), {'days': 'abc'})
+        self.assertEqual(response.context['hotspots']['days'], 90)
+        self.assertContains(response, 'Peace &amp; Security')
+
+
+class IssueSLATests(TestCase):
+    """Resolution times are aggregated per grouping against the severity targets."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='ict', email='ict@example.com', password='x')
+        self.peace = Directorate.objects.create(name='Peace & Security', code='PS')
+        self.laptop = ICTEquipment.objects.create(equipment_type='laptop', brand='Dell', model='5420', serial_number='SN-1')
+        self.printer = ICTEquipment.objects.create(equipment_type='printer', brand='HP', model='M404', serial_number='SN-2')
+        assignment = DeviceAssignment.objects.create(equipment=self.laptop, directorate=self.peace, assigned_to=self.user)
+        self.now = timezone.now()
+        # High severity (24 h target): resolved in 2, 4, 10 and 30 hours.
+        for taken in (2, 4, 10, 30):
+            self.issue(self.laptop, 'high', taken, assignment=assignment)
+        # Critical (8 h target): one on time, and one left open for two days.
+        self.issue(self.printer, 'critical', 6)
+        self.overdue = DeviceIssue.objects.create(equipment=self.printer, title='Offline', description='x',
+                                                  severity='critical', reported_at=self.now - timedelta(days=2))
+
+    def issue(self, equipment, severity, taken_hours, **extra):
+        reported_at = self.now - timedelta(days=3)
+        return DeviceIssue.objects.create(
+            equipment=equipment, title='Fault', description='x', severity=severity, status='resolved',
+            reported_at=reported_at, resolved_at=reported_at + timedelta(hours=taken_hours), **extra
+        )
+
+    def test_percentiles_means_and_share_within_target(self):
+        report = sla_report(30)
+        critical, high = report['by_severity']
+        self.assertEqual((critical['label'], critical['resolved_count'], critical['within_target']), ('Critical', 1, 100))
+        self.assertEqual(
+            (high['resolved_count'], high['mean_hours'], high['median_hours'], high['p90_hours'], high['within_target']),
+            (4, 11.5, 7.0, 24.0, 75),
+        )
+        self.assertEqual(high['target_hours'], 24.0)
+        self.assertEqual([(row['label'], row['resolved_count']) for row in report['by_directorate']],
+                         [('Unassigned', 1), ('Peace & Security', 4)])
+        self.assertEqual([(row['label'], row['median_hours']) for row in report['by_type']],
+                         [('Laptop', 7.0), ('Printer', 6.0)])
+
+    def test_breached_flag_covers_open_and_late_issues(self):
+        flagged = annotate_sla_breached(DeviceIssue.objects.all()).filter(sla_breached=True)
+        self.assertCountEqual([(issue.severity, issue.resolved_at is None) for issue in flagged],
+                              [('high', False), ('critical', True)])
+
+    def test_report_is_cached_until_an_issue_changes(self):
+        sla_report(30)
+        with self.assertNumQueries(0):
+            sla_report(30)
+        self.overdue.status = 'resolved'
+        self.overdue.resolved_at = self.now
+        self.overdue.save()
+        self.assertEqual(sla_report(30)['by_severity'][0]['resolved_count'], 2)
+
+    def test_every_sla_window_is_invalidated(self):
+        for days in SLA_WINDOWS:
+            sla_report(days)
+        self.overdue.save()
+        self.assertEqual([cache.get(sla_cache_key(days)) for days in SLA_WINDOWS], [None] * len(SLA_WINDOWS))
+        with self.assertRaises(ValueError):
+            sla_report(7)
+
+    def test_view_lists_breaching_issues(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('equipment:issue_sla'), {'days': '7'})
+        self.assertEqual(response.context['report']['days'], 90)
+        self.assertEqual(list(response.context['breaching']), [self.overdue])
+        self.assertContains(response, 'Offline')
+        response = self.client.get(reverse('equipment:dashboard'))
+        self.assertEqual(response.context['breaching_count'], 1)
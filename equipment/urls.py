@@ -10,7 +10,13 @@ urlpatterns = [
     # Equipment
     path('equipment/', views.EquipmentListView.as_view(), name='equipment_list'),
     path('equipment/<int:pk>/', views.EquipmentDetailView.as_view(), name='equipment_detail'),
+    path('equipment/<int:pk>/history/', views.EquipmentHistoryView.as_view(), name='equipment_history'),
+    path('equipment/search/', views.EquipmentSearchView.as_view(), name='equipment_search'),
+    path('api/equipment/search/', views.equipment_search_api, name='equipment_search_api'),
+    path('api/scan/', views.scan_lookup_api, name='scan_lookup_api'),
+    path('api/scan/room/', views.scan_room_api, name='scan_room_api'),
     path('equipment/create/', views.EquipmentCreateView.as_view(), name='equipment_create'),
+    path('equipment/import/', views.EquipmentImportView.as_view(), name='equipment_import'),
     path('equipment/<int:pk>/edit/', views.EquipmentUpdateView.as_view(), name='equipment_edit'),
     path('equipment/<int:pk>/delete/', views.EquipmentDeleteView.as_view(), name='equipment_delete'),
     
@@ -24,11 +30,19 @@ urlpatterns = [
     path('assignments/', views.AssignmentListView.as_view(), name='assignment_list'),
     path('assignments/create/', views.AssignmentCreateView.as_view(), name='assignment_create'),
     path('assignments/<int:pk>/return/', views.AssignmentReturnView.as_view(), name='assignment_return'),
+    path('assignments/batch/', views.BatchAssignmentView.as_view(), name='assignment_batch'),
+    path('assignments/batch/return/', views.batch_return, name='assignment_batch_return'),
+    path('api/assignments/batch/', views.batch_assignment_api, name='assignment_batch_api'),
+    path('assignments/as-of/', views.InventoryAsOfView.as_view(), name='inventory_as_of'),
+    path('api/assignments/as-of/', views.inventory_as_of_api, name='inventory_as_of_api'),
     
     # Issues
     path('issues/', views.IssueListView.as_view(), name='issue_list'),
     path('issues/create/', views.IssueCreateView.as_view(), name='issue_create'),
     path('issues/<int:pk>/', views.IssueDetailView.as_view(), name='issue_detail'),
     path('issues/<int:pk>/resolve/', views.IssueResolveView.as_view(), name='issue_resolve'),
+    path('issues/recurring/', views.RecurringProblemListView.as_view(), name='recurring_problems'),
+    path('issues/analytics/', views.FailureAnalyticsView.as_view(), name='failure_analytics'),
+    path('issues/sla/', views.IssueSLAView.as_view(), name='issue_sla'),
 ]
 
@@ -1,35 +1,70 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, FormView
 from django.urls import reverse_lazy
-from django.db.models import Q, Count
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from django.db.models import Q, Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from datetime import timedelta
+from mofa_task_tracker.pagination import CursorPaginationMixin
 from .models import ICTEquipment, DeviceAssignment, Directorate, DeviceHistory, DeviceIssue
-from .forms import ICTEquipmentForm, DeviceAssignmentForm, DirectorateForm, DeviceIssueForm, DeviceIssueResolutionForm
-
-
-class EquipmentListView(LoginRequiredMixin, ListView):
+from .forms import (
+    ICTEquipmentForm, EquipmentImportForm, DeviceAssignmentForm, BatchAssignmentForm, BatchReturnForm,
+    DirectorateForm, DeviceIssueForm, DeviceIssueResolutionForm, InventoryAsOfForm,
+)
+from .assignments import AssignmentConflict, assign_batch, assign_equipment, return_assignment, return_batch
+from .imports import IMPORT_COLUMNS, REQUIRED_COLUMNS, import_equipment
+from .inventory import inventory_summary
+from .analytics import WINDOWS, DEFAULT_WINDOW, failure_hotspots
+from .recurring import recurring_problems
+from .history import equipment_history
+from .snapshots import assignments_as_of, end_of_day
+from .search import SEARCH_LIMIT, search_equipment, search_filter
+from .scans import reconcile_room, scan_device
+from .sla import DEFAULT_SLA_WINDOW, SLA_WINDOWS, annotate_sla_breached, breaching_issues, sla_breached, sla_report
+
+# Recurring problems listed above the issue list; the rest are on their own page.
+RECURRING_PROBLEMS_SHOWN = 10
+
+
+def inventory_context():
+    """The cached inventory summary under the names the equipment templates use."""
+    summary = inventory_summary()
+    return {
+        'inventory_summary': summary,
+        'total_equipment': summary['total'],
+        'available_count': summary['status']['available'],
+        'assigned_count': summary['status']['assigned'],
+        'in_repair_count': summary['status']['in_repair'],
+        'needs_repair_count': summary['condition']['needs_repair'],
+    }
+
+
+class EquipmentListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """List all ICT equipment."""
     model = ICTEquipment
     template_name = 'equipment/equipment_list.html'
     context_object_name = 'equipment_list'
     paginate_by = 20
+    cursor_ordering = '-created_at'
     
     def get_queryset(self):
-        queryset = ICTEquipment.objects.select_related('created_by').prefetch_related('assignments')
+        queryset = ICTEquipment.objects.select_related(
+            'created_by', 'current_assignment__directorate', 'current_assignment__assigned_to'
+        )
         search = self.request.GET.get('search', '')
         status = self.request.GET.get('status', '')
         condition = self.request.GET.get('condition', '')
         
         if search:
-            queryset = queryset.filter(
-                Q(brand__icontains=search) |
-                Q(model__icontains=search) |
-                Q(serial_number__icontains=search) |
-                Q(asset_tag__icontains=search)
-            )
+            queryset = queryset.filter(search_filter(search))
         if status:
             queryset = queryset.filter(status=status)
         if condition:
@@ -39,27 +74,130 @@ class EquipmentListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_equipment'] = ICTEquipment.objects.count()
-        context['available_count'] = ICTEquipment.objects.filter(status='available').count()
-        context['assigned_count'] = ICTEquipment.objects.filter(status='assigned').count()
-        context['in_repair_count'] = ICTEquipment.objects.filter(status='in_repair').count()
+        context.update(inventory_context())
         return context
 
 
+class EquipmentSearchView(LoginRequiredMixin, TemplateView):
+    """Find a device from a full, partial or mistyped serial number or asset tag."""
+    template_name = 'equipment/equipment_search.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '')
+        context['query'] = query
+        context['matches'] = search_equipment(query, ICTEquipment.objects.select_related(
+            'current_assignment__directorate'
+        )) if query else []
+        return context
+
+
+@login_required
+def equipment_search_api(request):
+    """``?q=`` serial number or asset tag lookup as JSON, best match first."""
+    try:
+        limit = min(int(request.GET.get('limit', SEARCH_LIMIT)), 100)
+    except ValueError:
+        limit = SEARCH_LIMIT
+    matches = search_equipment(request.GET.get('q', ''), limit=max(limit, 1))
+    return JsonResponse({
+        'success': True,
+        'results': [
+            {
+                'id': equipment.pk,
+                'serial_number': equipment.serial_number,
+                'asset_tag': equipment.asset_tag,
+                'equipment_type': equipment.equipment_type,
+                'brand': equipment.brand,
+                'model': equipment.model,
+                'status': equipment.status,
+                'match': match,
+                'score': round(score, 3),
+            }
+            for equipment, match, score in matches
+        ],
+    })
+
+
+@login_required
+def scan_lookup_api(request):
+    """
+    ``?code=`` one scanned asset tag or serial number: the device and its
+    current assignment, directorate and room as JSON (404 if unknown).
+    """
+    device = scan_device(request.GET.get('code', ''))
+    if device is None:
+        return JsonResponse({'success': False, 'error': 'No device has that asset tag or serial number.'}, status=404)
+    return JsonResponse({'success': True, 'device': device})
+
+
+@login_required
+@require_POST
+def scan_room_api(request):
+    """
+    Reconcile a scanned room. The body is ``{"room_number": "101",
+    "directorate": id, "codes": ["MOFA-00042", ...]}`` (``directorate`` is
+    optional); see ``equipment.scans.reconcile_room`` for the answer.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Request body must be JSON.'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Request body must be a JSON object.'}, status=400)
+    
+    room_number = data.get('room_number')
+    codes = data.get('codes')
+    directorate = data.get('directorate')
+    if not isinstance(room_number, str) or not room_number.strip():
+        return JsonResponse({'success': False, 'error': 'room_number is required.'}, status=400)
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return JsonResponse({'success': False, 'error': 'codes must be a list of scanned asset tags or serial numbers.'}, status=400)
+    # bool is a subclass of int, but JSON true/false is not an id.
+    if directorate is not None and (isinstance(directorate, bool) or not isinstance(directorate, int)):
+        return JsonResponse({'success': False, 'error': 'directorate must be a directorate id.'}, status=400)
+    try:
+        result = reconcile_room(codes, room_number, directorate)
+    except ValueError as exc:
+        return JsonResponse({'success': False, 'error': str(exc)}, status=400)
+    return JsonResponse({'success': True, 'room_number': room_number.strip(), **result})
+
+
 class EquipmentDetailView(LoginRequiredMixin, DetailView):
     """View equipment details."""
     model = ICTEquipment
     template_name = 'equipment/equipment_detail.html'
     context_object_name = 'equipment'
     
+    def get_queryset(self):
+        return ICTEquipment.objects.select_related(
+            'current_assignment__directorate', 'current_assignment__assigned_to',
+            'current_assignment__issued_by'
+        )
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['current_assignment'] = self.object.get_current_assignment()
-        context['history'] = self.object.history.all()[:10]
+        context['current_assignment'] = self.object.current_assignment
+        context['history'] = self.object.history.select_related('from_directorate', 'to_directorate', 'performed_by')[:10]
         context['issues'] = self.object.issues.filter(status__in=['reported', 'in_progress'])
         return context
 
 
+class EquipmentHistoryView(LoginRequiredMixin, DetailView):
+    """A device's full movement history, including archived entries."""
+    model = ICTEquipment
+    template_name = 'equipment/equipment_history.html'
+    context_object_name = 'equipment'
+    paginate_by = 50
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = Paginator(equipment_history(self.object), self.paginate_by)
+        context['page_obj'] = paginator.get_page(self.request.GET.get('page'))
+        context['history'] = context['page_obj'].object_list
+        return context
+
+
 class EquipmentCreateView(LoginRequiredMixin, CreateView):
     """Create new equipment."""
     model = ICTEquipment
@@ -78,6 +216,35 @@ class EquipmentCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+class EquipmentImportView(LoginRequiredMixin, FormView):
+    """Record a batch of equipment from a CSV or Excel file."""
+    form_class = EquipmentImportForm
+    template_name = 'equipment/equipment_import.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['required_columns'] = REQUIRED_COLUMNS
+        context['optional_columns'] = [name for name in IMPORT_COLUMNS if name not in REQUIRED_COLUMNS]
+        return context
+    
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        try:
+            result = import_equipment(
+                upload.file, upload.name, created_by=self.request.user,
+                skip_invalid=form.cleaned_data['skip_invalid'],
+            )
+        except ValueError as exc:
+            form.add_error('file', str(exc))
+            return self.form_invalid(form)
+        
+        if result.created:
+            messages.success(self.request, f'Imported {result.created} of {result.total_rows} devices.')
+        if not result.errors:
+            return redirect('equipment:equipment_list')
+        return self.render_to_response(self.get_context_data(form=form, result=result))
+
+
 class EquipmentUpdateView(LoginRequiredMixin, UpdateView):
     """Update equipment."""
     model = ICTEquipment
@@ -107,15 +274,68 @@ class EquipmentDeleteView(LoginRequiredMixin, DeleteView):
 
 
 class DirectorateListView(LoginRequiredMixin, ListView):
-    """List all directorates."""
+    """List all directorates with their device, issue and movement figures."""
     model = Directorate
     template_name = 'equipment/directorate_list.html'
     context_object_name = 'directorates'
+    default_sort = 'name'
+    
+    # ?sort= value -> (label, annotation or field); prefix with '-' to reverse.
+    SORT_FIELDS = {
+        'name': ('Name', 'name'),
+        'code': ('Code', 'code'),
+        'devices': ('Assigned devices', 'device_count'),
+        'issues': ('Open issues', 'open_issue_count'),
+        'last_movement': ('Last movement', 'last_movement'),
+        **{
+            value: (f'{label} count', f'{value}_count')
+            for value, label in ICTEquipment.EQUIPMENT_TYPE_CHOICES
+        },
+    }
+    
+    def get_sort(self):
+        sort = self.request.GET.get('sort', '')
+        return sort if sort.lstrip('-') in self.SORT_FIELDS else self.default_sort
+    
+    def get_queryset(self):
+        active = Q(assignments__is_active=True)
+        open_issues = DeviceIssue.objects.filter(
+            assignment__directorate=OuterRef('pk'), status__in=['reported', 'in_progress']
+        ).order_by().values('assignment__directorate').annotate(count=Count('id')).values('count')
+        # The two subqueries each walk one (directorate, timestamp) index.
+        moved_out = DeviceHistory.objects.filter(from_directorate=OuterRef('pk')).order_by('-timestamp').values('timestamp')[:1]
+        moved_in = DeviceHistory.objects.filter(to_directorate=OuterRef('pk')).order_by('-timestamp').values('timestamp')[:1]
+        queryset = Directorate.objects.annotate(
+            device_count=Count('assignments', filter=active),
+            **{
+                f'{value}_count': Count('assignments', filter=active & Q(assignments__equipment__equipment_type=value))
+                for value, _label in ICTEquipment.EQUIPMENT_TYPE_CHOICES
+            },
+            open_issue_count=Coalesce(Subquery(open_issues), 0),
+            last_moved_out=Subquery(moved_out),
+            last_moved_in=Subquery(moved_in),
+        ).annotate(
+            # Greatest() is NULL on SQLite when either side is NULL.
+            last_movement=Greatest(
+                Coalesce('last_moved_out', 'last_moved_in'), Coalesce('last_moved_in', 'last_moved_out')
+            ),
+        )
+        
+        sort = self.get_sort()
+        field = F(self.SORT_FIELDS[sort.lstrip('-')][1])
+        ordering = field.desc(nulls_last=True) if sort.startswith('-') else field.asc(nulls_first=True)
+        return queryset.order_by(ordering, 'name')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         for directorate in context['directorates']:
-            directorate.device_count = directorate.assignments.filter(is_active=True).count()
+            directorate.type_counts = [
+                (label, getattr(directorate, f'{value}_count'))
+                for value, label in ICTEquipment.EQUIPMENT_TYPE_CHOICES
+                if getattr(directorate, f'{value}_count')
+            ]
+        context['sort'] = self.get_sort()
+        context['sort_options'] = [(key, label) for key, (label, _field) in self.SORT_FIELDS.items()]
         return context
 
 
@@ -154,12 +374,13 @@ class DirectorateDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
-class AssignmentListView(LoginRequiredMixin, ListView):
+class AssignmentListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """List all device assignments."""
     model = DeviceAssignment
     template_name = 'equipment/assignment_list.html'
     context_object_name = 'assignments'
     paginate_by = 20
+    cursor_ordering = '-assigned_date'
     
     def get_queryset(self):
         queryset = DeviceAssignment.objects.select_related(
@@ -203,22 +424,11 @@ class AssignmentCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         assignment = form.save(commit=False)
         assignment.issued_by = self.request.user
-        assignment.save()
-        
-        # Create history entry after assignment has a pk
-        DeviceHistory.objects.create(
-            equipment=assignment.equipment,
-            assignment=assignment,
-            action='assigned',
-            to_directorate=assignment.directorate,
-            to_room=assignment.room_number or '',
-            performed_by=self.request.user,
-            notes=assignment.assignment_notes or ''
-        )
-        
-        # Update equipment status
-        assignment.equipment.status = 'assigned'
-        assignment.equipment.save()
+        try:
+            assign_equipment(assignment, self.request.user)
+        except AssignmentConflict as exc:
+            form.add_error(None, str(exc))
+            return self.form_invalid(form)
         
         messages.success(self.request, 'Device assigned successfully!')
         return redirect(self.success_url)
@@ -232,39 +442,102 @@ class AssignmentReturnView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy('equipment:assignment_list')
     
     def form_valid(self, form):
-        assignment = self.get_object()
-        assignment.deactivate()
-        
-        # Create history entry
-        DeviceHistory.objects.create(
-            equipment=assignment.equipment,
-            assignment=assignment,
-            action='returned',
-            from_directorate=assignment.directorate,
-            from_room=assignment.room_number,
-            performed_by=self.request.user,
-            notes=f"Device returned from {assignment.directorate}"
-        )
-        
-        # Update equipment status
-        assignment.equipment.status = 'available'
-        assignment.equipment.save()
+        try:
+            return_assignment(self.get_object(), self.request.user)
+        except AssignmentConflict as exc:
+            messages.error(self.request, str(exc))
+            return redirect(self.success_url)
         
         messages.success(self.request, 'Device returned successfully!')
         return redirect(self.success_url)
 
 
-class IssueListView(LoginRequiredMixin, ListView):
+class BatchAssignmentView(LoginRequiredMixin, FormView):
+    """Assign several devices to a directorate in one go."""
+    form_class = BatchAssignmentForm
+    template_name = 'equipment/assignment_batch_form.html'
+    success_url = reverse_lazy('equipment:assignment_list')
+    
+    def form_valid(self, form):
+        try:
+            assignments = assign_batch(performed_by=self.request.user, **form.cleaned_data)
+        except AssignmentConflict as exc:
+            form.add_error(None, str(exc))
+            return self.form_invalid(form)
+        messages.success(self.request, f'{len(assignments)} devices assigned successfully!')
+        return redirect(self.success_url)
+
+
+@login_required
+@require_POST
+def batch_return(request):
+    """Return the assignments ticked on the assignment list."""
+    form = BatchReturnForm(request.POST)
+    if form.is_valid():
+        try:
+            assignments = return_batch(form.cleaned_data['assignments'], request.user)
+        except AssignmentConflict as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f'{len(assignments)} devices returned successfully!')
+    else:
+        messages.error(request, 'Select one or more active assignments to return.')
+    return redirect('equipment:assignment_list')
+
+
+@login_required
+@require_POST
+def batch_assignment_api(request):
+    """
+    Batch assign or return as JSON. The body is either
+    ``{"action": "assign", "equipment": [ids], "directorate": id,
+    "room_number": "", "office_location": "", "assigned_to": id}`` or
+    ``{"action": "return", "assignments": [ids]}``. A request that lost
+    a race with another officer gets a 409 and can be retried.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Request body must be JSON.'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Request body must be a JSON object.'}, status=400)
+    
+    action = data.get('action')
+    try:
+        if action == 'assign':
+            form = BatchAssignmentForm(data)
+            if form.is_valid():
+                assignments = assign_batch(performed_by=request.user, **form.cleaned_data)
+                return JsonResponse({
+                    'success': True,
+                    'assignments': [
+                        {'id': assignment.pk, 'equipment': assignment.equipment_id} for assignment in assignments
+                    ],
+                })
+        elif action == 'return':
+            form = BatchReturnForm(data)
+            if form.is_valid():
+                assignments = return_batch(form.cleaned_data['assignments'], request.user)
+                return JsonResponse({'success': True, 'returned': [assignment.pk for assignment in assignments]})
+        else:
+            return JsonResponse({'success': False, 'error': 'action must be "assign" or "return".'}, status=400)
+    except AssignmentConflict as exc:
+        return JsonResponse({'success': False, 'error': str(exc), 'retryable': True}, status=409)
+    return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+
+
+class IssueListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """List all device issues."""
     model = DeviceIssue
     template_name = 'equipment/issue_list.html'
     context_object_name = 'issues'
     paginate_by = 20
+    cursor_ordering = '-reported_at'
     
     def get_queryset(self):
-        queryset = DeviceIssue.objects.select_related(
+        queryset = annotate_sla_breached(DeviceIssue.objects.select_related(
             'equipment', 'reported_by', 'resolved_by', 'assignment'
-        )
+        ))
         
         status = self.request.GET.get('status', '')
         severity = self.request.GET.get('severity', '')
@@ -279,58 +552,61 @@ class IssueListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Detect recurring problems
-        context['recurring_issues'] = self._detect_recurring_problems()
+        context['recurring_issues'], context['more_recurring_issues'] = self._detect_recurring_problems()
+        context['recurring_shown'] = RECURRING_PROBLEMS_SHOWN
         return context
     
     def _detect_recurring_problems(self):
-        """Detect recurring problems and suggest solutions."""
-        # Find equipment with multiple issues
-        equipment_issues = DeviceIssue.objects.values('equipment').annotate(
-            issue_count=Count('id')
-        ).filter(issue_count__gte=2)
-        
-        recurring = []
-        for item in equipment_issues:
-            equipment = ICTEquipment.objects.get(pk=item['equipment'])
-            issues = equipment.issues.all()
-            
-            # Group by issue type/description similarity
-            issue_titles = [issue.title.lower() for issue in issues]
-            common_words = {}
-            for title in issue_titles:
-                words = title.split()
-                for word in words:
-                    if len(word) > 4:  # Ignore short words
-                        common_words[word] = common_words.get(word, 0) + 1
-            
-            if common_words:
-                most_common = max(common_words.items(), key=lambda x: x[1])
-                if most_common[1] >= 2:
-                    recurring.append({
-                        'equipment': equipment,
-                        'issue_count': item['issue_count'],
-                        'pattern': most_common[0],
-                        'suggestion': self._generate_suggestion(equipment, most_common[0])
-                    })
-        
-        return recurring
-    
-    def _generate_suggestion(self, equipment, pattern):
-        """Generate automated suggestions based on recurring problems."""
-        suggestions = {
-            'network': 'Consider network infrastructure upgrade or configuration review',
-            'hardware': 'Schedule hardware maintenance or replacement',
-            'software': 'Update software or review compatibility issues',
-            'power': 'Check power supply and backup systems',
-            'performance': 'Consider hardware upgrade or optimization',
-            'repair': 'Schedule comprehensive maintenance check',
+        """The recurring problems with the most issues, and whether there are more."""
+        rows = recurring_problem_rows(recurring_problems(limit=RECURRING_PROBLEMS_SHOWN + 1))
+        return rows[:RECURRING_PROBLEMS_SHOWN], len(rows) > RECURRING_PROBLEMS_SHOWN
+
+
+class RecurringProblemListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
+    """Every piece of equipment with a recurring problem, most issues first."""
+    template_name = 'equipment/recurring_problems.html'
+    context_object_name = 'summaries'
+    paginate_by = 25
+    cursor_ordering = '-issue_count'
+    
+    def get_queryset(self):
+        return recurring_problems()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['recurring_issues'] = recurring_problem_rows(context['summaries'])
+        return context
+
+
+def recurring_problem_rows(summaries):
+    """Rows for the recurring problem tables, with an automated suggestion for each."""
+    return [
+        {
+            'equipment': summary.equipment,
+            'issue_count': summary.issue_count,
+            'pattern': summary.top_token,
+            'suggestion': recurring_problem_suggestion(summary.top_token),
         }
-        
-        for key, suggestion in suggestions.items():
-            if key in pattern.lower():
-                return suggestion
-        
-        return 'Schedule comprehensive review and maintenance for this equipment'
+        for summary in summaries
+    ]
+
+
+def recurring_problem_suggestion(pattern):
+    """Generate automated suggestions based on recurring problems."""
+    suggestions = {
+        'network': 'Consider network infrastructure upgrade or configuration review',
+        'hardware': 'Schedule hardware maintenance or replacement',
+        'software': 'Update software or review compatibility issues',
+        'power': 'Check power supply and backup systems',
+        'performance': 'Consider hardware upgrade or optimization',
+        'repair': 'Schedule comprehensive maintenance check',
+    }
+    
+    for key, suggestion in suggestions.items():
+        if key in pattern.lower():
+            return suggestion
+    
+    return 'Schedule comprehensive review and maintenance for this equipment'
 
 
 class IssueCreateView(LoginRequiredMixin, CreateView):
@@ -358,7 +634,7 @@ class IssueCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         issue = form.save(commit=False)
         issue.reported_by = self.request.user
-        issue.assignment = issue.equipment.get_current_assignment()
+        issue.assignment_id = issue.equipment.current_assignment_id
         issue.save()
         messages.success(self.request, 'Issue reported successfully!')
         return redirect(self.success_url)
@@ -387,6 +663,106 @@ class IssueResolveView(LoginRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
+class IssueSLAView(LoginRequiredMixin, TemplateView):
+    """Resolution times against the SLA targets, and the issues breaching them now."""
+    template_name = 'equipment/issue_sla.html'
+    
+    def get_window(self):
+        try:
+            days = int(self.request.GET.get('days', DEFAULT_SLA_WINDOW))
+        except ValueError:
+            return DEFAULT_SLA_WINDOW
+        return days if days in SLA_WINDOWS else DEFAULT_SLA_WINDOW
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['windows'] = SLA_WINDOWS
+        context['report'] = sla_report(self.get_window())
+        context['breaching'] = breaching_issues()
+        return context
+
+
+class FailureAnalyticsView(LoginRequiredMixin, TemplateView):
+    """Recurring-failure hot spots by directorate, equipment type and model."""
+    template_name = 'equipment/failure_analytics.html'
+    
+    def get_window(self):
+        try:
+            days = int(self.request.GET.get('days', DEFAULT_WINDOW))
+        except ValueError:
+            return DEFAULT_WINDOW
+        return days if days in WINDOWS else DEFAULT_WINDOW
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['windows'] = WINDOWS
+        context['hotspots'] = failure_hotspots(self.get_window())
+        return context
+
+
+class InventoryAsOfView(LoginRequiredMixin, TemplateView):
+    """What each directorate held at the end of a given day."""
+    template_name = 'equipment/inventory_as_of.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = InventoryAsOfForm(self.request.GET or None)
+        context['form'] = form
+        if form.is_valid():
+            as_of = end_of_day(form.cleaned_data['date'])
+            context['as_of'] = as_of
+            context['assignments'] = list(assignments_as_of(
+                as_of, form.cleaned_data['directorate'], form.cleaned_data['equipment']
+            ))
+        return context
+
+
+@login_required
+def inventory_as_of_api(request):
+    """
+    Point-in-time inventory as JSON: ``?date=YYYY-MM-DD`` with optional
+    ``directorate`` and ``equipment`` ids lists the assignments that held
+    each device at the end of that day.
+    """
+    form = InventoryAsOfForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    as_of = end_of_day(form.cleaned_data['date'])
+    assignments = assignments_as_of(
+        as_of, form.cleaned_data['directorate'], form.cleaned_data['equipment']
+    ).values(
+        'id', 'equipment_id', 'equipment__serial_number', 'equipment__asset_tag', 'equipment__equipment_type',
+        'equipment__brand', 'equipment__model', 'directorate_id', 'directorate__code', 'directorate__name',
+        'assigned_to_id', 'room_number', 'office_location', 'assigned_date', 'return_date',
+    )
+    return JsonResponse({
+        'success': True,
+        'as_of': as_of.isoformat(),
+        'assignments': [
+            {
+                'id': row['id'],
+                'equipment': {
+                    'id': row['equipment_id'],
+                    'serial_number': row['equipment__serial_number'],
+                    'asset_tag': row['equipment__asset_tag'],
+                    'equipment_type': row['equipment__equipment_type'],
+                    'brand': row['equipment__brand'],
+                    'model': row['equipment__model'],
+                },
+                'directorate': row['directorate_id'] and {
+                    'id': row['directorate_id'], 'code': row['directorate__code'], 'name': row['directorate__name'],
+                },
+                'assigned_to': row['assigned_to_id'],
+                'room_number': row['room_number'],
+                'office_location': row['office_location'],
+                'assigned_date': row['assigned_date'].isoformat(),
+                'return_date': row['return_date'] and row['return_date'].isoformat(),
+            }
+            for row in assignments
+        ],
+    })
+
+
 class EquipmentDashboardView(LoginRequiredMixin, ListView):
     """Equipment management dashboard."""
     model = ICTEquipment
@@ -400,11 +776,7 @@ class EquipmentDashboardView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         
         # Statistics
-        context['total_equipment'] = ICTEquipment.objects.count()
-        context['available_count'] = ICTEquipment.objects.filter(status='available').count()
-        context['assigned_count'] = ICTEquipment.objects.filter(status='assigned').count()
-        context['in_repair_count'] = ICTEquipment.objects.filter(status='in_repair').count()
-        context['needs_repair_count'] = ICTEquipment.objects.filter(condition='needs_repair').count()
+        context.update(inventory_context())
         
         # Recent assignments
         context['recent_assignments'] = DeviceAssignment.objects.select_related(
@@ -412,9 +784,15 @@ class EquipmentDashboardView(LoginRequiredMixin, ListView):
         ).filter(is_active=True).order_by('-assigned_date')[:5]
         
         # Active issues
-        context['active_issues'] = DeviceIssue.objects.filter(
+        context['active_issues'] = annotate_sla_breached(DeviceIssue.objects.filter(
             status__in=['reported', 'in_progress']
-        ).select_related('equipment', 'reported_by')[:5]
+        ).select_related('equipment', 'reported_by'))[:5]
+        
+        # Resolution times and open issues past their SLA target
+        context['sla'] = sla_report(DEFAULT_SLA_WINDOW)
+        context['breaching_count'] = DeviceIssue.objects.filter(
+            sla_breached(), status__in=['reported', 'in_progress']
+        ).count()
         
         # Recurring problems
         context['recurring_issues'] = self._detect_recurring_problems()
@@ -428,18 +806,11 @@ class EquipmentDashboardView(LoginRequiredMixin, ListView):
     
     def _detect_recurring_problems(self):
         """Detect recurring problems."""
-        equipment_issues = DeviceIssue.objects.values('equipment').annotate(
-            issue_count=Count('id')
-        ).filter(issue_count__gte=2)
-        
-        recurring = []
-        for item in equipment_issues[:5]:
-            equipment = ICTEquipment.objects.get(pk=item['equipment'])
-            recurring.append({
-                'equipment': equipment,
-                'issue_count': item['issue_count'],
+        return [
+            {
+                'equipment': summary.equipment,
+                'issue_count': summary.issue_count,
                 'suggestion': 'Schedule comprehensive maintenance review'
-            })
-        
-        return recurring
-
+            }
+            for summary in recurring_problems(limit=5)
+        ]
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from home.pages import prerender_pages
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the static public pages (about, features) to PRERENDERED_PAGES_ROOT, '
+        'where WhiteNoise serves them to anonymous visitors. Run at deploy time after collectstatic.'
+    )
+
+    def handle(self, *args, **options):
+        for filename in prerender_pages():
+            self.stdout.write(f'Wrote {filename}')
+        self.stdout.write(self.style.SUCCESS('Pre-rendered pages are served from the next start.'))
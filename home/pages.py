@@ -0,0 +1,68 @@
+"""
+Pre-rendered public pages.
+
+``about`` and ``features`` never change between deploys, so
+``manage.py prerender_pages`` renders them once (as an anonymous visitor
+sees them) into ``PRERENDERED_PAGES_ROOT`` as ``<path>/index.html``.
+``PrerenderedPageMiddleware`` then serves those files through WhiteNoise,
+with its caching headers, before the session or database is touched.
+Requests that carry a session cookie fall through to the views, so
+signed-in users still get their own navigation.
+"""
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+PRERENDERED_PAGES = ['home:about', 'home:features']
+
+
+def page_file(path):
+    return os.path.join(settings.PRERENDERED_PAGES_ROOT, path.strip('/'), 'index.html')
+
+
+def prerender_pages():
+    """Render each of ``PRERENDERED_PAGES`` to its file; returns the paths written."""
+    factory = RequestFactory()
+    written = []
+    for name in PRERENDERED_PAGES:
+        path = reverse(name)
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        request.resolver_match = match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+        filename = page_file(path)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb') as output:
+            output.write(response.content)
+        written.append(filename)
+    return written
+
+
+class PrerenderedPageMiddleware(WhiteNoise):
+    """WhiteNoise over ``PRERENDERED_PAGES_ROOT`` for requests without a session."""
+
+    serve = staticmethod(WhiteNoiseMiddleware.serve)
+
+    def __init__(self, get_response=None):
+        super().__init__(
+            application=None, autorefresh=settings.DEBUG,
+            max_age=0 if settings.DEBUG else 60, index_file=True,
+        )
+        self.get_response = get_response
+        if os.path.isdir(settings.PRERENDERED_PAGES_ROOT):
+            self.add_files(settings.PRERENDERED_PAGES_ROOT)
+
+    def __call__(self, request):
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            if self.autorefresh:
+                page = self.find_file(request.path_info)
+            else:
+                page = self.files.get(request.path_info)
+            if page is not None:
+                return self.serve(page, request)
+        return self.get_response(request)
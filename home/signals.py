@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tasks.signals import task_changed
+from users.models import CustomUser
+from .stats import invalidate_index_stats
+
+
+@receiver(post_save, sender=CustomUser)
+def drop_index_stats_on_user_create(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidate_index_stats()
+
+
+@receiver(post_delete, sender=CustomUser)
+def drop_index_stats_on_user_delete(sender, instance, **kwargs):
+    invalidate_index_stats()
+
+
+@receiver(task_changed)
+def drop_index_stats_on_task_change(sender, old_state, new_state, **kwargs):
+    """Only creates, deletes and status changes move the home page counters."""
+    if old_state is None or new_state is None or old_state['status'] != new_state['status']:
+        invalidate_index_stats()
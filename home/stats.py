@@ -0,0 +1,40 @@
+"""
+Cached counters for the public home page.
+
+The page is anonymous and busy (crawlers, uptime checks), so its user
+and task counts are computed once and cached. Creating or deleting a
+user, and creating, deleting or changing the status of a task, drop the
+cached value (see home.signals).
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from tasks.models import Task
+from users.models import CustomUser
+
+CACHE_KEY = 'home:index-stats'
+CACHE_TIMEOUT = 60 * 60
+
+
+def invalidate_index_stats():
+    cache.delete(CACHE_KEY)
+
+
+def compute_index_stats():
+    """The user count, then every task counter from one aggregate over tasks."""
+    stats = {'total_users': CustomUser.objects.count()}
+    stats.update(Task.objects.aggregate(
+        total_tasks=Count('id'),
+        completed_tasks=Count('id', filter=Q(status='completed')),
+        pending_tasks=Count('id', filter=Q(status='pending')),
+    ))
+    return stats
+
+
+def index_stats():
+    """Cached ``compute_index_stats``."""
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = compute_index_stats()
+        cache.set(CACHE_KEY, stats, CACHE_TIMEOUT)
+    return stats
@@ -1,3 +1,76 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+from users.models import CustomUser
+from .stats import index_stats
+
+
+class IndexStatsTests(TestCase):
+    """The public home page reads cached counters that user and task changes invalidate."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+        self.task = Task.objects.create(title='Brief', description='x', created_by=self.user, status='pending')
+        Task.objects.create(title='Visa', description='x', created_by=self.user, status='completed')
+
+    def test_anonymous_index_is_served_from_the_cache(self):
+        self.client.get(reverse('home:index'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home:index'))
+        self.assertEqual(
+            {key: response.context[key] for key in ('total_users', 'total_tasks', 'completed_tasks', 'pending_tasks')},
+            {'total_users': 1, 'total_tasks': 2, 'completed_tasks': 1, 'pending_tasks': 1},
+        )
+
+    def test_status_changes_and_new_users_invalidate(self):
+        index_stats()
+        self.task.title = 'Renamed'
+        self.task.save()
+        with self.assertNumQueries(0):
+            index_stats()
+
+        self.task.status = 'completed'
+        self.task.save()
+        self.assertEqual(index_stats()['completed_tasks'], 2)
+        CustomUser.objects.create_user(username='second', email='second@example.com', password='x')
+        self.assertEqual(index_stats()['total_users'], 2)
+        self.task.delete()
+        self.assertEqual(index_stats()['total_tasks'], 1)
+
+
+class PrerenderedPageTests(TestCase):
+    """About and features are rendered once and served by WhiteNoise to visitors without a session."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.settings_override = override_settings(PRERENDERED_PAGES_ROOT=self.root.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        call_command('prerender_pages', stdout=StringIO())
+
+    def test_pages_are_written_and_served_without_the_views(self):
+        self.assertTrue(os.path.exists(os.path.join(self.root.name, 'about', 'index.html')))
+        with self.assertNumQueries(0):
+            response = Client().get(reverse('home:features'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context)
+        self.assertIn(b'Features', b''.join(response.streaming_content))
+
+    def test_signed_in_users_get_the_live_page(self):
+        user = CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+        client = Client()
+        client.force_login(user)
+        self.assertIn(settings.SESSION_COOKIE_NAME, client.cookies)
+        response = client.get(reverse('home:about'))
+        self.assertEqual(response.context['page_title'], 'About MOFA Task Tracker')
+        self.assertContains(response, 'officer')
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For serving static files
+    'home.pages.PrerenderedPageMiddleware',  # Pre-rendered about/features pages
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -93,6 +94,26 @@ else:
         }
     }
 
+# Cache - the scan generation, cached reports and home page counters live
+# here, and signals drop them on writes. Redis when REDIS_URL is set, which
+# every deployment running more than one worker process (the Procfile and
+# start scripts run four gunicorn workers) must do: otherwise each worker
+# keeps its own local-memory cache and never sees the others' invalidations
+# (`manage.py check --deploy` warns about this: equipment.W001).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,10 +141,18 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Written by `manage.py prerender_pages` at deploy time and served to
+# anonymous visitors by home.pages.PrerenderedPageMiddleware.
+PRERENDERED_PAGES_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Device history older than this many days is moved to the archive
+# table by `manage.py archive_device_history`.
+DEVICE_HISTORY_HOT_DAYS = int(os.environ.get('DEVICE_HISTORY_HOT_DAYS', 365))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
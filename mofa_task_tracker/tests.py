@@ -0,0 +1,92 @@
+import base64
+from datetime import timedelta
+
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+from .pagination import CursorPaginator, paginate_by_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    """Walking the cursors forwards and back visits every row once, in order."""
+
+    PER_PAGE = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        # Few distinct sort keys, so most page boundaries fall inside a tie
+        # and only the primary key tells the rows apart.
+        joined = timezone.now() - timedelta(days=10)
+        for i in range(11):
+            CustomUser.objects.create_user(
+                username=f'officer{i}', email=f'officer{i}@example.com', password='x',
+                last_name=['Otieno', 'Achieng'][i % 2], first_name=['Wanjiru', 'Amina', 'Baraka'][i % 3],
+                date_joined=joined + timedelta(days=i % 3),
+            )
+
+    def walk(self, ordering):
+        """Return (forward pages, backward pages), each a list of pk lists."""
+        paginator = CursorPaginator(CustomUser.objects.all(), self.PER_PAGE, ordering)
+        page = paginator.page()
+        self.assertFalse(page.has_previous())
+        forward = [[user.pk for user in page]]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            forward.append([user.pk for user in page])
+        backward = [forward[-1]]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append([user.pk for user in page])
+        return forward, backward
+
+    def assertWalksInOrder(self, ordering):
+        expected = list(CustomUser.objects.order_by(
+            *CursorPaginator(CustomUser.objects.all(), 1, ordering).get_ordering()
+        ).values_list('pk', flat=True))
+        forward, backward = self.walk(ordering)
+        self.assertEqual([pk for page in forward for pk in page], expected)
+        self.assertTrue(all(len(page) == self.PER_PAGE for page in forward[:-1]))
+        self.assertEqual(backward, forward[::-1])
+
+    def test_ascending_with_tied_keys(self):
+        self.assertWalksInOrder('date_joined')
+
+    def test_descending_with_tied_keys(self):
+        self.assertWalksInOrder('-date_joined')
+
+    def test_multi_field_keys(self):
+        self.assertWalksInOrder(('last_name', 'first_name'))
+        self.assertWalksInOrder(('-last_name', '-first_name'))
+
+    def test_mixed_directions_are_rejected(self):
+        with self.assertRaises(ValueError):
+            CursorPaginator(CustomUser.objects.all(), 3, ('last_name', '-first_name'))
+
+    def test_invalid_cursor_is_404(self):
+        request_factory = RequestFactory()
+        paginator = CursorPaginator(CustomUser.objects.all(), 3, '-date_joined')
+        valid = paginator.page().next_cursor
+        tampered = [
+            'not-a-cursor',
+            valid[:-4],
+            base64.urlsafe_b64encode(b'["sideways","2024-01-01T00:00:00",1]').decode(),
+            base64.urlsafe_b64encode(b'["next","yesterday",1]').decode(),
+            base64.urlsafe_b64encode(b'["next","2024-01-01T00:00:00","one"]').decode(),
+        ]
+        for cursor in tampered:
+            request = request_factory.get('/', {'cursor': cursor})
+            with self.assertRaises(Http404, msg=cursor):
+                paginate_by_cursor(request, CustomUser.objects.all(), 3, '-date_joined')
+
+        self.client.force_login(CustomUser.objects.get(username='officer0'))
+        response = self.client.get(reverse('users:user_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+        # A cursor minted for another ordering does not fit this one.
+        response = self.client.get(reverse('users:user_list'), {'cursor': valid})
+        self.assertEqual(response.status_code, 404)
+        name_cursor = CursorPaginator(CustomUser.objects.all(), 3, ('last_name', 'first_name')).page().next_cursor
+        response = self.client.get(reverse('users:user_list'), {'cursor': name_cursor})
+        self.assertEqual(response.status_code, 200)
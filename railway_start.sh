@@ -13,6 +13,10 @@ pip install -r requirements.txt
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Pre-render the static public pages (served by WhiteNoise)
+echo "Pre-rendering public pages..."
+python manage.py prerender_pages
+
 # Run database migrations
 echo "Running database migrations..."
 python manage.py migrate --noinput
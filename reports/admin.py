@@ -1,3 +1,41 @@
 from django.contrib import admin
+from .models import TaskDailyRollup, TaskMonthlyRollup, ExportJob
 
-# Register your models here.
+
+class TaskRollupAdmin(admin.ModelAdmin):
+    """Task rollup admin (read-only; maintained automatically)."""
+    
+    list_filter = ('status', 'priority', 'category')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('assigned_to')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TaskDailyRollup)
+class TaskDailyRollupAdmin(TaskRollupAdmin):
+    list_display = ('day', 'status', 'priority', 'category', 'assigned_to', 'created_count', 'completed_count')
+    date_hierarchy = 'day'
+    ordering = ('-day',)
+
+
+@admin.register(TaskMonthlyRollup)
+class TaskMonthlyRollupAdmin(TaskRollupAdmin):
+    list_display = ('month', 'status', 'priority', 'category', 'assigned_to', 'created_count', 'completed_count')
+    ordering = ('-month',)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Export job admin."""
+    
+    list_display = ('data_type', 'format', 'requested_by', 'status', 'processed_rows', 'total_rows', 'created_at', 'finished_at')
+    list_filter = ('status', 'data_type', 'format', 'created_at')
+    search_fields = ('requested_by__username', 'error')
+    readonly_fields = ('total_rows', 'processed_rows', 'file', 'error', 'created_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
@@ -0,0 +1,258 @@
+"""
+Export sources and the background export job runner.
+
+Each data type in ``ExportJob.DATA_TYPE_CHOICES`` has a source: a header,
+a ``values_list`` queryset and a function turning one row of it into
+output values. ``run_export_job`` streams a source into a file in the
+job's format (CSV, JSON or XLSX), recording progress on the job as it
+goes; ``run_export_worker`` claims and runs pending jobs.
+"""
+import csv
+import json
+import os
+import tempfile
+from collections import namedtuple
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db.models import Count, DateTimeField, F, IntegerField, Q, Value
+from django.utils import timezone
+
+from mofa_task_tracker.exports import EXPORT_CHUNK_SIZE, date_range_filter, format_datetime, user_full_name
+from tasks.models import Task, TaskComment, TaskAttachment
+from .models import ExportJob
+
+User = get_user_model()
+
+# Rows written between progress updates on the job.
+PROGRESS_INTERVAL = 1000
+
+# A job still running this long after it started is taken to belong to a
+# worker that died (killed, redeployed, out of memory) and is failed.
+STALE_JOB_TIMEOUT = timedelta(hours=2)
+
+ExportSource = namedtuple('ExportSource', ['filename', 'header', 'queryset', 'make_row'])
+
+
+def task_source(date_from=None, date_to=None, task_id=None):
+    status_labels = dict(Task.STATUS_CHOICES)
+    priority_labels = dict(Task.PRIORITY_CHOICES)
+    category_labels = dict(Task.CATEGORY_CHOICES)
+
+    def make_row(values):
+        (pk, title, description, status, priority, category,
+         assigned_to, created_by, due_date, created_at, date_completed) = values
+        return [
+            pk,
+            title,
+            description,
+            status_labels.get(status, status),
+            priority_labels.get(priority, priority),
+            category_labels.get(category, category),
+            assigned_to or 'Unassigned',
+            created_by,
+            format_datetime(due_date),
+            format_datetime(created_at),
+            format_datetime(date_completed),
+        ]
+
+    queryset = Task.objects.filter(date_range_filter('created_at', date_from, date_to))
+    if task_id is not None:
+        queryset = queryset.filter(pk=task_id)
+    queryset = queryset.values_list(
+        'id', 'title', 'description', 'status', 'priority', 'category',
+        user_full_name('assigned_to__'), user_full_name('created_by__'),
+        'due_date', 'created_at', 'date_completed',
+    )
+    return ExportSource('tasks_export', [
+        'ID', 'Title', 'Description', 'Status', 'Priority', 'Category',
+        'Assigned To', 'Created By', 'Due Date', 'Created At', 'Completed At'
+    ], queryset, make_row)
+
+
+def user_source(date_from=None, date_to=None):
+    def make_row(values):
+        return [*values[:7], format_datetime(values[7]), format_datetime(values[8])]
+
+    queryset = User.objects.filter(date_range_filter('date_joined', date_from, date_to)).order_by('pk').values_list(
+        'id', 'username', 'first_name', 'last_name', 'email',
+        'is_staff', 'is_active', 'date_joined', 'last_login',
+    )
+    return ExportSource('users_export', [
+        'ID', 'Username', 'First Name', 'Last Name', 'Email',
+        'Is Staff', 'Is Active', 'Date Joined', 'Last Login'
+    ], queryset, make_row)
+
+
+def comment_source(date_from=None, date_to=None, task_id=None):
+    """
+    Comments and attachments in one UNION ALL query, oldest first. Each
+    side filters on its own timestamp and task, which the
+    (task, created_at) / (task, uploaded_at) and timestamp indexes serve.
+    """
+    def make_row(values):
+        kind, task_pk, task_title, author, timestamp, text, file_size, updated_at = values
+        return [kind, task_pk, task_title, author, format_datetime(timestamp), text,
+                '' if file_size is None else file_size, format_datetime(updated_at)]
+
+    comments = TaskComment.objects.filter(date_range_filter('created_at', date_from, date_to))
+    attachments = TaskAttachment.objects.filter(date_range_filter('uploaded_at', date_from, date_to))
+    if task_id is not None:
+        comments = comments.filter(task_id=task_id)
+        attachments = attachments.filter(task_id=task_id)
+
+    comments = comments.order_by().annotate(
+        kind=Value('Comment'), author_name=user_full_name('author__'), timestamp=F('created_at'),
+        text=F('content'), size=Value(None, output_field=IntegerField()), edited_at=F('updated_at'),
+    ).values_list('kind', 'task_id', 'task__title', 'author_name', 'timestamp', 'text', 'size', 'edited_at')
+    attachments = attachments.order_by().annotate(
+        kind=Value('Attachment'), author_name=user_full_name('uploaded_by__'), timestamp=F('uploaded_at'),
+        text=F('filename'), size=F('file_size'), edited_at=Value(None, output_field=DateTimeField()),
+    ).values_list('kind', 'task_id', 'task__title', 'author_name', 'timestamp', 'text', 'size', 'edited_at')
+
+    return ExportSource('task_comments_export', [
+        'Type', 'Task ID', 'Task Title', 'Author', 'Created At', 'Comment / File Name',
+        'Attachment Size (bytes)', 'Edited At'
+    ], comments.union(attachments, all=True).order_by('timestamp', 'task_id'), make_row)
+
+
+def performance_source(date_from=None, date_to=None):
+    """Per-assignee counts over the tasks created in the date range."""
+    in_range = date_range_filter('assigned_tasks__created_at', date_from, date_to)
+
+    def make_row(values):
+        return [*values, round((values[2] / values[1] * 100), 2)]
+
+    queryset = User.objects.annotate(
+        total_tasks=Count('assigned_tasks', filter=in_range),
+        completed_tasks=Count('assigned_tasks', filter=in_range & Q(assigned_tasks__status='completed')),
+        pending_tasks=Count('assigned_tasks', filter=in_range & Q(assigned_tasks__status='pending')),
+        in_progress_tasks=Count('assigned_tasks', filter=in_range & Q(assigned_tasks__status='in_progress')),
+        overdue_tasks=Count('assigned_tasks', filter=in_range & Q(
+            assigned_tasks__due_date__lt=timezone.now(),
+            assigned_tasks__status__in=['pending', 'in_progress']
+        ))
+    ).filter(total_tasks__gt=0).order_by('pk').values_list(
+        user_full_name(), 'total_tasks', 'completed_tasks', 'pending_tasks',
+        'in_progress_tasks', 'overdue_tasks',
+    )
+    return ExportSource('performance_export', [
+        'User', 'Total Tasks', 'Completed Tasks', 'Pending Tasks',
+        'In Progress Tasks', 'Overdue Tasks', 'Completion Rate (%)'
+    ], queryset, make_row)
+
+
+# Sources that accept a ``task_id`` filter.
+TASK_FILTERED_DATA_TYPES = {'tasks', 'comments'}
+
+EXPORT_SOURCES = {
+    'tasks': task_source,
+    'users': user_source,
+    'comments': comment_source,
+    'performance': performance_source,
+}
+
+
+def get_export_source(data_type, date_from=None, date_to=None, task_id=None):
+    if task_id is not None:
+        return EXPORT_SOURCES[data_type](date_from, date_to, task_id=task_id)
+    return EXPORT_SOURCES[data_type](date_from, date_to)
+
+
+def iter_export_rows(source):
+    for values in source.queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield source.make_row(values)
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_json(path, header, rows):
+    """Write a JSON array of objects one row at a time."""
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write('[')
+        for index, row in enumerate(rows):
+            output.write(',\n' if index else '\n')
+            json.dump(dict(zip(header, row)), output, ensure_ascii=False, default=str)
+        output.write('\n]\n')
+
+
+def write_xlsx(path, header, rows):
+    """Write an XLSX sheet in XlsxWriter's constant-memory (row-at-a-time) mode."""
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet()
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, header, bold)
+        for index, row in enumerate(rows, start=1):
+            worksheet.write_row(index, 0, row)
+    finally:
+        workbook.close()
+
+
+EXPORT_WRITERS = {
+    'csv': write_csv,
+    'json': write_json,
+    'xlsx': write_xlsx,
+}
+
+
+def track_progress(job, rows):
+    """Pass ``rows`` through, saving the running row count on ``job`` periodically."""
+    for count, row in enumerate(rows, start=1):
+        yield row
+        job.processed_rows = count
+        if count % PROGRESS_INTERVAL == 0:
+            ExportJob.objects.filter(pk=job.pk).update(processed_rows=count)
+
+
+def fail_stale_jobs(now=None):
+    """Fail running jobs started more than ``STALE_JOB_TIMEOUT`` ago; return how many."""
+    now = now or timezone.now()
+    return ExportJob.objects.filter(status='running', started_at__lt=now - STALE_JOB_TIMEOUT).update(
+        status='failed', error='The export worker stopped before the job finished.', finished_at=now,
+    )
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running and return it (None if there is none)."""
+    fail_stale_jobs()
+    pending = ExportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+    for pk in pending[:10]:
+        # The status condition makes the claim safe with several workers.
+        claimed = ExportJob.objects.filter(pk=pk, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        if claimed:
+            return ExportJob.objects.get(pk=pk)
+    return None
+
+
+def run_export_job(job):
+    """Render ``job`` to its file and mark it completed, or failed with the error."""
+    handle, path = tempfile.mkstemp(suffix=f'.{job.format}')
+    os.close(handle)
+    try:
+        source = get_export_source(job.data_type, job.date_from, job.date_to, job.task_id)
+        job.total_rows = source.queryset.count()
+        job.processed_rows = 0
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows, processed_rows=0)
+        EXPORT_WRITERS[job.format](path, source.header, track_progress(job, iter_export_rows(source)))
+        with open(path, 'rb') as rendered:
+            job.file.save(f'{source.filename}_{job.pk}.{job.format}', File(rendered), save=False)
+        job.status = 'completed'
+        job.error = ''
+    except Exception as exc:
+        job.status = 'failed'
+        job.error = str(exc) or exc.__class__.__name__
+    finally:
+        os.remove(path)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'file', 'total_rows', 'processed_rows', 'finished_at'])
+    return job
@@ -0,0 +1,26 @@
+from django import forms
+
+from .exports import TASK_FILTERED_DATA_TYPES
+from .models import ExportJob
+
+
+class ExportJobForm(forms.ModelForm):
+    """Export request form on the export centre."""
+    
+    class Meta:
+        model = ExportJob
+        fields = ['data_type', 'format', 'date_from', 'date_to', 'task']
+        widgets = {
+            # Looked up by ID; a select would list every task.
+            'task': forms.NumberInput(attrs={'min': '1'}),
+        }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        if cleaned_data.get('task') and cleaned_data.get('data_type') not in TASK_FILTERED_DATA_TYPES:
+            raise forms.ValidationError('A task can only be selected for task and comment exports.')
+        return cleaned_data
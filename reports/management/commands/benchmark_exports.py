@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from reports.exports import EXPORT_WRITERS, get_export_source, iter_export_rows
+from tasks.models import Task
+from tasks.views import task_export
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure peak Python memory while rendering the exports over growing numbers of '
+        'synthetic tasks: the export worker\'s file writers and the streamed "my tasks" CSV. '
+        'All data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Task counts to benchmark at.',
+        )
+        parser.add_argument(
+            '--formats', nargs='+', choices=sorted(EXPORT_WRITERS), default=sorted(EXPORT_WRITERS),
+            help='Export job file formats to benchmark.',
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['rows'])
+        self.stdout.write(f"{'export':<20}{'rows':>10}{'bytes out':>14}{'peak KiB':>12}{'seconds':>10}")
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(
+                username='export-benchmark', email='export-benchmark@example.com',
+                first_name='Export', last_name='Benchmark',
+            )
+            request = RequestFactory().get('/tasks/export/')
+            request.user = user
+            exports = [('my tasks csv', lambda: self.stream(task_export(request)))]
+            for data_type in ('tasks', 'performance'):
+                for format in options['formats']:
+                    exports.append((f'{data_type} {format}', self.job_writer(data_type, format)))
+
+            created = 0
+            for size in sizes:
+                # bulk_create skips the stats and rollup signals, which are
+                # not what is being measured.
+                Task.objects.bulk_create(
+                    [
+                        Task(
+                            title=f'Benchmark task {i}', description='Synthetic export benchmark row. ' * 4,
+                            created_by=user, assigned_to=user, status='completed' if i % 3 else 'pending',
+                        )
+                        for i in range(created, size)
+                    ],
+                    batch_size=1000,
+                )
+                created = size
+                for name, export in exports:
+                    self.stdout.write(f'{name:<20}{size:>10}' + self.measure(export))
+            transaction.set_rollback(True)
+
+    def stream(self, response):
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def job_writer(self, data_type, format):
+        """Render like ``run_export_job`` does, to a temporary file; return its size."""
+        def export():
+            source = get_export_source(data_type)
+            handle, path = tempfile.mkstemp(suffix=f'.{format}')
+            os.close(handle)
+            try:
+                EXPORT_WRITERS[format](path, source.header, iter_export_rows(source))
+                return os.path.getsize(path)
+            finally:
+                os.remove(path)
+        return export
+
+    def measure(self, export):
+        tracemalloc.start()
+        started = time.perf_counter()
+        written = export()
+        elapsed = time.perf_counter() - started
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return f'{written:>14}{peak / 1024:>12.0f}{elapsed:>10.2f}'
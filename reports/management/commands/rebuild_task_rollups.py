@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollups import rebuild_task_rollups
+
+
+class Command(BaseCommand):
+    help = 'Backfill the daily and monthly task rollup tables from the task table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rollup rows inserted per query.',
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild_task_rollups(batch_size=options['batch_size'])
+        for model, count in counts.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('Task rollups rebuilt.'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.exports import claim_next_job, run_export_job
+
+
+class Command(BaseCommand):
+    help = 'Render queued data exports to files (runs until stopped unless --once is given).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Process the jobs that are pending now, then exit.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds to wait between checks when the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            self.stdout.write(f'Running export job {job.pk}: {job}')
+            job = run_export_job(job)
+            if job.status == 'completed':
+                self.stdout.write(self.style.SUCCESS(f'Export job {job.pk} wrote {job.processed_rows} rows to {job.file.name}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Export job {job.pk} failed: {job.error}'))
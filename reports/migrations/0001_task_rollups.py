@@ -0,0 +1,59 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('on_hold', 'On Hold')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=20)),
+                ('category', models.CharField(choices=[('administrative', 'Administrative'), ('consular', 'Consular'), ('protocol', 'Protocol'), ('economic', 'Economic'), ('political', 'Political'), ('legal', 'Legal'), ('security', 'Security'), ('it', 'Information Technology'), ('finance', 'Finance'), ('hr', 'Human Resources'), ('other', 'Other')], max_length=50)),
+                ('created_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('month', models.DateField()),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Task Rollup',
+                'verbose_name_plural': 'Monthly Task Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('on_hold', 'On Hold')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=20)),
+                ('category', models.CharField(choices=[('administrative', 'Administrative'), ('consular', 'Consular'), ('protocol', 'Protocol'), ('economic', 'Economic'), ('political', 'Political'), ('legal', 'Legal'), ('security', 'Security'), ('it', 'Information Technology'), ('finance', 'Finance'), ('hr', 'Human Resources'), ('other', 'Other')], max_length=50)),
+                ('created_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('day', models.DateField()),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Task Rollup',
+                'verbose_name_plural': 'Daily Task Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskmonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('month', 'status', 'priority', 'category', 'assigned_to'), name='task_monthly_rollup_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'status', 'priority', 'category', 'assigned_to'), name='task_daily_rollup_key'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_comment_export_indexes'),
+        ('reports', '0002_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='task',
+            field=models.ForeignKey(blank=True, help_text='Only export this task (tasks and comments exports)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tasks.task'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+ROLLUP_FIELDS = ['status', 'priority', 'category', 'assigned_to_id']
+
+
+def backfill_task_rollups(apps, schema_editor):
+    """
+    0001_task_rollups created the rollup tables empty, so the trend charts
+    of installs that already had tasks started from zero. Count those
+    tasks into both tables (the rebuild_task_rollups computation, frozen
+    against these models).
+    """
+    Task = apps.get_model('tasks', 'Task')
+    TaskDailyRollup = apps.get_model('reports', 'TaskDailyRollup')
+    TaskMonthlyRollup = apps.get_model('reports', 'TaskMonthlyRollup')
+
+    sources = [
+        ('created_count', 'created_at', Task.objects.all()),
+        ('completed_count', 'date_completed', Task.objects.filter(status='completed', date_completed__isnull=False)),
+    ]
+    daily, monthly = {}, {}
+    for column, date_field, queryset in sources:
+        grouped = queryset.order_by().annotate(
+            day=TruncDate(date_field)
+        ).values('day', *ROLLUP_FIELDS).annotate(count=Count('id'))
+        for row in grouped:
+            dimensions = tuple(row[field] for field in ROLLUP_FIELDS)
+            for rows, period in ((daily, row['day']), (monthly, row['day'].replace(day=1))):
+                counts = rows.setdefault((period,) + dimensions, {'created_count': 0, 'completed_count': 0})
+                counts[column] += row['count']
+
+    for model, period_field, rows in ((TaskDailyRollup, 'day', daily), (TaskMonthlyRollup, 'month', monthly)):
+        model.objects.all().delete()
+        model.objects.bulk_create(
+            [
+                model(**{period_field: key[0]}, **dict(zip(ROLLUP_FIELDS, key[1:])), **counts)
+                for key, counts in rows.items()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_export_job_task'),
+        ('tasks', '0007_comment_export_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_task_rollups, migrations.RunPython.noop),
+    ]
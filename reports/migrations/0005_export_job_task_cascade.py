@@ -0,0 +1,20 @@
+# Generated by Django 4.2.27 on 2026-10-17 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_backfill_user_task_stats'),
+        ('reports', '0004_backfill_task_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='task',
+            field=models.ForeignKey(blank=True, help_text='Only export this task (tasks and comments exports)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tasks.task'),
+        ),
+    ]
@@ -1,3 +1,151 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class TaskRollup(models.Model):
+    """
+    Task counts per period and (status, priority, category, assignee).
+
+    ``created_count`` counts tasks by the day they were created and
+    ``completed_count`` completed tasks by the day they were completed, so a
+    trend chart sums a handful of rows per period instead of scanning the
+    task table. Kept current by reports.rollups and rebuilt by the
+    ``rebuild_task_rollups`` command.
+    """
+    
+    period_field = None
+    
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    category = models.CharField(max_length=50, choices=Task.CATEGORY_CHOICES)
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    created_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+
+
+class TaskDailyRollup(TaskRollup):
+    """Task rollup per calendar day (in the site time zone)."""
+    
+    period_field = 'day'
+    
+    day = models.DateField()
+    
+    class Meta:
+        verbose_name = 'Daily Task Rollup'
+        verbose_name_plural = 'Daily Task Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'status', 'priority', 'category', 'assigned_to'],
+                name='task_daily_rollup_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.status}/{self.priority}/{self.category}"
+
+
+class TaskMonthlyRollup(TaskRollup):
+    """Task rollup per calendar month; ``month`` is the first day of the month."""
+    
+    period_field = 'month'
+    
+    month = models.DateField()
+    
+    class Meta:
+        verbose_name = 'Monthly Task Rollup'
+        verbose_name_plural = 'Monthly Task Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['month', 'status', 'priority', 'category', 'assigned_to'],
+                name='task_monthly_rollup_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.status}/{self.priority}/{self.category}"
+
+
+class ExportJob(models.Model):
+    """
+    A data export rendered to a file by the export worker
+    (``run_export_worker``), so large exports do not run inside a request.
+    """
+    
+    DATA_TYPE_CHOICES = [
+        ('tasks', 'Tasks'),
+        ('users', 'Users'),
+        ('comments', 'Task Comments'),
+        ('performance', 'Performance Metrics'),
+    ]
+    
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+        ('xlsx', 'Excel'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    data_type = models.CharField(max_length=20, choices=DATA_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    date_from = models.DateField(null=True, blank=True)
+    date_to = models.DateField(null=True, blank=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+                             help_text="Only export this task (tasks and comments exports)")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.IntegerField(null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Export Job'
+        verbose_name_plural = 'Export Jobs'
+        indexes = [
+            models.Index(fields=['requested_by', '-created_at'], name='exportjob_user_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_data_type_display()} ({self.get_format_display()}) - {self.status}"
+    
+    @property
+    def is_active(self):
+        return self.status in ('pending', 'running')
+    
+    @property
+    def progress_percentage(self):
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(self.processed_rows / self.total_rows * 100))
+    
+    def get_date_range_display(self):
+        if self.date_from and self.date_to:
+            return f"{self.date_from:%b %d, %Y} – {self.date_to:%b %d, %Y}"
+        if self.date_from:
+            return f"From {self.date_from:%b %d, %Y}"
+        if self.date_to:
+            return f"Until {self.date_to:%b %d, %Y}"
+        return 'All Time'
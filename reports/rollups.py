@@ -0,0 +1,116 @@
+"""
+Maintenance of the ``TaskDailyRollup`` and ``TaskMonthlyRollup`` tables.
+
+Every task save or delete moves its contribution from the old rollup rows
+to the new ones (see reports.signals); ``rebuild_task_rollups`` recomputes
+both tables from the task table and is what the ``rebuild_task_rollups``
+command runs.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from tasks.models import Task
+from .models import TaskDailyRollup, TaskMonthlyRollup
+
+ROLLUP_FIELDS = ['status', 'priority', 'category', 'assigned_to_id']
+ROLLUP_MODELS = [TaskDailyRollup, TaskMonthlyRollup]
+
+
+def rollup_periods(day):
+    """The (model, period) rows a date falls into."""
+    return [(TaskDailyRollup, day), (TaskMonthlyRollup, day.replace(day=1))]
+
+
+def rollup_key_lookup(model, key):
+    return dict(zip([model.period_field] + ROLLUP_FIELDS, key))
+
+
+def rollup_contributions(state):
+    """{(model, key): {column: amount}} that a single task in ``state`` adds."""
+    contributions = {}
+    if state is None:
+        return contributions
+    dimensions = tuple(state[field] for field in ROLLUP_FIELDS)
+
+    def add(moment, column):
+        for model, period in rollup_periods(timezone.localdate(moment)):
+            counts = contributions.setdefault((model, (period,) + dimensions), {})
+            counts[column] = counts.get(column, 0) + 1
+
+    if state['created_at'] is not None:
+        add(state['created_at'], 'created_count')
+    if state['status'] == 'completed' and state['date_completed'] is not None:
+        add(state['date_completed'], 'completed_count')
+    return contributions
+
+
+def apply_rollup_change(old_state, new_state):
+    """
+    Move a task's counts from the rows for ``old_state`` to the rows for
+    ``new_state`` (either may be None for create/delete).
+    """
+    deltas = {}
+    for sign, state in ((-1, old_state), (1, new_state)):
+        for row_key, counts in rollup_contributions(state).items():
+            totals = deltas.setdefault(row_key, {})
+            for column, amount in counts.items():
+                totals[column] = totals.get(column, 0) + sign * amount
+
+    for (model, key), counts in deltas.items():
+        counts = {column: amount for column, amount in counts.items() if amount}
+        if counts:
+            _apply_delta(model, rollup_key_lookup(model, key), counts)
+
+
+def _apply_delta(model, lookup, counts):
+    updates = {column: F(column) + amount for column, amount in counts.items()}
+    # Look the row up by pk first: the assignee may be NULL, and unique
+    # constraints treat NULLs as distinct, so a duplicate row must not be
+    # updated twice.
+    pk = model.objects.filter(**lookup).values_list('pk', flat=True).first()
+    if pk is not None:
+        model.objects.filter(pk=pk).update(**updates)
+        return
+    if all(amount < 0 for amount in counts.values()):
+        # Nothing to take away from; the tables predate this task.
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{column: max(amount, 0) for column, amount in counts.items()})
+    except IntegrityError:
+        # Created concurrently by another save.
+        model.objects.filter(**lookup).update(**updates)
+
+
+def compute_task_rollups():
+    """Return {model: {key: {column: value}}} computed from the task table."""
+    sources = [
+        ('created_count', 'created_at', Task.objects.all()),
+        ('completed_count', 'date_completed', Task.objects.filter(status='completed', date_completed__isnull=False)),
+    ]
+    results = {model: {} for model in ROLLUP_MODELS}
+    for column, date_field, queryset in sources:
+        grouped = queryset.order_by().annotate(
+            day=TruncDate(date_field)
+        ).values('day', *ROLLUP_FIELDS).annotate(count=Count('id'))
+        for row in grouped:
+            dimensions = tuple(row[field] for field in ROLLUP_FIELDS)
+            for model, period in rollup_periods(row['day']):
+                counts = results[model].setdefault((period,) + dimensions, {'created_count': 0, 'completed_count': 0})
+                counts[column] += row['count']
+    return results
+
+
+def rebuild_task_rollups(batch_size=1000):
+    """Replace both rollup tables with values recomputed from the task table."""
+    computed = compute_task_rollups()
+    with transaction.atomic():
+        for model in ROLLUP_MODELS:
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [model(**rollup_key_lookup(model, key), **counts) for key, counts in computed[model].items()],
+                batch_size=batch_size,
+            )
+    return {model: len(computed[model]) for model in ROLLUP_MODELS}
@@ -0,0 +1,9 @@
+from django.dispatch import receiver
+
+from tasks.signals import task_changed
+from .rollups import apply_rollup_change
+
+
+@receiver(task_changed)
+def update_rollups(sender, old_state, new_state, **kwargs):
+    apply_rollup_change(old_state, new_state)
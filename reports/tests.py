@@ -1,3 +1,237 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import tempfile
+from datetime import timedelta
+from importlib import import_module
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task, TaskComment, TaskAttachment
+from users.models import CustomUser
+from .exports import STALE_JOB_TIMEOUT, claim_next_job, get_export_source, iter_export_rows, run_export_job
+from .models import TaskDailyRollup, TaskMonthlyRollup, ExportJob
+from .rollups import rebuild_task_rollups
+
+
+class TaskRollupTests(TestCase):
+    """Incremental rollups must agree with a rebuild from the task table."""
+
+    maxDiff = None
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='x', is_staff=True
+        )
+        self.officer = CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+
+    def snapshot(self):
+        rows = {}
+        for model in (TaskDailyRollup, TaskMonthlyRollup):
+            for row in model.objects.all():
+                key = (model.__name__, getattr(row, model.period_field), row.status, row.priority,
+                       row.category, row.assigned_to_id)
+                counts = rows.setdefault(key, [0, 0])
+                counts[0] += row.created_count
+                counts[1] += row.completed_count
+        return {key: counts for key, counts in rows.items() if counts != [0, 0]}
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_task_rollups()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_signals_move_counts_between_rows(self):
+        task = Task.objects.create(title='Visa', description='x', created_by=self.admin, priority='high')
+        Task.objects.create(title='Memo', description='x', created_by=self.admin, assigned_to=self.officer)
+        self.assertMatchesRebuild()
+
+        task.status = 'completed'
+        task.date_completed = timezone.now() + timedelta(days=40)
+        task.assigned_to = self.officer
+        task.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(TaskMonthlyRollup.objects.filter(completed_count=1).count(), 1)
+
+        task = Task.objects.only('id').get(pk=task.pk)
+        task.category = 'consular'
+        task.save()
+        self.assertMatchesRebuild()
+
+        task.delete()
+        self.assertMatchesRebuild()
+
+    def test_trend_charts_read_rollups(self):
+        Task.objects.create(title='Visa', description='x', created_by=self.admin)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('reports:task_analytics'))
+        self.assertEqual(response.context['monthly_tasks'], [
+            {'month': timezone.localdate().strftime('%Y-%m'), 'count': 1},
+        ])
+
+    def test_migration_backfills_existing_tasks(self):
+        Task.objects.create(title='Visa', description='x', created_by=self.admin, status='completed',
+                            date_completed=timezone.now())
+        expected = self.snapshot()
+        TaskDailyRollup.objects.all().delete()
+        TaskMonthlyRollup.objects.all().delete()
+        migration = ('reports', '0004_backfill_task_rollups')
+        # Run against the models as they were at that migration.
+        state_apps = MigrationLoader(connection).project_state(migration).apps
+        import_module('reports.migrations.0004_backfill_task_rollups').backfill_task_rollups(state_apps, None)
+        self.assertEqual(self.snapshot(), expected)
+
+
+class MonthlyReportTests(TestCase):
+    """The monthly report costs the same number of queries for any month and volume."""
+
+    # Session + user lookup, the monthly rollup, the completion average and
+    # the daily rollup.
+    EXPECTED_QUERIES = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='x', is_staff=True
+        )
+        cls.month = timezone.localdate().replace(day=1)
+        for i in range(12):
+            task = Task.objects.create(
+                title=f'Task {i}', description='x', created_by=cls.admin,
+                status='completed' if i % 3 == 0 else 'pending',
+            )
+            if task.status == 'completed':
+                task.date_completed = task.created_at + timedelta(days=i)
+                task.save()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_query_count_is_constant(self):
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('reports:monthly_report'))
+        self.assertEqual(response.context['total_monthly'], 12)
+        self.assertEqual(response.context['completed_monthly'], 4)
+        self.assertEqual(response.context['avg_completion_time'], 4.5)
+        self.assertEqual(len(response.context['daily_tasks']), timezone.localdate().day)
+        self.assertEqual(sum(day['count'] for day in response.context['daily_tasks']), 12)
+
+    def test_past_month_is_zero_filled(self):
+        previous = (self.month - timedelta(days=1)).replace(day=1)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('reports:monthly_report'), {'month': previous.strftime('%Y-%m')})
+        self.assertEqual(response.context['total_monthly'], 0)
+        self.assertEqual(len(response.context['daily_tasks']), (self.month - previous).days)
+        self.assertEqual(response.context['next_month'], self.month.strftime('%Y-%m'))
+
+
+    def test_out_of_range_month_falls_back_to_this_month(self):
+        for month in ('9999-12', '0001-01', '2024-13'):
+            response = self.client.get(reverse('reports:monthly_report'), {'month': month})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['total_monthly'], 12)
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportJobTests(TestCase):
+    """Exports are queued, rendered by the worker and downloaded from the stored file."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='x', is_staff=True,
+            first_name='Amina', last_name='Otieno',
+        )
+        self.officer = CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+        Task.objects.create(title='Visa', description='x', created_by=self.admin, assigned_to=self.officer,
+                            status='in_progress', category='consular')
+        Task.objects.create(title='Memo', description='x', created_by=self.officer)
+        self.client.force_login(self.admin)
+
+    def export(self, data_type, format, **dates):
+        response = self.client.post(reverse('reports:export_data'), {'data_type': data_type, 'format': format, **dates})
+        self.assertRedirects(response, reverse('reports:export_data'))
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, 'pending')
+        call_command('run_export_worker', once=True, stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed', job.error)
+        status = self.client.get(reverse('reports:export_job_status', args=[job.pk])).json()
+        self.assertEqual(status['progress'], 100)
+        response = self.client.get(status['download_url'])
+        return job, b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        job, content = self.export('tasks', 'csv')
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(job.processed_rows, 2)
+        by_title = {row[1]: row for row in rows[1:]}
+        self.assertEqual(by_title['Visa'][3:8], ['In Progress', 'Medium', 'Consular', 'officer', 'Amina Otieno'])
+        self.assertEqual(by_title['Memo'][6:8], ['Unassigned', 'officer'])
+
+    def test_json_export_with_date_range(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        job, content = self.export('tasks', 'json', date_from=tomorrow.isoformat())
+        self.assertEqual(json.loads(content), [])
+        ExportJob.objects.all().delete()
+        job, content = self.export('users', 'json', date_to=tomorrow.isoformat())
+        self.assertEqual(sorted(row['Username'] for row in json.loads(content)), ['admin', 'officer'])
+
+    def test_xlsx_export(self):
+        job, content = self.export('performance', 'xlsx')
+        self.assertTrue(content.startswith(b'PK'))
+        self.assertEqual(job.processed_rows, 1)
+
+    def test_comment_export_joins_comments_and_attachments(self):
+        task = Task.objects.get(title='Visa')
+        other = Task.objects.get(title='Memo')
+        TaskComment.objects.create(task=task, author=self.officer, content='Passport received')
+        TaskAttachment.objects.create(task=task, uploaded_by=self.admin, file='task_attachments/p.pdf',
+                                      filename='passport.pdf', file_size=2048)
+        TaskComment.objects.create(task=other, author=self.admin, content='Draft ready')
+
+        source = get_export_source('comments', task_id=task.pk)
+        with self.assertNumQueries(1):
+            rows = list(iter_export_rows(source))
+        self.assertEqual([row[0] for row in rows], ['Comment', 'Attachment'])
+        self.assertEqual(rows[0][1:4], [task.pk, 'Visa', 'officer'])
+        self.assertEqual(rows[1][5:7], ['passport.pdf', 2048])
+
+        job, content = self.export('comments', 'csv', task=task.pk)
+        self.assertEqual(job.processed_rows, 2)
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(list(iter_export_rows(get_export_source('comments', date_from=tomorrow))), [])
+
+    def test_source_errors_fail_the_job(self):
+        # A data type with no source makes get_export_source itself raise.
+        job = ExportJob.objects.create(requested_by=self.admin, data_type='retired', status='running',
+                                       started_at=timezone.now())
+        run_export_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', "'retired'"))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_stale_running_jobs_are_failed(self):
+        now = timezone.now()
+        stale = ExportJob.objects.create(requested_by=self.admin, data_type='tasks', status='running',
+                                         started_at=now - STALE_JOB_TIMEOUT - timedelta(minutes=1))
+        live = ExportJob.objects.create(requested_by=self.admin, data_type='users', status='running',
+                                        started_at=now - timedelta(minutes=5))
+        self.assertIsNone(claim_next_job())
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertTrue(stale.error)
+        self.assertEqual(live.status, 'running')
+
+    def test_deleting_the_task_removes_its_scoped_jobs(self):
+        task = Task.objects.get(title='Visa')
+        scoped = ExportJob.objects.create(requested_by=self.admin, data_type='comments', task=task)
+        unscoped = ExportJob.objects.create(requested_by=self.admin, data_type='comments')
+        task.delete()
+        # Had the job outlived its task it would have exported every task's comments.
+        self.assertFalse(ExportJob.objects.filter(pk=scoped.pk).exists())
+        self.assertTrue(ExportJob.objects.filter(pk=unscoped.pk).exists())
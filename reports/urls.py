@@ -8,4 +8,6 @@ urlpatterns = [
     path('team-performance/', views.team_performance, name='team_performance'),
     path('monthly-report/', views.monthly_report, name='monthly_report'),
     path('export-data/', views.export_data, name='export_data'),
+    path('export-data/jobs/<int:pk>/status/', views.export_job_status, name='export_job_status'),
+    path('export-data/jobs/<int:pk>/download/', views.export_job_download, name='export_job_download'),
 ]
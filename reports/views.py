@@ -1,14 +1,17 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
-from django.http import JsonResponse, HttpResponse
+from django.db.models import Count, Q, Sum, Avg, F
+from django.contrib import messages
+from django.http import JsonResponse, FileResponse, Http404
+from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
-import json
-import csv
+import os
 
 from tasks.models import Task
+from .forms import ExportJobForm
+from .models import TaskDailyRollup, TaskMonthlyRollup, ExportJob
 
 User = get_user_model()
 
@@ -36,13 +39,15 @@ def task_analytics(request):
     # Category breakdown
     category_stats = Task.objects.values('category').annotate(count=Count('category'))
     
-    # Monthly task creation trend (last 6 months)
-    six_months_ago = timezone.now() - timedelta(days=180)
-    monthly_tasks = Task.objects.filter(
-        created_at__gte=six_months_ago
-    ).extra(
-        select={'month': "strftime('%%Y-%%m', created_at)"}
-    ).values('month').annotate(count=Count('id')).order_by('month')
+    # Monthly task creation trend (last 6 months), from the monthly rollup
+    six_months_ago = timezone.localdate() - timedelta(days=180)
+    monthly_tasks = TaskMonthlyRollup.objects.filter(
+        month__gte=six_months_ago.replace(day=1)
+    ).values('month').annotate(count=Sum('created_count')).order_by('month')
+    monthly_tasks = [
+        {'month': row['month'].strftime('%Y-%m'), 'count': row['count']}
+        for row in monthly_tasks
+    ]
     
     context = {
         'total_tasks': total_tasks,
@@ -52,7 +57,7 @@ def task_analytics(request):
         'overdue_tasks': overdue_tasks,
         'priority_stats': list(priority_stats),
         'category_stats': list(category_stats),
-        'monthly_tasks': list(monthly_tasks),
+        'monthly_tasks': monthly_tasks,
     }
     
     return render(request, 'reports/task_analytics.html', context)
@@ -96,62 +101,81 @@ def team_performance(request):
     
     return render(request, 'reports/team_performance.html', context)
 
+# Months the monthly report accepts; outside these the previous/next month
+# arithmetic would overflow the date range.
+REPORT_YEARS = range(1900, 2101)
+
+def parse_month(value):
+    """Return the first day of the ``YYYY-MM`` month in ``value``, or None."""
+    try:
+        month = datetime.strptime(value or '', '%Y-%m').date()
+    except ValueError:
+        return None
+    return month if month.year in REPORT_YEARS else None
+
 @login_required
 @user_passes_test(admin_required)
 def monthly_report(request):
-    """Monthly Report Dashboard."""
-    # Get current month data
-    now = timezone.now()
-    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # Monthly statistics
-    monthly_tasks = Task.objects.filter(created_at__gte=start_of_month)
-    monthly_completed = monthly_tasks.filter(status='completed')
-    monthly_pending = monthly_tasks.filter(status='pending')
-    monthly_in_progress = monthly_tasks.filter(status='in_progress')
+    """Monthly Report Dashboard for ``?month=YYYY-MM`` (default: this month)."""
+    today = timezone.localdate()
+    first_day = parse_month(request.GET.get('month')) or today.replace(day=1)
+    next_month = (first_day + timedelta(days=32)).replace(day=1)
+    previous_month = (first_day - timedelta(days=1)).replace(day=1)
+    last_day = min(next_month - timedelta(days=1), today)
+    
+    # Status, priority and category counts of the month's tasks, in one
+    # grouped query over the monthly rollup
+    status_counts, priority_counts, category_counts = {}, {}, {}
+    rollup_rows = TaskMonthlyRollup.objects.filter(month=first_day).values(
+        'status', 'priority', 'category'
+    ).annotate(count=Sum('created_count'))
+    for row in rollup_rows:
+        for counts, field in ((status_counts, 'status'), (priority_counts, 'priority'), (category_counts, 'category')):
+            counts[row[field]] = counts.get(row[field], 0) + row['count']
     
     # Task completion rate
-    total_monthly = monthly_tasks.count()
-    completed_monthly = monthly_completed.count()
+    total_monthly = sum(status_counts.values())
+    completed_monthly = status_counts.get('completed', 0)
     completion_rate = round((completed_monthly / total_monthly * 100), 2) if total_monthly > 0 else 0
     
-    # Average completion time
-    completed_with_dates = monthly_completed.filter(date_completed__isnull=False)
-    if completed_with_dates.exists():
-        avg_completion_time = sum([
-            (task.date_completed - task.created_at).days 
-            for task in completed_with_dates
-        ]) / completed_with_dates.count()
-    else:
-        avg_completion_time = 0
-    
-    # Priority distribution
-    priority_dist = monthly_tasks.values('priority').annotate(count=Count('priority'))
-    
-    # Category distribution
-    category_dist = monthly_tasks.values('category').annotate(count=Count('category'))
-    
-    # Daily task creation trend
-    daily_tasks = []
-    for i in range(30):
-        date = start_of_month + timedelta(days=i)
-        if date <= now:
-            count = monthly_tasks.filter(created_at__date=date.date()).count()
-            daily_tasks.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'count': count
-            })
+    # Average completion time, computed by the database
+    avg_duration = Task.objects.filter(
+        created_at__gte=timezone.make_aware(datetime.combine(first_day, datetime.min.time())),
+        created_at__lt=timezone.make_aware(datetime.combine(next_month, datetime.min.time())),
+        status='completed',
+        date_completed__isnull=False,
+    ).aggregate(avg=Avg(F('date_completed') - F('created_at')))['avg']
+    avg_completion_time = avg_duration.total_seconds() / 86400 if avg_duration else 0
+    
+    # Priority and category distribution
+    priority_dist = [{'priority': key, 'count': count} for key, count in priority_counts.items() if count]
+    category_dist = [{'category': key, 'count': count} for key, count in category_counts.items() if count]
+    
+    # Daily task creation trend: one grouped query over the daily rollup,
+    # with days that had no tasks filled in as zero
+    daily_counts = dict(
+        TaskDailyRollup.objects.filter(
+            day__gte=first_day, day__lte=last_day
+        ).values('day').annotate(count=Sum('created_count')).values_list('day', 'count')
+    )
+    daily_tasks = [
+        {'date': day.strftime('%Y-%m-%d'), 'count': daily_counts.get(day, 0)}
+        for day in (first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1))
+    ]
     
     context = {
-        'month': now.strftime('%B %Y'),
+        'month': first_day.strftime('%B %Y'),
+        'selected_month': first_day.strftime('%Y-%m'),
+        'previous_month': previous_month.strftime('%Y-%m'),
+        'next_month': next_month.strftime('%Y-%m') if next_month <= today else None,
         'total_monthly': total_monthly,
         'completed_monthly': completed_monthly,
-        'pending_monthly': monthly_pending.count(),
-        'in_progress_monthly': monthly_in_progress.count(),
+        'pending_monthly': status_counts.get('pending', 0),
+        'in_progress_monthly': status_counts.get('in_progress', 0),
         'completion_rate': completion_rate,
         'avg_completion_time': round(avg_completion_time, 1),
-        'priority_dist': list(priority_dist),
-        'category_dist': list(category_dist),
+        'priority_dist': priority_dist,
+        'category_dist': category_dist,
         'daily_tasks': daily_tasks,
     }
     
@@ -160,142 +184,51 @@ def monthly_report(request):
 @login_required
 @user_passes_test(admin_required)
 def export_data(request):
-    """Export Data Dashboard."""
-    # Get export options
-    export_formats = ['CSV', 'JSON', 'Excel']
-    
-    # Get available data types
-    data_types = [
-        {'name': 'Tasks', 'description': 'All task data with details'},
-        {'name': 'Users', 'description': 'User information and statistics'},
-        {'name': 'Task Comments', 'description': 'All task comments and attachments'},
-        {'name': 'Performance Metrics', 'description': 'Team performance data'},
-    ]
-    
+    """Export Data Dashboard; exports are queued and rendered by the export worker."""
     if request.method == 'POST':
-        data_type = request.POST.get('data_type')
-        format_type = request.POST.get('format')
-        
-        if data_type == 'Tasks':
-            return export_tasks_csv()
-        elif data_type == 'Users':
-            return export_users_csv()
-        elif data_type == 'Task Comments':
-            return export_comments_csv()
-        elif data_type == 'Performance Metrics':
-            return export_performance_csv()
+        form = ExportJobForm(request.POST)
+        if form.is_valid():
+            job = form.save(commit=False)
+            job.requested_by = request.user
+            job.save()
+            messages.success(
+                request,
+                f'{job.get_data_type_display()} export queued. '
+                'It will appear below with a download link when it is ready.'
+            )
+            return redirect('reports:export_data')
+        for error in form.errors.values():
+            messages.error(request, error[0])
+    else:
+        form = ExportJobForm()
     
     context = {
-        'export_formats': export_formats,
-        'data_types': data_types,
+        'form': form,
+        'export_jobs': ExportJob.objects.filter(requested_by=request.user)[:10],
     }
     
     return render(request, 'reports/export_data.html', context)
 
-def export_tasks_csv():
-    """Export tasks data to CSV."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="tasks_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'ID', 'Title', 'Description', 'Status', 'Priority', 'Category',
-        'Assigned To', 'Created By', 'Due Date', 'Created At', 'Completed At'
-    ])
-    
-    tasks = Task.objects.select_related('assigned_to', 'created_by').all()
-    for task in tasks:
-        writer.writerow([
-            task.id,
-            task.title,
-            task.description,
-            task.get_status_display(),
-            task.get_priority_display(),
-            task.get_category_display(),
-            task.assigned_to.get_full_name() if task.assigned_to else 'Unassigned',
-            task.created_by.get_full_name(),
-            task.due_date.strftime('%Y-%m-%d %H:%M') if task.due_date else '',
-            task.created_at.strftime('%Y-%m-%d %H:%M'),
-            task.date_completed.strftime('%Y-%m-%d %H:%M') if task.date_completed else '',
-        ])
-    
-    return response
-
-def export_users_csv():
-    """Export users data to CSV."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="users_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'ID', 'Username', 'First Name', 'Last Name', 'Email',
-        'Is Staff', 'Is Active', 'Date Joined', 'Last Login'
-    ])
-    
-    users = User.objects.all()
-    for user in users:
-        writer.writerow([
-            user.id,
-            user.username,
-            user.first_name,
-            user.last_name,
-            user.email,
-            user.is_staff,
-            user.is_active,
-            user.date_joined.strftime('%Y-%m-%d %H:%M'),
-            user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else '',
-        ])
-    
-    return response
-
-def export_comments_csv():
-    """Export task comments data to CSV."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="task_comments_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Task ID', 'Task Title', 'Comment', 'Author', 'Created At'
-    ])
-    
-    # This would need to be implemented if you have a Comment model
-    # For now, we'll create a placeholder
-    writer.writerow(['No comments model implemented yet'])
-    
-    return response
+@login_required
+@user_passes_test(admin_required)
+def export_job_status(request, pk):
+    """Progress of one of the user's export jobs, polled by the export page."""
+    job = get_object_or_404(ExportJob, pk=pk, requested_by=request.user)
+    return JsonResponse({
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'processed_rows': job.processed_rows,
+        'total_rows': job.total_rows,
+        'progress': job.progress_percentage,
+        'download_url': reverse('reports:export_job_download', args=[job.pk]) if job.status == 'completed' else None,
+        'error': job.error,
+    })
 
-def export_performance_csv():
-    """Export performance metrics to CSV."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="performance_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'User', 'Total Tasks', 'Completed Tasks', 'Pending Tasks',
-        'In Progress Tasks', 'Overdue Tasks', 'Completion Rate (%)'
-    ])
-    
-    user_stats = User.objects.annotate(
-        total_tasks=Count('assigned_tasks'),
-        completed_tasks=Count('assigned_tasks', filter=Q(assigned_tasks__status='completed')),
-        pending_tasks=Count('assigned_tasks', filter=Q(assigned_tasks__status='pending')),
-        in_progress_tasks=Count('assigned_tasks', filter=Q(assigned_tasks__status='in_progress')),
-        overdue_tasks=Count('assigned_tasks', filter=Q(
-            assigned_tasks__due_date__lt=timezone.now(),
-            assigned_tasks__status__in=['pending', 'in_progress']
-        ))
-    ).filter(total_tasks__gt=0)
-    
-    for user in user_stats:
-        completion_rate = round((user.completed_tasks / user.total_tasks * 100), 2) if user.total_tasks > 0 else 0
-        writer.writerow([
-            user.get_full_name() or user.username,
-            user.total_tasks,
-            user.completed_tasks,
-            user.pending_tasks,
-            user.in_progress_tasks,
-            user.overdue_tasks,
-            completion_rate,
-        ])
-    
-    return response
\ No newline at end of file
+@login_required
+@user_passes_test(admin_required)
+def export_job_download(request, pk):
+    """Serve a finished export file; repeat downloads reuse the same file."""
+    job = get_object_or_404(ExportJob, pk=pk, requested_by=request.user, status='completed')
+    if not job.file:
+        raise Http404('Export file not found.')
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
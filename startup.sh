@@ -9,6 +9,9 @@ pip install -r requirements.txt
 # Collect static files
 python manage.py collectstatic --noinput
 
+# Pre-render the static public pages (served by WhiteNoise)
+python manage.py prerender_pages
+
 # Apply database migrations
 python manage.py migrate
 
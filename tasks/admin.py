@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task, TaskComment, TaskAttachment, ReportRequest
+from .models import Task, TaskComment, TaskAttachment, ReportRequest, UserTaskStats
 
 
 @admin.register(Task)
@@ -67,4 +67,21 @@ class ReportRequestAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('requested_by', 'assigned_to')
\ No newline at end of file
+        return super().get_queryset(request).select_related('requested_by', 'assigned_to')
+
+@admin.register(UserTaskStats)
+class UserTaskStatsAdmin(admin.ModelAdmin):
+    """User task statistics admin (read-only; maintained automatically)."""
+    
+    list_display = ('user', 'total_tasks', 'pending_tasks', 'in_progress_tasks', 'completed_tasks', 'overdue_tasks', 'urgent_tasks', 'updated_at')
+    search_fields = ('user__username', 'user__first_name', 'user__last_name')
+    ordering = ('-total_tasks',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
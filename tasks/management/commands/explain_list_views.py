@@ -0,0 +1,124 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from equipment.models import ICTEquipment, DeviceHistory, Directorate
+from equipment.views import EquipmentListView, AssignmentListView, IssueListView
+from mofa_task_tracker.pagination import CursorPaginator
+from tasks.views import TaskListView
+
+User = get_user_model()
+
+# SQLite reports a table scan as "SCAN <table>" and an index walk as
+# "SCAN <table> USING [COVERING] INDEX <name>"; only the former is a failure.
+SQLITE_TABLE_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)\s*$')
+POSTGRES_TABLE_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the representative queries of every list view and fail on sequential scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full query plan for every query, not only failing ones.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database backend: {connection.vendor}')
+
+        failures = []
+        for label, queryset in self.get_queries():
+            plan = self.explain(queryset)
+            scanned = self.find_table_scans(plan)
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'SEQ SCAN  {label} ({", ".join(scanned)})'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK        {label}'))
+            if scanned or options['verbose_plans']:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'{len(failures)} list view queries fall back to a sequential scan.')
+
+    def get_queries(self):
+        """Yield (label, queryset) pairs built by the list views themselves."""
+        user = User.objects.order_by('pk').first()
+        directorate = Directorate.objects.order_by('pk').first()
+        equipment = ICTEquipment.objects.order_by('pk').first()
+
+        task_filters = [
+            {},
+            {'search': 'passport renewal'},
+            {'status': 'pending'},
+            {'priority': 'high'},
+            {'category': 'it'},
+            {'is_urgent': 'on'},
+            {'is_overdue': 'on'},
+        ]
+        if user:
+            task_filters += [{'assigned_to': user.pk}, {'created_by': user.pk}]
+        for params in task_filters:
+            yield from self.view_queries(TaskListView, 'tasks:task_list', params)
+
+        for params in [{}, {'status': 'available'}, {'condition': 'needs_repair'}]:
+            yield from self.view_queries(EquipmentListView, 'equipment:equipment_list', params)
+
+        assignment_filters = [{}]
+        if directorate:
+            assignment_filters.append({'directorate': directorate.pk})
+        for params in assignment_filters:
+            yield from self.view_queries(AssignmentListView, 'equipment:assignment_list', params)
+
+        for params in [{}, {'status': 'reported'}, {'severity': 'critical'}]:
+            yield from self.view_queries(IssueListView, 'equipment:issue_list', params)
+
+        equipment_id = equipment.pk if equipment else 0
+        yield (
+            'equipment:equipment_detail history',
+            DeviceHistory.objects.filter(equipment_id=equipment_id)[:10],
+        )
+
+    def view_queries(self, view_class, label, params):
+        """Yield the first-page query and, for cursor-paginated views, a deep page."""
+        request = RequestFactory().get('/', params)
+        request.user = AnonymousUser()
+        view = view_class()
+        view.setup(request)
+        queryset = view.get_queryset()
+        label = f"{label} {' '.join(f'{key}={value}' for key, value in params.items())}".strip()
+
+        ordering = view.get_cursor_ordering() if hasattr(view, 'get_cursor_ordering') else None
+        if ordering is None:
+            yield label, queryset[:view.paginate_by]
+            return
+        paginator = CursorPaginator(queryset, view.paginate_by, ordering)
+        yield label, paginator.get_page_queryset()[0]
+        deep_cursor = paginator.make_cursor('next', timezone.now(), 2 ** 31)
+        yield f'{label} (deep page)', paginator.get_page_queryset(deep_cursor)[0]
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # On small tables the planner rightly prefers a seq scan, so
+            # disable it to check that an index path exists at all.
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                return queryset.explain()
+        return queryset.explain()
+
+    def find_table_scans(self, plan):
+        pattern = POSTGRES_TABLE_SCAN if connection.vendor == 'postgresql' else SQLITE_TABLE_SCAN
+        scanned = []
+        for line in plan.splitlines():
+            match = pattern.search(line)
+            if match:
+                scanned.append(match.group(1))
+        return scanned
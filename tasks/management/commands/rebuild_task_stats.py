@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import UserTaskStats
+from tasks.stats import rebuild_user_task_stats, refresh_overdue
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user task statistics table, or just refresh overdue counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--overdue-only', action='store_true',
+            help='Only refresh users whose next open due date has passed (cheap; run every few minutes).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of users rebuilt per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['overdue_only']:
+            stale = list(UserTaskStats.objects.filter(next_overdue_at__lte=now).values_list('user_id', flat=True))
+            for user_id in stale:
+                refresh_overdue(user_id, now)
+            self.stdout.write(self.style.SUCCESS(f'Refreshed overdue counts for {len(stale)} users.'))
+            return
+
+        batch_size = options['batch_size']
+        user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(user_ids), batch_size):
+            rebuild_user_task_stats(user_ids[start:start + batch_size], now)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task statistics for {len(user_ids)} users.'))
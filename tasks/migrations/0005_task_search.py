@@ -0,0 +1,92 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE tasks_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(room_number, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX task_search_vector_idx ON tasks_task USING gin (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS task_search_vector_idx",
+    "ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, room_number, description,
+        content='tasks_task', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, room_number, description)
+        VALUES (new.id, new.title, new.room_number, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, room_number, description)
+        VALUES ('delete', old.id, old.title, old.room_number, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, room_number, description ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, room_number, description)
+        VALUES ('delete', old.id, old.title, old.room_number, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, room_number, description)
+        VALUES (new.id, new.title, new.room_number, new.description);
+    END
+    """,
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+]
+
+
+def sqlite_has_fts5(cursor):
+    cursor.execute("PRAGMA compile_options")
+    return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def run_statements(schema_editor, postgres, sqlite):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            statements = postgres
+        elif connection.vendor == 'sqlite' and sqlite_has_fts5(cursor):
+            statements = sqlite
+        else:
+            # No full-text index; tasks.search falls back to icontains.
+            return
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_REVERSE, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_list_view_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_list_view_indexes'),
+        ('tasks', '0005_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('pending_tasks', models.IntegerField(default=0)),
+                ('in_progress_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('cancelled_tasks', models.IntegerField(default=0)),
+                ('on_hold_tasks', models.IntegerField(default=0)),
+                ('urgent_tasks', models.IntegerField(default=0, help_text='Urgent tasks that are still open')),
+                ('priority_low', models.IntegerField(default=0)),
+                ('priority_medium', models.IntegerField(default=0)),
+                ('priority_high', models.IntegerField(default=0)),
+                ('priority_urgent', models.IntegerField(default=0)),
+                ('category_administrative', models.IntegerField(default=0)),
+                ('category_consular', models.IntegerField(default=0)),
+                ('category_protocol', models.IntegerField(default=0)),
+                ('category_economic', models.IntegerField(default=0)),
+                ('category_political', models.IntegerField(default=0)),
+                ('category_legal', models.IntegerField(default=0)),
+                ('category_security', models.IntegerField(default=0)),
+                ('category_it', models.IntegerField(default=0)),
+                ('category_finance', models.IntegerField(default=0)),
+                ('category_hr', models.IntegerField(default=0)),
+                ('category_other', models.IntegerField(default=0)),
+                ('estimated_minutes_sum', models.BigIntegerField(default=0)),
+                ('estimated_minutes_count', models.IntegerField(default=0)),
+                ('actual_minutes_sum', models.BigIntegerField(default=0)),
+                ('actual_minutes_count', models.IntegerField(default=0)),
+                ('overdue_tasks', models.IntegerField(default=0)),
+                ('next_overdue_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Task Statistics',
+                'verbose_name_plural': 'User Task Statistics',
+                'indexes': [models.Index(fields=['next_overdue_at'], name='taskstats_next_overdue_idx')],
+            },
+        ),
+    ]
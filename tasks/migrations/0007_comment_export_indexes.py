@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_user_task_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskattachment',
+            index=models.Index(fields=['uploaded_at'], name='taskattach_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['created_at'], name='taskcomment_created_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+from django.db.models import Count, F, Min, Q, Sum
+from django.utils import timezone
+
+OPEN_STATUSES = ['pending', 'in_progress']
+MINUTE_FIELDS = ['estimated_minutes', 'actual_minutes']
+
+
+def breakdown_columns(Task):
+    """(column, field, value) for every status/priority/category counter."""
+    for field in ('status', 'priority', 'category'):
+        for value, _label in Task._meta.get_field(field).choices:
+            yield (f'{value}_tasks' if field == 'status' else f'{field}_{value}'), field, value
+
+
+def backfill_user_task_stats(apps, schema_editor):
+    """
+    0006_user_task_stats added the table empty, so the user directory,
+    which reads open-task counts from it, showed 0 for everyone with
+    older tasks. Give every user a row counted from the task table.
+    """
+    Task = apps.get_model('tasks', 'Task')
+    UserTaskStats = apps.get_model('tasks', 'UserTaskStats')
+    User = apps.get_model('users', 'CustomUser')
+    now = timezone.now()
+
+    aggregates = {
+        'total_tasks': Count('id'),
+        'urgent_tasks': Count('id', filter=Q(is_urgent=True, status__in=OPEN_STATUSES)),
+        'overdue_tasks': Count('id', filter=Q(due_date__lt=now, status__in=OPEN_STATUSES)),
+        'next_overdue_at': Min('due_date', filter=Q(due_date__gte=now, status__in=OPEN_STATUSES)),
+    }
+    for column, field, value in breakdown_columns(Task):
+        aggregates[column] = Count('id', filter=Q(**{field: value}))
+    for name in MINUTE_FIELDS:
+        aggregates[f'{name}_sum'] = Sum(name)
+        aggregates[f'{name}_count'] = Count(name)
+    counters = [column for column in aggregates if column != 'next_overdue_at']
+
+    # Disjoint groups, so each (user, task) pair is counted once.
+    groups = [
+        ('created_by', Task.objects.all()),
+        ('assigned_to', Task.objects.filter(assigned_to__isnull=False).exclude(assigned_to=F('created_by'))),
+        ('reported_by', Task.objects.filter(reported_by__isnull=False).exclude(
+            Q(reported_by=F('created_by')) | Q(reported_by=F('assigned_to'))
+        )),
+    ]
+    results = {}
+    for user_field, queryset in groups:
+        for row in queryset.order_by().values(user_field).annotate(**aggregates):
+            totals = results.setdefault(row.pop(user_field), {column: 0 for column in counters})
+            for column, value in row.items():
+                if column == 'next_overdue_at':
+                    totals[column] = min(filter(None, [totals.get(column), value]), default=None)
+                else:
+                    totals[column] += value or 0
+
+    no_tasks = {column: 0 for column in counters}
+    UserTaskStats.objects.all().delete()
+    UserTaskStats.objects.bulk_create(
+        [
+            UserTaskStats(user_id=user_id, **results.get(user_id, no_tasks))
+            for user_id in User.objects.values_list('pk', flat=True).iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_comment_export_indexes'),
+        ('users', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_task_stats, migrations.RunPython.noop),
+    ]
@@ -71,6 +71,26 @@ class Task(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
+        indexes = [
+            # Task list: default ordering and each single-field filter, all
+            # paginated by newest first.
+            models.Index(fields=['-created_at'], name='task_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='task_status_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='task_priority_created_idx'),
+            models.Index(fields=['category', '-created_at'], name='task_category_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at'], name='task_assignee_created_idx'),
+            models.Index(fields=['created_by', '-created_at'], name='task_creator_created_idx'),
+            models.Index(fields=['reported_by', '-created_at'], name='task_reporter_created_idx'),
+            # "Urgent only" and "overdue only" touch a small slice of the table.
+            models.Index(
+                fields=['-created_at'], name='task_urgent_created_idx',
+                condition=models.Q(is_urgent=True),
+            ),
+            models.Index(
+                fields=['due_date'], name='task_open_due_idx',
+                condition=models.Q(status__in=['pending', 'in_progress']),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
@@ -125,6 +145,11 @@ class TaskComment(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='taskcomment_task_created_idx'),
+            # Comment export by date range across all tasks.
+            models.Index(fields=['created_at'], name='taskcomment_created_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.get_full_name()} on {self.task.title}"
@@ -142,6 +167,10 @@ class TaskAttachment(models.Model):
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['task', '-uploaded_at'], name='taskattach_task_uploaded_idx'),
+            models.Index(fields=['uploaded_at'], name='taskattach_uploaded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.filename} - {self.task.title}"
@@ -171,4 +200,105 @@ class ReportRequest(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.title} - {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.title} - {self.get_status_display()}"
+
+class UserTaskStats(models.Model):
+    """
+    Per-user task counters, covering every task the user created, is
+    assigned to or reported. Kept current by the signal handlers in
+    tasks.signals and rebuilt by the ``rebuild_task_stats`` command.
+    """
+    
+    BREAKDOWN_CHOICES = {
+        'status': Task.STATUS_CHOICES,
+        'priority': Task.PRIORITY_CHOICES,
+        'category': Task.CATEGORY_CHOICES,
+    }
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_stats')
+    
+    # Status counters
+    total_tasks = models.IntegerField(default=0)
+    pending_tasks = models.IntegerField(default=0)
+    in_progress_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    cancelled_tasks = models.IntegerField(default=0)
+    on_hold_tasks = models.IntegerField(default=0)
+    urgent_tasks = models.IntegerField(default=0, help_text="Urgent tasks that are still open")
+    
+    # Priority counters
+    priority_low = models.IntegerField(default=0)
+    priority_medium = models.IntegerField(default=0)
+    priority_high = models.IntegerField(default=0)
+    priority_urgent = models.IntegerField(default=0)
+    
+    # Category counters
+    category_administrative = models.IntegerField(default=0)
+    category_consular = models.IntegerField(default=0)
+    category_protocol = models.IntegerField(default=0)
+    category_economic = models.IntegerField(default=0)
+    category_political = models.IntegerField(default=0)
+    category_legal = models.IntegerField(default=0)
+    category_security = models.IntegerField(default=0)
+    category_it = models.IntegerField(default=0)
+    category_finance = models.IntegerField(default=0)
+    category_hr = models.IntegerField(default=0)
+    category_other = models.IntegerField(default=0)
+    
+    # Time tracking (sums and counts, so averages can be kept incrementally)
+    estimated_minutes_sum = models.BigIntegerField(default=0)
+    estimated_minutes_count = models.IntegerField(default=0)
+    actual_minutes_sum = models.BigIntegerField(default=0)
+    actual_minutes_count = models.IntegerField(default=0)
+    
+    # Tasks become overdue without being saved, so the count is refreshed
+    # once the earliest open due date has passed.
+    overdue_tasks = models.IntegerField(default=0)
+    next_overdue_at = models.DateTimeField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'User Task Statistics'
+        verbose_name_plural = 'User Task Statistics'
+        indexes = [
+            models.Index(fields=['next_overdue_at'], name='taskstats_next_overdue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Task statistics for {self.user}"
+    
+    @staticmethod
+    def column_name(field, value):
+        """Return the counter column for a task field value, e.g. ('status', 'pending')."""
+        if field == 'status':
+            return f'{value}_tasks'
+        return f'{field}_{value}'
+    
+    @classmethod
+    def breakdown_columns(cls):
+        """Yield (column, field, value) for every status/priority/category counter."""
+        for field, choices in cls.BREAKDOWN_CHOICES.items():
+            for value, _label in choices:
+                yield cls.column_name(field, value), field, value
+    
+    def breakdown(self, field):
+        """Return [{field: value, 'count': n}, ...] for non-zero values, like values().annotate()."""
+        rows = []
+        for value, _label in sorted(self.BREAKDOWN_CHOICES[field]):
+            count = getattr(self, self.column_name(field, value))
+            if count:
+                rows.append({field: value, 'count': count})
+        return rows
+    
+    @property
+    def avg_estimated_minutes(self):
+        if not self.estimated_minutes_count:
+            return 0
+        return self.estimated_minutes_sum / self.estimated_minutes_count
+    
+    @property
+    def avg_actual_minutes(self):
+        if not self.actual_minutes_count:
+            return 0
+        return self.actual_minutes_sum / self.actual_minutes_count
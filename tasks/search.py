@@ -0,0 +1,133 @@
+"""
+Full-text search over tasks.
+
+PostgreSQL keeps a weighted ``tsvector`` in ``tasks_task.search_vector``
+(a generated column with a GIN index); SQLite keeps an FTS5 index in the
+``tasks_task_fts`` shadow table, maintained by triggers. Both are created
+by migration ``0005_task_search`` and stay in sync on every save without
+any application code. Other backends fall back to ``icontains``.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q, Value, BooleanField, FloatField, CharField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Snippet markers; the snippet is HTML-escaped before they become <mark> tags.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+SEARCH_CONFIG = 'english'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    """
+    Return True if SQLite was built with FTS5, in which case migration
+    0005_task_search created the index (it makes the same check). The
+    answer depends only on the SQLite library, so it is looked up once
+    per process.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def get_search_backend():
+    """Return 'postgresql', 'sqlite' or None when no full-text index is available."""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and fts5_available():
+        return 'sqlite'
+    return None
+
+
+def tokenize(query):
+    """Split free text into word tokens safe to embed in a match expression."""
+    return TOKEN_RE.findall(query.lower())
+
+
+def search_tasks(queryset, query):
+    """
+    Restrict ``queryset`` to tasks matching ``query``, best match first.
+
+    Every task is annotated with ``search_rank`` (higher is better) and
+    ``search_snippet`` (raw text with highlight markers, see
+    ``highlight_snippet``). Each word in the query is matched as a prefix,
+    and all words must match.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+
+    backend = get_search_backend()
+    if backend == 'postgresql':
+        queryset = _search_postgresql(queryset, tokens)
+    elif backend == 'sqlite':
+        queryset = _search_sqlite(queryset, tokens)
+    else:
+        queryset = _search_fallback(queryset, query)
+    return queryset.order_by('-search_rank', '-created_at')
+
+
+def _search_postgresql(queryset, tokens):
+    tsquery = ' & '.join(f'{token}:*' for token in tokens)
+    headline_options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=30, MinWords=10'
+    return queryset.filter(
+        RawSQL(
+            "tasks_task.search_vector @@ to_tsquery(%s::regconfig, %s)",
+            [SEARCH_CONFIG, tsquery],
+            output_field=BooleanField(),
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            "ts_rank(tasks_task.search_vector, to_tsquery(%s::regconfig, %s))",
+            [SEARCH_CONFIG, tsquery],
+            output_field=FloatField(),
+        ),
+        search_snippet=RawSQL(
+            "ts_headline(%s::regconfig, tasks_task.title || ' ' || tasks_task.description, "
+            "to_tsquery(%s::regconfig, %s), %s)",
+            [SEARCH_CONFIG, SEARCH_CONFIG, tsquery, headline_options],
+            output_field=CharField(),
+        ),
+    )
+
+
+def _search_sqlite(queryset, tokens):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    # Join the FTS5 table so MATCH drives the query; bm25() is
+    # lower-is-better, weighted title > room number > description.
+    return queryset.extra(
+        tables=['tasks_task_fts'],
+        where=['tasks_task_fts.rowid = tasks_task.id', 'tasks_task_fts MATCH %s'],
+        params=[match],
+        select={
+            'search_rank': '-bm25(tasks_task_fts, 10.0, 1.0, 5.0)',
+            'search_snippet': "snippet(tasks_task_fts, -1, %s, %s, '…', 16)",
+        },
+        select_params=[HIGHLIGHT_START, HIGHLIGHT_END],
+    )
+
+
+def _search_fallback(queryset, query):
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(room_number__icontains=query)
+    ).annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_snippet=Value('', output_field=CharField()),
+    )
+
+
+def highlight_snippet(snippet):
+    """Return a snippet as safe HTML with matched terms wrapped in <mark>."""
+    if not snippet:
+        return ''
+    html = escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+    return mark_safe(html)
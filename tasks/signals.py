@@ -0,0 +1,52 @@
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver, Signal
+
+from .models import Task
+from .stats import task_state, apply_task_change
+
+# Sent after a task is saved or deleted with ``old_state`` and ``new_state``
+# (see tasks.stats.task_state; None on create/delete), for tables derived
+# from tasks outside this app.
+task_changed = Signal()
+
+
+@receiver(post_init, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    """Keep the loaded values so a later save knows what changed."""
+    instance._stats_state = task_state(instance) if instance.pk else None
+
+
+def stored_task_state(pk):
+    stored = Task.objects.filter(pk=pk).first()
+    return task_state(stored) if stored else None
+
+
+@receiver(pre_save, sender=Task)
+def load_missing_task_state(sender, instance, raw=False, **kwargs):
+    """Fetch the stored row when the instance was loaded with deferred fields."""
+    if raw or instance._state.adding or instance._stats_state is not None:
+        return
+    instance._stats_state = stored_task_state(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else instance._stats_state
+    new_state = task_state(instance) or stored_task_state(instance.pk)
+    apply_task_change(old_state, new_state)
+    task_changed.send(sender=sender, instance=instance, old_state=old_state, new_state=new_state)
+    instance._stats_state = new_state
+
+
+@receiver(pre_delete, sender=Task)
+def load_task_state_before_delete(sender, instance, **kwargs):
+    if instance._stats_state is None:
+        instance._stats_state = stored_task_state(instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def update_stats_on_delete(sender, instance, **kwargs):
+    apply_task_change(instance._stats_state, None)
+    task_changed.send(sender=sender, instance=instance, old_state=instance._stats_state, new_state=None)
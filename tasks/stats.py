@@ -0,0 +1,217 @@
+"""
+Maintenance of the materialized ``UserTaskStats`` table.
+
+A task counts towards each distinct user among its creator, assignee and
+reporter. Saves and deletes apply per-user deltas (see tasks.signals);
+``rebuild_user_task_stats`` recomputes rows from the task table with three
+grouped queries and is what the ``rebuild_task_stats`` command runs.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, F, Count, Sum, Min, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Task, UserTaskStats
+
+OPEN_STATUSES = ['pending', 'in_progress']
+USER_FIELDS = ['created_by_id', 'assigned_to_id', 'reported_by_id']
+MINUTE_FIELDS = ['estimated_minutes', 'actual_minutes']
+# Snapshotted on every task; created_at and date_completed are only used by
+# receivers of tasks.signals.task_changed (e.g. the report rollups).
+TRACKED_FIELDS = (
+    USER_FIELDS + ['status', 'priority', 'category', 'is_urgent', 'due_date'] + MINUTE_FIELDS
+    + ['created_at', 'date_completed']
+)
+
+# Columns that are plain sums over tasks and can be kept with deltas.
+COUNTER_COLUMNS = (
+    ['total_tasks', 'urgent_tasks']
+    + [column for column, _field, _value in UserTaskStats.breakdown_columns()]
+    + [f'{name}_{kind}' for name in MINUTE_FIELDS for kind in ('sum', 'count')]
+)
+
+
+def user_tasks(user_id):
+    """All tasks that count towards ``user_id``."""
+    return Task.objects.filter(
+        Q(created_by_id=user_id) | Q(assigned_to_id=user_id) | Q(reported_by_id=user_id)
+    )
+
+
+def task_users(state):
+    """Distinct user ids a task state counts towards."""
+    return {state[field] for field in USER_FIELDS if state[field] is not None}
+
+
+def task_state(task):
+    """
+    Snapshot the fields the statistics depend on, or None if any of them
+    were not loaded (deferred) on this instance.
+    """
+    values = task.__dict__
+    if any(field not in values for field in TRACKED_FIELDS):
+        return None
+    return {field: values[field] for field in TRACKED_FIELDS}
+
+
+def task_contribution(state):
+    """Counter increments a single task in ``state`` adds for one of its users."""
+    contribution = {'total_tasks': 1}
+    for column, field, value in UserTaskStats.breakdown_columns():
+        if state[field] == value:
+            contribution[column] = 1
+    if state['is_urgent'] and state['status'] in OPEN_STATUSES:
+        contribution['urgent_tasks'] = 1
+    for name in MINUTE_FIELDS:
+        if state[name] is not None:
+            contribution[f'{name}_sum'] = state[name]
+            contribution[f'{name}_count'] = 1
+    return contribution
+
+
+def affects_overdue(state):
+    return state is not None and state['due_date'] is not None and state['status'] in OPEN_STATUSES
+
+
+def apply_task_change(old_state, new_state):
+    """
+    Move the counters of every affected user from ``old_state`` to
+    ``new_state`` (either may be None for create/delete).
+    """
+    old_users = task_users(old_state) if old_state else set()
+    new_users = task_users(new_state) if new_state else set()
+    missing = set()
+
+    for user_id in old_users | new_users:
+        delta = {}
+        if user_id in new_users:
+            for column, amount in task_contribution(new_state).items():
+                delta[column] = delta.get(column, 0) + amount
+        if user_id in old_users:
+            for column, amount in task_contribution(old_state).items():
+                delta[column] = delta.get(column, 0) - amount
+        updates = {column: F(column) + amount for column, amount in delta.items() if amount}
+        if not updates:
+            continue
+        updates['updated_at'] = timezone.now()
+        if not UserTaskStats.objects.filter(user_id=user_id).update(**updates) and new_state is not None:
+            missing.add(user_id)
+
+    if missing:
+        # No row yet (e.g. first task for this user); build it from scratch,
+        # which already includes this change and the overdue columns.
+        rebuild_user_task_stats(missing)
+    if affects_overdue(old_state) or affects_overdue(new_state):
+        for user_id in (old_users | new_users) - missing:
+            refresh_overdue(user_id)
+
+
+def overdue_aggregates(now):
+    return {
+        'overdue_tasks': Count('id', filter=Q(due_date__lt=now, status__in=OPEN_STATUSES)),
+        'next_overdue_at': Min('due_date', filter=Q(due_date__gte=now, status__in=OPEN_STATUSES)),
+    }
+
+
+def refresh_overdue(user_id, now=None):
+    """Recount overdue tasks for one user and move ``next_overdue_at`` forward."""
+    now = now or timezone.now()
+    values = user_tasks(user_id).filter(status__in=OPEN_STATUSES).aggregate(**overdue_aggregates(now))
+    UserTaskStats.objects.filter(user_id=user_id).update(updated_at=now, **values)
+    return values
+
+
+def stats_aggregates(now):
+    aggregates = {
+        'total_tasks': Count('id'),
+        'urgent_tasks': Count('id', filter=Q(is_urgent=True, status__in=OPEN_STATUSES)),
+    }
+    for column, field, value in UserTaskStats.breakdown_columns():
+        aggregates[column] = Count('id', filter=Q(**{field: value}))
+    for name in MINUTE_FIELDS:
+        aggregates[f'{name}_sum'] = Sum(name)
+        aggregates[f'{name}_count'] = Count(name)
+    aggregates.update(overdue_aggregates(now))
+    return aggregates
+
+
+def compute_user_task_stats(user_ids=None, now=None):
+    """
+    Return {user_id: {column: value}} computed from the task table.
+
+    Tasks are split into three disjoint groups (by creator; by assignee
+    when not the creator; by reporter when neither) so one grouped query
+    per group counts each (user, task) pair exactly once.
+    """
+    now = now or timezone.now()
+    aggregates = stats_aggregates(now)
+    groups = [
+        ('created_by', Task.objects.all()),
+        ('assigned_to', Task.objects.filter(assigned_to__isnull=False).exclude(assigned_to=F('created_by'))),
+        ('reported_by', Task.objects.filter(reported_by__isnull=False).exclude(
+            Q(reported_by=F('created_by')) | Q(reported_by=F('assigned_to'))
+        )),
+    ]
+
+    results = {}
+    for user_field, queryset in groups:
+        if user_ids is not None:
+            queryset = queryset.filter(**{f'{user_field}__in': user_ids})
+        for row in queryset.order_by().values(user_field).annotate(**aggregates):
+            user_id = row.pop(user_field)
+            totals = results.setdefault(user_id, {column: 0 for column in COUNTER_COLUMNS + ['overdue_tasks']})
+            for column, value in row.items():
+                if column == 'next_overdue_at':
+                    current = totals.get(column)
+                    totals[column] = min(filter(None, [current, value]), default=None)
+                else:
+                    totals[column] += value or 0
+    return results
+
+
+def rebuild_user_task_stats(user_ids=None, now=None):
+    """Recompute and store stats rows for ``user_ids`` (all users if None)."""
+    now = now or timezone.now()
+    if user_ids is None:
+        user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    user_ids = list(user_ids)
+    computed = compute_user_task_stats(user_ids, now)
+    columns = COUNTER_COLUMNS + ['overdue_tasks', 'next_overdue_at', 'updated_at']
+
+    rows = []
+    for user_id in user_ids:
+        values = {column: 0 for column in COUNTER_COLUMNS + ['overdue_tasks']}
+        values.update(computed.get(user_id, {}))
+        values.setdefault('next_overdue_at', None)
+        rows.append(UserTaskStats(user_id=user_id, updated_at=now, **values))
+
+    with transaction.atomic():
+        existing = set(UserTaskStats.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        UserTaskStats.objects.bulk_update([row for row in rows if row.user_id in existing], columns, batch_size=500)
+        UserTaskStats.objects.bulk_create(
+            [row for row in rows if row.user_id not in existing], batch_size=500, ignore_conflicts=True
+        )
+    return rows
+
+
+def get_user_task_stats(user):
+    """Return the user's stats row, creating it or refreshing overdue counts as needed."""
+    now = timezone.now()
+    stats = UserTaskStats.objects.filter(user=user).first()
+    if stats is None:
+        return rebuild_user_task_stats([user.pk], now)[0]
+    if stats.next_overdue_at is not None and stats.next_overdue_at <= now:
+        values = refresh_overdue(user.pk, now)
+        stats.overdue_tasks = values['overdue_tasks']
+        stats.next_overdue_at = values['next_overdue_at']
+    return stats
+
+
+def open_tasks_expression():
+    """
+    A user's open (pending or in progress) task count read from their
+    stats row, for annotating user querysets with a single join; 0 for
+    users who have no tasks.
+    """
+    return Coalesce(F('task_stats__pending_tasks') + F('task_stats__in_progress_tasks'), Value(0))
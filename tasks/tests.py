@@ -1,3 +1,216 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+from .models import Task, UserTaskStats
+from .search import get_search_backend, highlight_snippet, search_tasks
+from .stats import get_user_task_stats, rebuild_user_task_stats, COUNTER_COLUMNS
+
+
+class DashboardQueryCountTests(TestCase):
+    """The dashboard is the post-login landing page; keep its query count fixed."""
+
+    # Session + user lookup, the stats row, the monthly trend and recent tasks.
+    EXPECTED_QUERIES = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='officer', email='officer@example.com', password='secret-pass-123'
+        )
+        other = CustomUser.objects.create_user(
+            username='other', email='other@example.com', password='secret-pass-123'
+        )
+        now = timezone.now()
+        statuses = ['pending', 'in_progress', 'completed', 'cancelled', 'on_hold']
+        for i in range(25):
+            Task.objects.create(
+                title=f'Task {i}',
+                description='Routine task',
+                status=statuses[i % len(statuses)],
+                priority=['low', 'medium', 'high', 'urgent'][i % 4],
+                created_by=cls.user if i % 2 else other,
+                assigned_to=cls.user if not i % 2 else None,
+                due_date=now - timedelta(days=1) if i % 3 == 0 else None,
+                date_completed=now if statuses[i % len(statuses)] == 'completed' else None,
+                is_urgent=i % 4 == 0,
+                estimated_minutes=30 + i,
+            )
+        Task.objects.create(title='Not mine', description='x', created_by=other)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_query_count_is_constant(self):
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('tasks:dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_counters_match_per_status_queries(self):
+        response = self.client.get(reverse('tasks:dashboard'))
+        mine = Task.objects.filter(created_by=self.user) | Task.objects.filter(assigned_to=self.user)
+        self.assertEqual(response.context['total_tasks'], mine.count())
+        self.assertEqual(response.context['pending_tasks'], mine.filter(status='pending').count())
+        self.assertEqual(response.context['completed_tasks'], mine.filter(status='completed').count())
+        self.assertEqual(
+            response.context['overdue_tasks'],
+            mine.filter(due_date__lt=timezone.now(), status__in=['pending', 'in_progress']).count(),
+        )
+        by_status = {row['status']: row['count'] for row in response.context['tasks_by_status']}
+        self.assertEqual(sum(by_status.values()), mine.count())
+        self.assertEqual(response.context['monthly_completed'][0]['count'], mine.filter(status='completed').count())
+
+
+class UserTaskStatsTests(TestCase):
+    """Incremental maintenance must agree with a full rebuild."""
+
+    maxDiff = None
+    COLUMNS = COUNTER_COLUMNS + ['overdue_tasks', 'next_overdue_at']
+
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com', password='x')
+        self.carol = CustomUser.objects.create_user(username='carol', email='carol@example.com', password='x')
+        rebuild_user_task_stats()
+
+    def snapshot(self):
+        return {
+            row.user_id: {column: getattr(row, column) for column in self.COLUMNS}
+            for row in UserTaskStats.objects.all()
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_user_task_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_signals_track_status_assignee_due_date_and_urgency(self):
+        now = timezone.now()
+        task = Task.objects.create(
+            title='Visa', description='x', created_by=self.alice, assigned_to=self.bob,
+            estimated_minutes=45, due_date=now + timedelta(days=2),
+        )
+        Task.objects.create(title='Memo', description='x', created_by=self.bob, reported_by=self.bob, is_urgent=True)
+        self.assertMatchesRebuild()
+
+        task.status = 'in_progress'
+        task.assigned_to = self.carol
+        task.is_urgent = True
+        task.due_date = now - timedelta(hours=1)
+        task.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(UserTaskStats.objects.get(user=self.carol).overdue_tasks, 1)
+
+        task = Task.objects.only('id', 'title').get(pk=task.pk)
+        task.title = 'Visa renewal'
+        task.status = 'completed'
+        task.save()
+        self.assertMatchesRebuild()
+
+        task.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(UserTaskStats.objects.get(user=self.carol).total_tasks, 0)
+
+    def test_overdue_count_refreshes_without_writes(self):
+        task = Task.objects.create(
+            title='Report', description='x', created_by=self.alice,
+            due_date=timezone.now() + timedelta(hours=1),
+        )
+        self.assertEqual(get_user_task_stats(self.alice).overdue_tasks, 0)
+        Task.objects.filter(pk=task.pk).update(due_date=timezone.now() - timedelta(minutes=1))
+        UserTaskStats.objects.filter(user=self.alice).update(next_overdue_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(get_user_task_stats(self.alice).overdue_tasks, 1)
+
+
+class TaskSearchTests(TestCase):
+    """The full-text index follows task writes and matches every word as a prefix."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+        self.visa = Task.objects.create(
+            title='Visa application for the ambassador', description='Passport renewal before travel',
+            room_number='B12', created_by=self.user,
+        )
+        self.memo = Task.objects.create(title='Budget memo', description='Quarterly figures', created_by=self.user)
+
+    def search(self, query):
+        return list(search_tasks(Task.objects.all(), query).values_list('title', flat=True))
+
+    def indexed_ids(self, query):
+        """Row ids the index itself matches, before joining back to tasks."""
+        if get_search_backend() == 'sqlite':
+            sql = 'SELECT rowid FROM tasks_task_fts WHERE tasks_task_fts MATCH %s'
+        else:
+            sql = ("SELECT id FROM tasks_task WHERE search_vector @@ "
+                   "to_tsquery('english'::regconfig, %s || ':*')")
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [query])
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_uses_the_full_text_index(self):
+        self.assertIn(get_search_backend(), ('sqlite', 'postgresql'))
+        # The backend is settled once; each search is then a single query.
+        with self.assertNumQueries(1):
+            self.search('visa')
+
+    def test_prefix_and_multi_word_queries(self):
+        self.assertEqual(self.search('amba'), [self.visa.title])
+        self.assertEqual(self.search('B12'), [self.visa.title])
+        # Words may match different fields but must all match.
+        self.assertEqual(self.search('visa passp'), [self.visa.title])
+        self.assertEqual(self.search('visa budget'), [])
+        self.assertEqual(self.search('"Budget," (memo)'), [self.memo.title])
+
+    def test_punctuation_only_query_matches_nothing(self):
+        for query in ('?!', '"*"', '  -  '):
+            self.assertEqual(self.search(query), [])
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        task = Task.objects.create(title='Consular outreach', description='x', created_by=self.user)
+        self.assertEqual(self.search('consular'), [task.title])
+
+        task.title = 'Protocol briefing'
+        task.save()
+        self.assertEqual(self.search('consular'), [])
+        self.assertEqual(self.search('protocol'), [task.title])
+
+        task_id = task.pk
+        self.assertIn(task_id, self.indexed_ids('protocol'))
+        task.delete()
+        self.assertEqual(self.search('protocol'), [])
+        self.assertNotIn(task_id, self.indexed_ids('protocol'))
+
+    def test_snippet_highlights_matches(self):
+        task = search_tasks(Task.objects.all(), 'passport').get()
+        self.assertIn('<mark>Passport</mark>', highlight_snippet(task.search_snippet))
+
+    @skipUnless(connection.vendor == 'postgresql', 'search_vector is a PostgreSQL column')
+    def test_search_vector_is_generated(self):
+        self.assertEqual(self.indexed_ids('ambassador'), {self.visa.pk})
+
+
+class ExplainListViewsTests(TestCase):
+    """Smoke test: the list view queries are planned on the indexes added for them."""
+
+    EXPECTED_INDEXES = [
+        'task_created_idx', 'task_status_created_idx', 'task_assignee_created_idx', 'task_creator_created_idx',
+        'equipment_created_idx', 'equipment_status_created_idx', 'issue_reported_idx',
+        'history_equipment_time_idx',
+    ]
 
-# Create your tests here.
+    def test_plans_use_list_view_indexes(self):
+        CustomUser.objects.create_user(username='officer', email='officer@example.com', password='x')
+        out = StringIO()
+        # Raises CommandError if any query needs a sequential scan.
+        call_command('explain_list_views', verbose_plans=True, stdout=out)
+        output = out.getvalue()
+        self.assertNotIn('SEQ SCAN', output)
+        for index in self.EXPECTED_INDEXES:
+            self.assertIn(index, output)
@@ -11,15 +11,26 @@ from django.http import JsonResponse
 from django.db.models.functions import TruncMonth, TruncWeek
 from .models import Task, TaskComment, TaskAttachment, ReportRequest
 from .forms import TaskForm, TaskUpdateForm, TaskCommentForm, TaskAttachmentForm, TaskFilterForm, ReportRequestForm
+from .search import search_tasks, highlight_snippet
+from .stats import get_user_task_stats
 from users.models import CustomUser
+from mofa_task_tracker.exports import EXPORT_CHUNK_SIZE, format_datetime, streaming_csv_response, user_full_name
+from mofa_task_tracker.pagination import CursorPaginationMixin
 
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Task list view with filtering and search."""
     model = Task
     template_name = 'tasks/task_list.html'
     context_object_name = 'tasks'
     paginate_by = 20
+    cursor_ordering = '-created_at'
+    
+    def get_cursor_ordering(self):
+        # Search results are ordered by relevance, which has no stable key.
+        if self.request.GET.get('search'):
+            return None
+        return super().get_cursor_ordering()
     
     def get_queryset(self):
         queryset = Task.objects.select_related('created_by', 'assigned_to', 'reported_by').order_by('-created_at')
@@ -37,11 +48,7 @@ class TaskListView(LoginRequiredMixin, ListView):
             is_overdue = form.cleaned_data.get('is_overdue')
             
             if search:
-                queryset = queryset.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(room_number__icontains=search)
-                )
+                queryset = search_tasks(queryset, search)
             
             if status:
                 queryset = queryset.filter(status=status)
@@ -73,6 +80,8 @@ class TaskListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = TaskFilterForm(self.request.GET)
         context['view_mode'] = self.request.GET.get('view', 'card')
+        for task in context['tasks']:
+            task.search_highlight = highlight_snippet(getattr(task, 'search_snippet', ''))
         return context
 
 
@@ -151,41 +160,37 @@ def dashboard(request):
     """Dashboard view with statistics and charts."""
     user = request.user
     
-    # Get user's tasks
+    # Get user's tasks. All three conditions are on the task row itself,
+    # so no join (and no DISTINCT) is needed.
     user_tasks = Task.objects.filter(
         Q(created_by=user) | Q(assigned_to=user) | Q(reported_by=user)
-    ).distinct()
+    )
+    
+    # Counters, breakdowns and time averages from the materialized stats row
+    stats = get_user_task_stats(user)
     
     # Task statistics
-    total_tasks = user_tasks.count()
-    pending_tasks = user_tasks.filter(status='pending').count()
-    in_progress_tasks = user_tasks.filter(status='in_progress').count()
-    completed_tasks = user_tasks.filter(status='completed').count()
-    overdue_tasks = user_tasks.filter(
-        due_date__lt=timezone.now(),
-        status__in=['pending', 'in_progress']
-    ).count()
-    urgent_tasks = user_tasks.filter(is_urgent=True, status__in=['pending', 'in_progress']).count()
+    total_tasks = stats.total_tasks
+    pending_tasks = stats.pending_tasks
+    in_progress_tasks = stats.in_progress_tasks
+    completed_tasks = stats.completed_tasks
+    overdue_tasks = stats.overdue_tasks
+    urgent_tasks = stats.urgent_tasks
     
     # Recent tasks
-    recent_tasks = user_tasks.order_by('-created_at')[:10]
-    
-    # Tasks by status
-    tasks_by_status = user_tasks.values('status').annotate(count=Count('status')).order_by('status')
-    
-    # Tasks by priority
-    tasks_by_priority = user_tasks.values('priority').annotate(count=Count('priority')).order_by('priority')
-    
-    # Tasks by category
-    tasks_by_category = user_tasks.values('category').annotate(count=Count('category')).order_by('category')
+    recent_tasks = user_tasks.select_related('assigned_to').order_by('-created_at')[:10]
     
     # Monthly task completion trend
     monthly_completed = user_tasks.filter(
         status='completed',
         date_completed__isnull=False
-    ).extra(
-        select={'month': "strftime('%%Y-%%m', date_completed)"}
+    ).annotate(
+        month=TruncMonth('date_completed')
     ).values('month').annotate(count=Count('id')).order_by('month')
+    monthly_completed = [
+        {'month': row['month'].strftime('%Y-%m'), 'count': row['count']}
+        for row in monthly_completed
+    ]
     
     # Progress calculations
     completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
@@ -195,13 +200,8 @@ def dashboard(request):
     overdue_percentage = (overdue_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
     # Time tracking statistics (using minutes)
-    total_estimated_minutes = user_tasks.filter(estimated_minutes__isnull=False).aggregate(
-        total=Avg('estimated_minutes')
-    )['total'] or 0
-    
-    total_actual_minutes = user_tasks.filter(actual_minutes__isnull=False).aggregate(
-        total=Avg('actual_minutes')
-    )['total'] or 0
+    total_estimated_minutes = stats.avg_estimated_minutes
+    total_actual_minutes = stats.avg_actual_minutes
     
     # Convert minutes to hours for display
     avg_estimated_hours = round(total_estimated_minutes / 60, 1) if total_estimated_minutes else 0
@@ -215,10 +215,10 @@ def dashboard(request):
         'overdue_tasks': overdue_tasks,
         'urgent_tasks': urgent_tasks,
         'recent_tasks': recent_tasks,
-        'tasks_by_status': list(tasks_by_status),
-        'tasks_by_priority': list(tasks_by_priority),
-        'tasks_by_category': list(tasks_by_category),
-        'monthly_completed': list(monthly_completed),
+        'tasks_by_status': stats.breakdown('status'),
+        'tasks_by_priority': stats.breakdown('priority'),
+        'tasks_by_category': stats.breakdown('category'),
+        'monthly_completed': monthly_completed,
         'completion_percentage': round(completion_percentage, 1),
         'completed_percentage': round(completed_percentage, 1),
         'in_progress_percentage': round(in_progress_percentage, 1),
@@ -325,31 +325,36 @@ def task_complete(request, task_id):
 
 @login_required
 def task_export(request):
-    """Export tasks to CSV."""
-    import csv
-    from django.http import HttpResponse
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="tasks.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Title', 'Status', 'Priority', 'Category', 'Assigned To', 'Created By', 'Due Date', 'Created At'])
+    """Export the user's tasks to CSV, streamed in chunks."""
+    status_labels = dict(Task.STATUS_CHOICES)
+    priority_labels = dict(Task.PRIORITY_CHOICES)
+    category_labels = dict(Task.CATEGORY_CHOICES)
     
     # Get user's tasks
     user_tasks = Task.objects.filter(
         Q(created_by=request.user) | Q(assigned_to=request.user) | Q(reported_by=request.user)
-    ).distinct().select_related('assigned_to', 'created_by')
-    
-    for task in user_tasks:
-        writer.writerow([
-            task.title,
-            task.get_status_display(),
-            task.get_priority_display(),
-            task.get_category_display(),
-            task.assigned_to.get_full_name() if task.assigned_to else '',
-            task.created_by.get_full_name(),
-            task.due_date.strftime('%Y-%m-%d %H:%M') if task.due_date else '',
-            task.created_at.strftime('%Y-%m-%d %H:%M'),
-        ])
-    
-    return response
\ No newline at end of file
+    ).values_list(
+        'title', 'status', 'priority', 'category',
+        user_full_name('assigned_to__'), user_full_name('created_by__'),
+        'due_date', 'created_at',
+    )
+    
+    rows = (
+        [
+            title,
+            status_labels.get(status, status),
+            priority_labels.get(priority, priority),
+            category_labels.get(category, category),
+            assigned_to or '',
+            created_by,
+            format_datetime(due_date),
+            format_datetime(created_at),
+        ]
+        for title, status, priority, category, assigned_to, created_by, due_date, created_at
+        in user_tasks.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return streaming_csv_response(
+        'tasks.csv',
+        ['Title', 'Status', 'Priority', 'Category', 'Assigned To', 'Created By', 'Due Date', 'Created At'],
+        rows,
+    )
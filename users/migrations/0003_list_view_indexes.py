@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_customuser_options_remove_customuser_position_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_name', 'first_name'], name='user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-date_joined'], name='user_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['department', 'last_name', 'first_name'], name='user_department_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetrequest',
+            index=models.Index(fields=['-requested_at'], name='pwreset_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetrequest',
+            index=models.Index(fields=['status', '-requested_at'], name='pwreset_status_requested_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+SEARCH_FIELDS = ['username', 'email', 'first_name', 'last_name']
+
+# Indexes on LOWER(field) for users.search: PostgreSQL needs the
+# text_pattern_ops operator class for LIKE 'prefix%' to use them, SQLite
+# answers the prefix as a range on the expression.
+POSTGRES_FORWARD = [
+    f"CREATE INDEX user_{field}_lower_idx ON users_customuser (LOWER({field}) text_pattern_ops)"
+    for field in SEARCH_FIELDS
+]
+
+SQLITE_FORWARD = [
+    f"CREATE INDEX user_{field}_lower_idx ON users_customuser (LOWER({field}))"
+    for field in SEARCH_FIELDS
+]
+
+REVERSE = [f"DROP INDEX IF EXISTS user_{field}_lower_idx" for field in SEARCH_FIELDS]
+
+
+def run_statements(schema_editor, postgres, sqlite):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = postgres
+    elif connection.vendor == 'sqlite':
+        statements = sqlite
+    else:
+        # users.search still works, without an index.
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_search_indexes(apps, schema_editor):
+    run_statements(schema_editor, REVERSE, REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_list_view_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
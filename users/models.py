@@ -30,6 +30,13 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email', 'first_name', 'last_name']
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='user_name_idx'),
+            models.Index(fields=['-date_joined'], name='user_joined_idx'),
+            models.Index(fields=['department', 'last_name', 'first_name'], name='user_department_name_idx'),
+        ]
+    
     def __str__(self):
         return self.username
     
@@ -60,6 +67,10 @@ class PasswordResetRequest(models.Model):
         ordering = ['-requested_at']
         verbose_name = 'Password Reset Request'
         verbose_name_plural = 'Password Reset Requests'
+        indexes = [
+            models.Index(fields=['-requested_at'], name='pwreset_requested_idx'),
+            models.Index(fields=['status', '-requested_at'], name='pwreset_status_requested_idx'),
+        ]
     
     def __str__(self):
         return f"Password reset request for {self.user.username} - {self.status}"
@@ -0,0 +1,36 @@
+"""
+Prefix search over users.
+
+Every word of the query must start the user's first name, last name,
+username or email, ignoring case. Migration ``0004_user_search_indexes``
+indexes ``LOWER()`` of each of those fields, so each word is a few index
+range scans rather than a ``LIKE '%word%'`` over the whole table.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan, StartsWith
+
+SEARCH_FIELDS = ['first_name', 'last_name', 'username', 'email']
+
+# Sorts after any character that can follow a prefix.
+MAX_CHARACTER = '\U0010ffff'
+
+
+def prefix_match(field, prefix):
+    """Q for ``field`` starting with ``prefix`` (lower case) that the LOWER() index can serve."""
+    if connection.vendor == 'sqlite':
+        # SQLite cannot use an expression index for LIKE; compare as a range.
+        return Q(GreaterThanOrEqual(Lower(field), prefix)) & Q(LessThan(Lower(field), prefix + MAX_CHARACTER))
+    return Q(StartsWith(Lower(field), prefix))
+
+
+def user_search_filter(query):
+    """Q for users matching every word of ``query``."""
+    condition = Q()
+    for word in query.lower().split():
+        condition &= reduce(or_, (prefix_match(field, word) for field in SEARCH_FIELDS))
+    return condition
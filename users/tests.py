@@ -1,3 +1,123 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task, UserTaskStats
+from .models import CustomUser, PasswordResetRequest
+from .search import user_search_filter
+from .views import USERS_PER_PAGE
+
+
+class UserDirectoryTests(TestCase):
+    """The user pages are cursor-paginated, searched by prefix and cost the same at any size."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', password='x',
+            first_name='Amina', last_name='Zulu', is_staff=True,
+        )
+        self.client.force_login(self.admin)
+
+    def create_users(self, count, start=0):
+        return [
+            CustomUser.objects.create_user(
+                username=f'officer{i}', email=f'officer{i}@example.com',
+                first_name=f'First{i % 3}', last_name=f'Last{i // 3:03d}',
+            )
+            for i in range(start, start + count)
+        ]
+
+    def page_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        return response, len(queries)
+
+    def test_search_matches_every_word_as_a_prefix(self):
+        CustomUser.objects.create_user(username='jsmith', email='john.smith@example.com', password='x',
+                                       first_name='John', last_name='Smith')
+        CustomUser.objects.create_user(username='jdoe', email='jane@example.com', password='x',
+                                       first_name='Jane', last_name='Doe')
+
+        def usernames(query):
+            return sorted(CustomUser.objects.filter(user_search_filter(query)).values_list('username', flat=True))
+
+        self.assertEqual(usernames('jo SMI'), ['jsmith'])
+        self.assertEqual(usernames('j'), ['jdoe', 'jsmith'])
+        self.assertEqual(usernames('jane@'), ['jdoe'])
+        self.assertEqual(usernames('ohn'), [])
+
+    def test_directory_pages_in_name_order(self):
+        self.create_users(USERS_PER_PAGE + 5)
+        expected = list(CustomUser.objects.order_by('last_name', 'first_name', 'pk').values_list('username', flat=True))
+
+        first = self.client.get(reverse('users:user_list'))
+        second = self.client.get(reverse('users:user_list'), {'cursor': first.context['page_obj'].next_cursor})
+        self.assertEqual([user.username for user in first.context['users']] +
+                         [user.username for user in second.context['users']], expected)
+        self.assertFalse(second.context['page_obj'].has_next())
+        self.assertEqual(self.client.get(reverse('users:user_list'), {'cursor': 'junk'}).status_code, 404)
+
+    def test_open_task_counts_are_annotated(self):
+        officer, = self.create_users(1)
+        for status in ('pending', 'in_progress', 'completed'):
+            Task.objects.create(title='Brief', description='x', created_by=self.admin, assigned_to=officer, status=status)
+        response = self.client.get(reverse('users:admin_user_management'))
+        self.assertEqual({user.username: user.open_tasks for user in response.context['users']},
+                         {'officer0': 2, 'admin': 2})
+        self.assertContains(self.client.get(reverse('users:user_list')), '2 open tasks', count=2)
+
+    def test_migration_backfills_missing_stats_rows(self):
+        officer, = self.create_users(1)
+        Task.objects.create(title='Brief', description='x', created_by=self.admin, assigned_to=officer,
+                            due_date=timezone.now() - timedelta(days=1), estimated_minutes=30)
+        Task.objects.create(title='Visa', description='x', created_by=officer, reported_by=self.admin,
+                            status='completed', category='consular')
+        expected = self.stats_snapshot()
+        UserTaskStats.objects.all().delete()
+        # Run against the models as they were at that migration.
+        state_apps = MigrationLoader(connection).project_state(('tasks', '0008_backfill_user_task_stats')).apps
+        import_module('tasks.migrations.0008_backfill_user_task_stats').backfill_user_task_stats(state_apps, None)
+        self.assertEqual(self.stats_snapshot(), expected)
+        response = self.client.get(reverse('users:user_list'))
+        self.assertEqual({user.username: user.open_tasks for user in response.context['users']},
+                         {'officer0': 1, 'admin': 1})
+
+    def stats_snapshot(self):
+        columns = [field.attname for field in UserTaskStats._meta.concrete_fields if field.name != 'updated_at']
+        return sorted(UserTaskStats.objects.values_list(*columns))
+
+    def test_admin_pages_cost_the_same_as_users_grow(self):
+        self.create_users(3)
+        _response, small = self.page_queries(reverse('users:admin_user_management'))
+        self.create_users(USERS_PER_PAGE * 2, start=3)
+        response, large = self.page_queries(reverse('users:admin_user_management'))
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context['users']), USERS_PER_PAGE)
+        self.assertEqual(
+            [response.context[key] for key in ('total_users', 'active_users', 'staff_users', 'superusers')],
+            [USERS_PER_PAGE * 2 + 4, USERS_PER_PAGE * 2 + 4, 1, 0],
+        )
+        _response, directory = self.page_queries(reverse('users:user_list'), {'search': 'last0'})
+        self.create_users(USERS_PER_PAGE, start=200)
+        self.assertEqual(self.page_queries(reverse('users:user_list'), {'search': 'last0'})[1], directory)
+
+    def test_password_reset_requests_are_paginated_with_counters(self):
+        officers = self.create_users(30)
+        for officer in officers:
+            PasswordResetRequest.objects.create(user=officer, status='completed' if officer.pk % 2 else 'pending')
+        response, queries = self.page_queries(reverse('users:password_reset_requests'), {'status': 'pending'})
+        pending = PasswordResetRequest.objects.filter(status='pending').count()
+        self.assertEqual((response.context['total_requests'], response.context['matching_requests']), (30, pending))
+        self.assertEqual(len(response.context['reset_requests']), pending)
+        self.assertContains(response, f'({pending} found)')
 
-# Create your tests here.
+        response, more_queries = self.page_queries(reverse('users:password_reset_requests'))
+        self.assertEqual(len(response.context['reset_requests']), 25)
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertEqual(more_queries, queries)
@@ -10,7 +10,13 @@ from django.db.models import Count, Q
 from django.utils import timezone
 from .forms import CustomUserCreationForm, CustomUserChangeForm, UserProfileForm, CustomAuthenticationForm
 from .models import CustomUser, PasswordResetRequest
+from mofa_task_tracker.pagination import paginate_by_cursor
 from tasks.models import Task
+from tasks.stats import get_user_task_stats, open_tasks_expression
+from .search import user_search_filter
+
+USERS_PER_PAGE = 24
+RESET_REQUESTS_PER_PAGE = 25
 
 
 class CustomLoginView(LoginView):
@@ -67,22 +73,17 @@ class ProfileView(LoginRequiredMixin, DetailView):
         user = self.request.user
         
         # Get user's task statistics
-        user_tasks = Task.objects.filter(
-            Q(created_by=user) | Q(assigned_to=user) | Q(reported_by=user)
-        ).distinct()
+        stats = get_user_task_stats(user)
         
         context.update({
             'page_title': 'My Profile',
             'form': UserProfileForm(instance=user),
-            'total_tasks': user_tasks.count(),
-            'pending_tasks': user_tasks.filter(status='pending').count(),
-            'in_progress_tasks': user_tasks.filter(status='in_progress').count(),
-            'completed_tasks': user_tasks.filter(status='completed').count(),
-            'overdue_tasks': user_tasks.filter(
-                due_date__lt=timezone.now(),
-                status__in=['pending', 'in_progress']
-            ).count(),
-            'urgent_tasks': user_tasks.filter(is_urgent=True, status__in=['pending', 'in_progress']).count(),
+            'total_tasks': stats.total_tasks,
+            'pending_tasks': stats.pending_tasks,
+            'in_progress_tasks': stats.in_progress_tasks,
+            'completed_tasks': stats.completed_tasks,
+            'overdue_tasks': stats.overdue_tasks,
+            'urgent_tasks': stats.urgent_tasks,
         })
         return context
 
@@ -110,8 +111,8 @@ def dashboard(request):
 
 @login_required
 def user_list(request):
-    """List all users."""
-    users = CustomUser.objects.all().order_by('last_name', 'first_name')
+    """List all users, a page at a time in name order."""
+    users = CustomUser.objects.annotate(open_tasks=open_tasks_expression())
     
     # Get department filter
     department = request.GET.get('department')
@@ -121,19 +122,15 @@ def user_list(request):
     # Get search query
     search = request.GET.get('search')
     if search:
-        users = users.filter(
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(email__icontains=search) |
-            Q(username__icontains=search)
-        )
+        users = users.filter(user_search_filter(search))
     
-    context = {
-        'users': users,
+    context = paginate_by_cursor(request, users, USERS_PER_PAGE, ('last_name', 'first_name'))
+    context.update({
+        'users': context['page_obj'].object_list,
         'departments': CustomUser.DEPARTMENT_CHOICES,
         'selected_department': department,
         'search_query': search,
-    }
+    })
     return render(request, 'users/user_list.html', context)
 
 
@@ -143,21 +140,16 @@ def user_detail(request, pk):
     user = get_object_or_404(CustomUser, pk=pk)
     
     # Get user's task statistics
-    user_tasks = Task.objects.filter(
-        Q(created_by=user) | Q(assigned_to=user) | Q(reported_by=user)
-    ).distinct()
+    stats = get_user_task_stats(user)
     
     context = {
         'user_profile': user,
-        'total_tasks': user_tasks.count(),
-        'pending_tasks': user_tasks.filter(status='pending').count(),
-        'in_progress_tasks': user_tasks.filter(status='in_progress').count(),
-        'completed_tasks': user_tasks.filter(status='completed').count(),
-        'overdue_tasks': user_tasks.filter(
-            due_date__lt=timezone.now(),
-            status__in=['pending', 'in_progress']
-        ).count(),
-        'urgent_tasks': user_tasks.filter(is_urgent=True, status__in=['pending', 'in_progress']).count(),
+        'total_tasks': stats.total_tasks,
+        'pending_tasks': stats.pending_tasks,
+        'in_progress_tasks': stats.in_progress_tasks,
+        'completed_tasks': stats.completed_tasks,
+        'overdue_tasks': stats.overdue_tasks,
+        'urgent_tasks': stats.urgent_tasks,
     }
     return render(request, 'users/user_detail.html', context)
 
@@ -165,40 +157,35 @@ def user_detail(request, pk):
 @login_required
 @user_passes_test(lambda u: u.is_staff or u.is_superuser)
 def admin_user_management(request):
-    """Admin user management dashboard."""
-    users = CustomUser.objects.all().order_by('-date_joined')
+    """Admin user management dashboard, newest accounts first."""
+    users = CustomUser.objects.annotate(open_tasks=open_tasks_expression())
     
     # Get statistics
-    total_users = users.count()
-    active_users = users.filter(is_active=True).count()
-    staff_users = users.filter(is_staff=True).count()
-    superusers = users.filter(is_superuser=True).count()
+    counters = CustomUser.objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        staff_users=Count('id', filter=Q(is_staff=True)),
+        superusers=Count('id', filter=Q(is_superuser=True)),
+    )
     
     # Search functionality
     search = request.GET.get('search', '')
     if search:
-        users = users.filter(
-            Q(username__icontains=search) |
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(email__icontains=search)
-        )
+        users = users.filter(user_search_filter(search))
     
     # Department filter
     department = request.GET.get('department', '')
     if department:
         users = users.filter(department=department)
     
-    context = {
-        'users': users,
-        'total_users': total_users,
-        'active_users': active_users,
-        'staff_users': staff_users,
-        'superusers': superusers,
+    context = paginate_by_cursor(request, users, USERS_PER_PAGE, '-date_joined')
+    context.update(counters)
+    context.update({
+        'users': context['page_obj'].object_list,
         'departments': CustomUser.DEPARTMENT_CHOICES,
         'selected_department': department,
         'search_query': search,
-    }
+    })
     return render(request, 'users/admin_user_management.html', context)
 
 
@@ -230,28 +217,30 @@ def password_reset_request(request):
 @user_passes_test(lambda u: u.is_staff or u.is_superuser)
 def password_reset_requests(request):
     """View password reset requests for admin users."""
-    reset_requests = PasswordResetRequest.objects.all().order_by('-requested_at')
+    reset_requests = PasswordResetRequest.objects.select_related('user', 'processed_by')
     
     # Get statistics
-    total_requests = reset_requests.count()
-    pending_requests = reset_requests.filter(status='pending').count()
-    approved_requests = reset_requests.filter(status='approved').count()
-    completed_requests = reset_requests.filter(status='completed').count()
+    counters = PasswordResetRequest.objects.aggregate(
+        total_requests=Count('id'),
+        **{
+            f'{status}_requests': Count('id', filter=Q(status=status))
+            for status, _label in PasswordResetRequest.STATUS_CHOICES
+        }
+    )
     
     # Filter by status
     status_filter = request.GET.get('status', '')
     if status_filter:
         reset_requests = reset_requests.filter(status=status_filter)
     
-    context = {
-        'reset_requests': reset_requests,
-        'total_requests': total_requests,
-        'pending_requests': pending_requests,
-        'approved_requests': approved_requests,
-        'completed_requests': completed_requests,
+    context = paginate_by_cursor(request, reset_requests, RESET_REQUESTS_PER_PAGE, '-requested_at')
+    context.update(counters)
+    context.update({
+        'reset_requests': context['page_obj'].object_list,
+        'matching_requests': counters.get(f'{status_filter}_requests', counters['total_requests']),
         'status_choices': PasswordResetRequest.STATUS_CHOICES,
         'selected_status': status_filter,
-    }
+    })
     return render(request, 'users/password_reset_requests.html', context)
 
 